@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import anthropic
+import httpx
+
+from anthropic_managed_agents_e2b.settings import Settings, load_settings
+
+APP_HTTP_MAX_CONNECTIONS = 64
+APP_HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+APP_HTTP_KEEPALIVE_EXPIRY_SECONDS = 60.0
+
+
+def http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=APP_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=APP_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=APP_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+class AppResources:
+    """Settings and Anthropic clients shared for the lifetime of the app process.
+
+    Settings are read once; call ``reload()`` to pick up `.env` changes. Both clients are created
+    on first use and keep their connection pools open between requests, so webhooks and queue
+    drains reuse TLS connections instead of opening new ones.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        client: anthropic.Anthropic | None = None,
+        async_client: anthropic.AsyncAnthropic | None = None,
+    ) -> None:
+        self.settings = settings
+        self._lock = threading.Lock()
+        self._client = client
+        self._async_client = async_client
+        self._leases = 0
+        self._retired = False
+
+    @classmethod
+    def load(cls) -> AppResources:
+        return cls(load_settings())
+
+    @property
+    def signing_key(self) -> str | None:
+        return self.settings.anthropic_webhook_signing_key
+
+    def client(self) -> anthropic.Anthropic:
+        with self._lock:
+            if self._client is None:
+                self._client = anthropic.Anthropic(
+                    api_key=self.settings.require_anthropic_api_key(),
+                    http_client=anthropic.DefaultHttpxClient(limits=http_limits()),
+                )
+            return self._client
+
+    def async_client(self) -> anthropic.AsyncAnthropic:
+        with self._lock:
+            if self._async_client is None:
+                self._async_client = anthropic.AsyncAnthropic(
+                    api_key=self.settings.require_anthropic_api_key(),
+                    http_client=anthropic.DefaultAsyncHttpxClient(limits=http_limits()),
+                )
+            return self._async_client
+
+    def reload(self) -> AppResources:
+        """Return resources for freshly loaded settings.
+
+        Clients are carried over while the API key is unchanged. Otherwise the caller owns the old
+        clients and should ``retire()`` this object so they close once nothing uses them.
+        """
+        reloaded = AppResources(load_settings())
+        if reloaded.settings.anthropic_api_key == self.settings.anthropic_api_key:
+            with self._lock:
+                reloaded._client, self._client = self._client, None
+                reloaded._async_client, self._async_client = self._async_client, None
+        return reloaded
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[AppResources]:
+        """Keep the clients open for the duration of the block, even across a ``retire()``."""
+        with self._lock:
+            self._leases += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._leases -= 1
+                close = self._retired and self._leases == 0
+            if close:
+                await self.aclose()
+
+    async def retire(self) -> None:
+        """Close the clients now if nothing holds a lease, otherwise when the last lease ends."""
+        with self._lock:
+            self._retired = True
+            close = self._leases == 0
+        if close:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        with self._lock:
+            client, self._client = self._client, None
+            async_client, self._async_client = self._async_client, None
+        if client is not None:
+            client.close()
+        if async_client is not None:
+            await async_client.close()
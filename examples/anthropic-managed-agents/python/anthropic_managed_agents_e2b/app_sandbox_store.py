@@ -1,23 +1,120 @@
 from __future__ import annotations
 
+import fcntl
 import json
 import os
+import sqlite3
+import threading
+import zlib
+from collections.abc import Collection, Iterator
+from contextlib import AbstractContextManager, contextmanager
 from dataclasses import asdict, dataclass
 from datetime import UTC, datetime
 from pathlib import Path
 from threading import Lock
+from typing import Any, Protocol
 
 from anthropic_managed_agents_e2b.settings import EXAMPLE_ROOT
 
 DEFAULT_STORE_PATH = EXAMPLE_ROOT / ".managed-agent-sandbox-store.json"
+DEFAULT_JOURNAL_STORE_PATH = EXAMPLE_ROOT / ".managed-agent-sandbox-store.jsonl"
+DEFAULT_SQLITE_STORE_PATH = EXAMPLE_ROOT / ".managed-agent-sandbox-store.sqlite3"
+DEFAULT_STORE_BACKEND = "journal"
+JOURNAL_COMPACT_MIN_RECORDS = 1024
+ROUTING_KEY_LOCK_STRIPES = 1024
+SQLITE_BUSY_TIMEOUT_SECONDS = 30.0
+SQLITE_ACTIVITY_COLUMNS = (
+    ("arrivals", "INTEGER NOT NULL DEFAULT 0"),
+    ("mean_gap_seconds", "REAL NOT NULL DEFAULT 0"),
+)
+
+AssignmentKey = tuple[str, str, str]
 
 
 def _now() -> str:
     return datetime.now(UTC).isoformat()
 
 
-def _store_path() -> Path:
-    return Path(os.environ.get("APP_SANDBOX_STORE_PATH", DEFAULT_STORE_PATH))
+def _store_path(default: Path = DEFAULT_STORE_PATH) -> Path:
+    return Path(os.environ.get("APP_SANDBOX_STORE_PATH", default))
+
+
+def _is_json_store(path: Path) -> bool:
+    """Whether ``path`` holds a JsonSandboxStore array rather than a journal."""
+    try:
+        with path.open("rb") as file:
+            return file.read(1) == b"["
+    except FileNotFoundError:
+        return False
+
+
+def _journal_path_beside(json_path: Path) -> Path:
+    path = json_path.with_suffix(".jsonl")
+    return path if path != json_path else json_path.with_name(f"{json_path.name}.journal")
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("w") as file:
+        file.write(text)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+class StoreFileLock:
+    """Cross-process locks on ``<store path>.lock``, paired with in-process locks.
+
+    Byte 0 guards store-wide writes. Routing keys hash onto one of
+    ``ROUTING_KEY_LOCK_STRIPES`` further bytes, so different keys rarely contend. POSIX record
+    locks belong to the whole process, so every byte range is also guarded by a threading lock.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path.with_name(f"{path.name}.lock")
+        self._fd: int | None = None
+        self._fd_lock = Lock()
+        self._store_lock = Lock()
+        self._key_locks = [Lock() for _ in range(ROUTING_KEY_LOCK_STRIPES)]
+
+    @contextmanager
+    def store(self) -> Iterator[None]:
+        with self._store_lock, self._range(0):
+            yield
+
+    @contextmanager
+    def routing_key(self, key: AssignmentKey) -> Iterator[None]:
+        stripe = zlib.crc32("\0".join(key).encode()) % ROUTING_KEY_LOCK_STRIPES
+        with self._key_locks[stripe], self._range(1 + stripe):
+            yield
+
+    @contextmanager
+    def _range(self, start: int) -> Iterator[None]:
+        fd = self._descriptor()
+        fcntl.lockf(fd, fcntl.LOCK_EX, 1, start)
+        try:
+            yield
+        finally:
+            fcntl.lockf(fd, fcntl.LOCK_UN, 1, start)
+
+    def _descriptor(self) -> int:
+        with self._fd_lock:
+            if self._fd is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            return self._fd
+
+
+_store_file_locks: dict[Path, StoreFileLock] = {}
+_store_file_locks_lock = Lock()
+
+
+def store_file_lock(path: Path) -> StoreFileLock:
+    # Closing any descriptor of a file drops this process's record locks on it, so every store
+    # instance for the same path shares one StoreFileLock and one descriptor.
+    with _store_file_locks_lock:
+        return _store_file_locks.setdefault(path.resolve(), StoreFileLock(path.resolve()))
 
 
 @dataclass(frozen=True)
@@ -30,30 +127,110 @@ class SandboxAssignment:
     status: str
     created_at: str
     updated_at: str
+    # Work items routed to this key, and a moving average of the time between them.
+    arrivals: int = 0
+    mean_gap_seconds: float = 0.0
+
+    @property
+    def key(self) -> AssignmentKey:
+        return (self.environment_id, self.routing_scope, self.routing_id)
+
+
+def _assignment_from_dict(item: Any) -> SandboxAssignment | None:
+    if not (
+        isinstance(item, dict)
+        and item.get("environment_id")
+        and item.get("session_id")
+        and item.get("sandbox_id")
+        and item.get("created_at")
+        and item.get("updated_at")
+    ):
+        return None
+    return SandboxAssignment(
+        environment_id=str(item["environment_id"]),
+        routing_scope=str(item.get("routing_scope", "session")),
+        routing_id=str(item.get("routing_id", item["session_id"])),
+        session_id=str(item["session_id"]),
+        sandbox_id=str(item["sandbox_id"]),
+        status=str(item.get("status", "active")),
+        created_at=str(item["created_at"]),
+        updated_at=str(item["updated_at"]),
+        arrivals=int(item.get("arrivals", 0)),
+        mean_gap_seconds=float(item.get("mean_gap_seconds", 0.0)),
+    )
+
+
+class SandboxStore(Protocol):
+    """App-owned mapping from a routing key to the E2B sandbox that serves it."""
+
+    def list(self) -> list[SandboxAssignment]: ...
+
+    def get(
+        self, *, environment_id: str, routing_scope: str, routing_id: str
+    ) -> SandboxAssignment | None: ...
+
+    def get_by_sandbox(self, *, sandbox_id: str) -> list[SandboxAssignment]: ...
+
+    def upsert(
+        self,
+        *,
+        environment_id: str,
+        routing_scope: str,
+        routing_id: str,
+        session_id: str,
+        sandbox_id: str,
+        status: str = "active",
+        arrivals: int = 0,
+        mean_gap_seconds: float = 0.0,
+    ) -> SandboxAssignment: ...
+
+    def remove_sandbox(self, *, sandbox_id: str) -> None: ...
+
+    def remove_sandboxes(self, *, sandbox_ids: Collection[str]) -> None:
+        """Remove every assignment for the given sandboxes in one write."""
+        ...
+
+    def lock_routing_key(
+        self, *, environment_id: str, routing_scope: str, routing_id: str
+    ) -> AbstractContextManager[None]:
+        """Hold one routing key across threads and across processes sharing this store."""
+        ...
 
 
 class JsonSandboxStore:
+    """Single JSON array rewritten on every change. Simple to inspect, O(N) per call.
+
+    Writes replace the file atomically, so readers never need a lock; read-modify-write cycles
+    hold the store-wide file lock so concurrent processes cannot drop each other's updates.
+    """
+
     def __init__(self, path: Path | None = None) -> None:
         self.path = path or _store_path()
-        self._lock = Lock()
+        self._file_lock = store_file_lock(self.path)
 
     def list(self) -> list[SandboxAssignment]:
-        with self._lock:
-            return self._read()
+        return self._read()
 
     def get(
         self, *, environment_id: str, routing_scope: str, routing_id: str
     ) -> SandboxAssignment | None:
-        with self._lock:
-            for assignment in self._read():
-                if (
-                    assignment.environment_id == environment_id
-                    and assignment.routing_scope == routing_scope
-                    and assignment.routing_id == routing_id
-                ):
-                    return assignment
+        for assignment in self._read():
+            if (
+                assignment.environment_id == environment_id
+                and assignment.routing_scope == routing_scope
+                and assignment.routing_id == routing_id
+            ):
+                return assignment
         return None
 
+    def get_by_sandbox(self, *, sandbox_id: str) -> list[SandboxAssignment]:
+        return [item for item in self._read() if item.sandbox_id == sandbox_id]
+
+    def lock_routing_key(
+        self, *, environment_id: str, routing_scope: str, routing_id: str
+    ) -> AbstractContextManager[None]:
+        return self._file_lock.routing_key((environment_id, routing_scope, routing_id))
+
     def upsert(
         self,
         *,
@@ -63,8 +240,10 @@ class JsonSandboxStore:
         session_id: str,
         sandbox_id: str,
         status: str = "active",
+        arrivals: int = 0,
+        mean_gap_seconds: float = 0.0,
     ) -> SandboxAssignment:
-        with self._lock:
+        with self._file_lock.store():
             assignments = self._read()
             now = _now()
             existing = next(
@@ -86,6 +265,8 @@ class JsonSandboxStore:
                 status=status,
                 created_at=existing.created_at if existing else now,
                 updated_at=now,
+                arrivals=arrivals,
+                mean_gap_seconds=mean_gap_seconds,
             )
             updated = [
                 item
@@ -101,8 +282,12 @@ class JsonSandboxStore:
             return assignment
 
     def remove_sandbox(self, *, sandbox_id: str) -> None:
-        with self._lock:
-            self._write([item for item in self._read() if item.sandbox_id != sandbox_id])
+        self.remove_sandboxes(sandbox_ids=(sandbox_id,))
+
+    def remove_sandboxes(self, *, sandbox_ids: Collection[str]) -> None:
+        removed = set(sandbox_ids)
+        with self._file_lock.store():
+            self._write([item for item in self._read() if item.sandbox_id not in removed])
 
     def _read(self) -> list[SandboxAssignment]:
         if not self.path.exists():
@@ -114,27 +299,406 @@ class JsonSandboxStore:
         if not isinstance(raw, list):
             return []
         return [
-            SandboxAssignment(
-                environment_id=str(item["environment_id"]),
-                routing_scope=str(item.get("routing_scope", "session")),
-                routing_id=str(item.get("routing_id", item["session_id"])),
-                session_id=str(item["session_id"]),
-                sandbox_id=str(item["sandbox_id"]),
-                status=str(item.get("status", "active")),
-                created_at=str(item["created_at"]),
-                updated_at=str(item["updated_at"]),
-            )
-            for item in raw
-            if isinstance(item, dict)
-            and item.get("environment_id")
-            and item.get("session_id")
-            and item.get("sandbox_id")
-            and item.get("created_at")
-            and item.get("updated_at")
+            assignment
+            for assignment in (_assignment_from_dict(item) for item in raw)
+            if assignment is not None
         ]
 
     def _write(self, assignments: list[SandboxAssignment]) -> None:
+        _atomic_write_text(
+            self.path,
+            json.dumps([asdict(item) for item in assignments], indent=2, sort_keys=True) + "\n",
+        )
+
+
+class JournalSandboxStore:
+    """In-memory indexes backed by an append-only JSON Lines journal.
+
+    Each write appends one line under the store-wide file lock; the journal is compacted into a
+    snapshot of live assignments once it holds more than twice as many records as there are
+    live assignments (and at least ``compact_min_records``). Before each call the store applies
+    any lines other processes appended since the last call, which costs one ``stat`` when
+    nothing changed.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        *,
+        legacy_path: Path | None = None,
+        compact_min_records: int = JOURNAL_COMPACT_MIN_RECORDS,
+    ) -> None:
+        path = path or _store_path(DEFAULT_JOURNAL_STORE_PATH)
+        if _is_json_store(path):
+            # APP_SANDBOX_STORE_PATH still points at a JsonSandboxStore file. Import it into a
+            # journal beside it and leave it as is, so the json backend can still read it.
+            legacy_path = path
+            path = _journal_path_beside(path)
+        self.path = path
+        self.compact_min_records = compact_min_records
+        self._lock = Lock()
+        self._file_lock = store_file_lock(self.path)
+        self._assignments: dict[AssignmentKey, SandboxAssignment] = {}
+        self._by_sandbox: dict[str, set[AssignmentKey]] = {}
+        self._journal_records = 0
+        self._file_id: tuple[int, int] | None = None
+        self._offset = 0
+        with self._lock, self._file_lock.store():
+            self._load(legacy_path)
+
+    def list(self) -> list[SandboxAssignment]:
+        with self._lock:
+            self._refresh()
+            return list(self._assignments.values())
+
+    def get(
+        self, *, environment_id: str, routing_scope: str, routing_id: str
+    ) -> SandboxAssignment | None:
+        with self._lock:
+            self._refresh()
+            return self._assignments.get((environment_id, routing_scope, routing_id))
+
+    def get_by_sandbox(self, *, sandbox_id: str) -> list[SandboxAssignment]:
+        with self._lock:
+            self._refresh()
+            return [self._assignments[key] for key in self._by_sandbox.get(sandbox_id, ())]
+
+    def lock_routing_key(
+        self, *, environment_id: str, routing_scope: str, routing_id: str
+    ) -> AbstractContextManager[None]:
+        return self._file_lock.routing_key((environment_id, routing_scope, routing_id))
+
+    def upsert(
+        self,
+        *,
+        environment_id: str,
+        routing_scope: str,
+        routing_id: str,
+        session_id: str,
+        sandbox_id: str,
+        status: str = "active",
+        arrivals: int = 0,
+        mean_gap_seconds: float = 0.0,
+    ) -> SandboxAssignment:
+        with self._lock, self._file_lock.store():
+            self._refresh()
+            now = _now()
+            existing = self._assignments.get((environment_id, routing_scope, routing_id))
+            assignment = SandboxAssignment(
+                environment_id=environment_id,
+                routing_scope=routing_scope,
+                routing_id=routing_id,
+                session_id=session_id,
+                sandbox_id=sandbox_id,
+                status=status,
+                created_at=existing.created_at if existing else now,
+                updated_at=now,
+                arrivals=arrivals,
+                mean_gap_seconds=mean_gap_seconds,
+            )
+            self._append({"op": "upsert", **asdict(assignment)})
+            self._index(assignment)
+            self._maybe_compact()
+            return assignment
+
+    def remove_sandbox(self, *, sandbox_id: str) -> None:
+        self.remove_sandboxes(sandbox_ids=(sandbox_id,))
+
+    def remove_sandboxes(self, *, sandbox_ids: Collection[str]) -> None:
+        with self._lock, self._file_lock.store():
+            self._refresh()
+            present = [item for item in dict.fromkeys(sandbox_ids) if item in self._by_sandbox]
+            if not present:
+                return
+            self._append(*({"op": "remove", "sandbox_id": item} for item in present))
+            for sandbox_id in present:
+                self._unindex_sandbox(sandbox_id)
+            self._maybe_compact()
+
+    def compact(self) -> None:
+        with self._lock, self._file_lock.store():
+            self._refresh()
+            self._compact()
+
+    def _index(self, assignment: SandboxAssignment) -> None:
+        key = assignment.key
+        previous = self._assignments.pop(key, None)
+        if previous is not None:
+            self._discard_sandbox_key(previous.sandbox_id, key)
+        self._assignments[key] = assignment
+        self._by_sandbox.setdefault(assignment.sandbox_id, set()).add(key)
+
+    def _discard_sandbox_key(self, sandbox_id: str, key: AssignmentKey) -> None:
+        keys = self._by_sandbox.get(sandbox_id)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            del self._by_sandbox[sandbox_id]
+
+    def _unindex_sandbox(self, sandbox_id: str) -> None:
+        for key in self._by_sandbox.pop(sandbox_id, ()):
+            self._assignments.pop(key, None)
+
+    def _load(self, legacy_path: Path | None) -> None:
+        if not self.path.exists():
+            if legacy_path is not None and legacy_path.exists():
+                for assignment in JsonSandboxStore(legacy_path).list():
+                    self._index(assignment)
+                self._compact()
+            return
+
+        self._refresh()
+        self._maybe_compact()
+
+    def _refresh(self) -> None:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return
+        if (stat.st_dev, stat.st_ino) == self._file_id and stat.st_size <= self._offset:
+            return
+
+        with self.path.open("rb") as journal:
+            opened = os.fstat(journal.fileno())
+            if (opened.st_dev, opened.st_ino) != self._file_id:
+                # Another process compacted the journal into a new file; rebuild from it.
+                self._assignments.clear()
+                self._by_sandbox.clear()
+                self._journal_records = 0
+                self._file_id = (opened.st_dev, opened.st_ino)
+                self._offset = 0
+            journal.seek(self._offset)
+            data = journal.read()
+
+        # Only complete lines are applied; a line still being written is picked up next time.
+        complete = data[: data.rfind(b"\n") + 1]
+        self._offset += len(complete)
+        for line in complete.splitlines():
+            self._apply(line)
+
+    def _apply(self, line: bytes) -> None:
+        if not line.strip():
+            return
+        self._journal_records += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            # A crash mid-append can leave a truncated line; compaction drops it.
+            return
+        if not isinstance(record, dict):
+            return
+        if record.get("op") == "remove":
+            self._unindex_sandbox(str(record.get("sandbox_id", "")))
+            return
+        assignment = _assignment_from_dict(record)
+        if assignment is not None:
+            self._index(assignment)
+
+    def _append(self, *records: dict[str, object]) -> None:
+        line = b"".join(
+            json.dumps(record, separators=(",", ":"), sort_keys=True).encode() + b"\n"
+            for record in records
+        )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("ab") as journal:
+            opened = os.fstat(journal.fileno())
+            if self._file_id is None:
+                self._file_id = (opened.st_dev, opened.st_ino)
+            if opened.st_size > self._offset:
+                # Writers hold the store lock, so leftover bytes are a crashed writer's partial
+                # line. Terminate it so this record starts on a line of its own.
+                line = b"\n" + line
+            journal.write(line)
+            journal.flush()
+            self._offset = journal.tell()
+        self._journal_records += len(records)
+
+    def _maybe_compact(self) -> None:
+        threshold = max(self.compact_min_records, 2 * len(self._assignments))
+        if self._journal_records > threshold:
+            self._compact()
+
+    def _compact(self) -> None:
+        _atomic_write_text(
+            self.path,
+            "".join(
+                json.dumps(
+                    {"op": "upsert", **asdict(assignment)}, separators=(",", ":"), sort_keys=True
+                )
+                + "\n"
+                for assignment in self._assignments.values()
+            ),
+        )
+        stat = self.path.stat()
+        self._file_id = (stat.st_dev, stat.st_ino)
+        self._offset = stat.st_size
+        self._journal_records = len(self._assignments)
+
+
+class SqliteSandboxStore:
+    """SQLite table keyed by the routing key, with WAL enabled for concurrent readers.
+
+    Each thread gets its own connection, so readers never wait on each other and writers are
+    serialized by SQLite itself, across threads and processes alike. Every write is a single
+    statement and therefore its own transaction, except ``remove_sandboxes``, which wraps its
+    deletes in one explicit transaction.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or _store_path(DEFAULT_SQLITE_STORE_PATH)
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        self.path.write_text(
-            json.dumps([asdict(item) for item in assignments], indent=2, sort_keys=True) + "\n"
+        self._file_lock = store_file_lock(self.path)
+        self._local = threading.local()
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sandbox_assignments (
+                environment_id TEXT NOT NULL,
+                routing_scope TEXT NOT NULL,
+                routing_id TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                sandbox_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                arrivals INTEGER NOT NULL DEFAULT 0,
+                mean_gap_seconds REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (environment_id, routing_scope, routing_id)
+            )
+            """
+        )
+        self._add_missing_columns(connection)
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS sandbox_assignments_sandbox_id "
+            "ON sandbox_assignments (sandbox_id)"
+        )
+
+    @staticmethod
+    def _add_missing_columns(connection: sqlite3.Connection) -> None:
+        # Databases created before activity tracking lack these columns.
+        columns = {
+            row["name"] for row in connection.execute("PRAGMA table_info(sandbox_assignments)")
+        }
+        for name, definition in SQLITE_ACTIVITY_COLUMNS:
+            if name in columns:
+                continue
+            try:
+                connection.execute(
+                    f"ALTER TABLE sandbox_assignments ADD COLUMN {name} {definition}"
+                )
+            except sqlite3.OperationalError as error:
+                # Another process added it between the check and the ALTER.
+                if "duplicate column" not in str(error):
+                    raise
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS, isolation_level=None
+            )
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def lock_routing_key(
+        self, *, environment_id: str, routing_scope: str, routing_id: str
+    ) -> AbstractContextManager[None]:
+        return self._file_lock.routing_key((environment_id, routing_scope, routing_id))
+
+    def list(self) -> list[SandboxAssignment]:
+        cursor = self._connection().execute("SELECT * FROM sandbox_assignments ORDER BY updated_at")
+        return [SandboxAssignment(**row) for row in cursor.fetchall()]
+
+    def get(
+        self, *, environment_id: str, routing_scope: str, routing_id: str
+    ) -> SandboxAssignment | None:
+        cursor = self._connection().execute(
+            "SELECT * FROM sandbox_assignments "
+            "WHERE environment_id = ? AND routing_scope = ? AND routing_id = ?",
+            (environment_id, routing_scope, routing_id),
+        )
+        row = cursor.fetchone()
+        return SandboxAssignment(**row) if row else None
+
+    def get_by_sandbox(self, *, sandbox_id: str) -> list[SandboxAssignment]:
+        cursor = self._connection().execute(
+            "SELECT * FROM sandbox_assignments WHERE sandbox_id = ?", (sandbox_id,)
+        )
+        return [SandboxAssignment(**row) for row in cursor.fetchall()]
+
+    def upsert(
+        self,
+        *,
+        environment_id: str,
+        routing_scope: str,
+        routing_id: str,
+        session_id: str,
+        sandbox_id: str,
+        status: str = "active",
+        arrivals: int = 0,
+        mean_gap_seconds: float = 0.0,
+    ) -> SandboxAssignment:
+        now = _now()
+        cursor = self._connection().execute(
+            """
+            INSERT INTO sandbox_assignments (
+                environment_id, routing_scope, routing_id, session_id,
+                sandbox_id, status, created_at, updated_at, arrivals, mean_gap_seconds
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (environment_id, routing_scope, routing_id) DO UPDATE SET
+                session_id = excluded.session_id,
+                sandbox_id = excluded.sandbox_id,
+                status = excluded.status,
+                updated_at = excluded.updated_at,
+                arrivals = excluded.arrivals,
+                mean_gap_seconds = excluded.mean_gap_seconds
+            RETURNING *
+            """,
+            (
+                environment_id,
+                routing_scope,
+                routing_id,
+                session_id,
+                sandbox_id,
+                status,
+                now,
+                now,
+                arrivals,
+                mean_gap_seconds,
+            ),
+        )
+        return SandboxAssignment(**cursor.fetchone())
+
+    def remove_sandbox(self, *, sandbox_id: str) -> None:
+        self._connection().execute(
+            "DELETE FROM sandbox_assignments WHERE sandbox_id = ?", (sandbox_id,)
         )
+
+    def remove_sandboxes(self, *, sandbox_ids: Collection[str]) -> None:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "DELETE FROM sandbox_assignments WHERE sandbox_id = ?",
+                ((sandbox_id,) for sandbox_id in sandbox_ids),
+            )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+
+def open_sandbox_store(backend: str | None = None) -> SandboxStore:
+    backend = backend or os.environ.get("APP_SANDBOX_STORE_BACKEND") or DEFAULT_STORE_BACKEND
+    if backend == "json":
+        return JsonSandboxStore()
+    if backend == "journal":
+        legacy_path = None if os.environ.get("APP_SANDBOX_STORE_PATH") else DEFAULT_STORE_PATH
+        return JournalSandboxStore(legacy_path=legacy_path)
+    if backend == "sqlite":
+        return SqliteSandboxStore()
+    raise RuntimeError("APP_SANDBOX_STORE_BACKEND must be json, journal, or sqlite")
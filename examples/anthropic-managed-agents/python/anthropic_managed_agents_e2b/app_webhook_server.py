@@ -1,14 +1,25 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import hmac
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from threading import Lock
 
 import anthropic
 from fastapi import FastAPI, HTTPException, Request, Response
 
-from anthropic_managed_agents_e2b.app_sandbox_store import JsonSandboxStore
+from anthropic_managed_agents_e2b.app_resources import AppResources
+from anthropic_managed_agents_e2b.app_sandbox_store import SandboxStore, open_sandbox_store
+from anthropic_managed_agents_e2b.caching import TtlLruCache
+from anthropic_managed_agents_e2b.drain_coalescer import DrainCoalescer
+from anthropic_managed_agents_e2b.keyed_locks import KeyedLocks
+from anthropic_managed_agents_e2b.sandbox_lifecycle import (
+    LIFECYCLE_SWEEP_SECONDS,
+    SandboxLifecycleManager,
+)
 from anthropic_managed_agents_e2b.sandbox_worker import ensure_worker_sandbox
 from anthropic_managed_agents_e2b.settings import (
     DEFAULT_APP_SANDBOX_TIMEOUT_SECONDS,
@@ -18,28 +29,169 @@ from anthropic_managed_agents_e2b.settings import (
     DEFAULT_WORKER_MAX_IDLE_SECONDS,
     MAX_WEBHOOK_BODY_BYTES,
     Settings,
-    load_settings,
 )
-
-app = FastAPI()
-store = JsonSandboxStore()
-worker_locks: dict[tuple[str, str, str], Lock] = {}
-worker_locks_lock = Lock()
-queue_drains: dict[str, asyncio.Task[None]] = {}
+from anthropic_managed_agents_e2b.warm_pool import WarmSandboxPool
+from anthropic_managed_agents_e2b.webhook_signature import (
+    WebhookBodyTooLarge,
+    WebhookSignatureError,
+    read_verified_body,
+)
+from anthropic_managed_agents_e2b.work_dispatcher import WorkDispatcher
+
+store: SandboxStore | None = None
+store_lock = Lock()
+resources: AppResources | None = None
+warm_pool: WarmSandboxPool | None = None
+dispatcher: WorkDispatcher | None = None
+lifecycle: SandboxLifecycleManager | None = None
+drain_coalescer: DrainCoalescer | None = None
+seen_webhook_events: TtlLruCache[str, bool] | None = None
+worker_locks = KeyedLocks()
 logger = logging.getLogger(__name__)
 ROUTING_SCOPES = {"session", "agent", "environment"}
+SESSION_ROUTE_CACHE_SIZE = 10_000
+SESSION_ROUTE_CACHE_TTL_SECONDS = 3600.0
+# A session never changes environment or agent, so entries only expire to bound memory. Sessions
+# from another environment are cached too, so repeated work for them is rejected without a lookup.
+session_routes: TtlLruCache[str, tuple[str, str]] = TtlLruCache(
+    max_size=SESSION_ROUTE_CACHE_SIZE, ttl_seconds=SESSION_ROUTE_CACHE_TTL_SECONDS
+)
+# Anthropic retries a failed delivery with the same event id for a while; an hour covers that.
+WEBHOOK_EVENT_TTL_SECONDS = 3600.0
+
+
+def start_warm_pool(settings: Settings) -> None:
+    global warm_pool
+
+    if warm_pool is not None or settings.app_warm_pool_size <= 0:
+        return
+    settings.require_anthropic_environment_id()
+    settings.require_anthropic_environment_key()
+    warm_pool = WarmSandboxPool(
+        settings,
+        template_name=DEFAULT_TEMPLATE_NAME,
+        timeout_seconds=_sandbox_timeout(_routing_scope(settings)),
+        size=settings.app_warm_pool_size,
+        max_size=settings.app_warm_pool_max_size,
+        ttl_seconds=settings.app_warm_pool_ttl_seconds,
+    )
+    warm_pool.start()
+
+
+def stop_warm_pool() -> None:
+    global warm_pool
+
+    if warm_pool is None:
+        return
+    pool, warm_pool = warm_pool, None
+    pool.stop()
+
+
+async def sweep_idle_sandboxes(settings: Settings) -> None:
+    manager = _lifecycle(settings)
+    while True:
+        await asyncio.sleep(LIFECYCLE_SWEEP_SECONDS)
+        try:
+            result = await asyncio.to_thread(manager.sweep, settings, _store())
+        except Exception:
+            logger.exception("failed to sweep idle sandboxes")
+            continue
+        if result.selected:
+            logger.info(
+                "killed %d idle sandboxes (%d failed)", len(result.killed), len(result.failed)
+            )
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    global resources
+
+    settings = _settings()
+    _store()
+    start_warm_pool(settings)
+    sweeper = None
+    if _lifecycle(settings).adaptive:
+        sweeper = asyncio.create_task(sweep_idle_sandboxes(settings))
+    try:
+        yield
+    finally:
+        if sweeper is not None:
+            sweeper.cancel()
+        if drain_coalescer is not None:
+            await drain_coalescer.aclose()
+        await asyncio.to_thread(stop_warm_pool)
+        if dispatcher is not None:
+            dispatcher.shutdown()
+        if resources is not None:
+            app_resources, resources = resources, None
+            await app_resources.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def _resources() -> AppResources:
+    global resources
+
+    if resources is None:
+        resources = AppResources.load()
+    return resources
 
 
 def _settings() -> Settings:
-    return load_settings()
+    return _resources().settings
+
+
+def _webhook_client() -> anthropic.Anthropic:
+    return _resources().client()
+
+
+def _store() -> SandboxStore:
+    global store
+
+    # Opened on first use, not at import, so importing this module creates no store files.
+    with store_lock:
+        if store is None:
+            store = open_sandbox_store()
+        return store
+
+
+def _dispatcher(settings: Settings) -> WorkDispatcher:
+    global dispatcher
+
+    if dispatcher is None:
+        dispatcher = WorkDispatcher(max_in_flight=settings.app_max_in_flight_work)
+    return dispatcher
+
+
+def _lifecycle(settings: Settings) -> SandboxLifecycleManager:
+    global lifecycle
+
+    if lifecycle is None:
+        lifecycle = SandboxLifecycleManager.from_settings(settings)
+    return lifecycle
+
 
+def _drain_coalescer(settings: Settings) -> DrainCoalescer:
+    global drain_coalescer
+
+    if drain_coalescer is None:
+        drain_coalescer = DrainCoalescer(
+            debounce_seconds=settings.app_drain_debounce_seconds,
+            grace_seconds=settings.app_drain_grace_seconds,
+        )
+    return drain_coalescer
 
-def _webhook_client(settings: Settings) -> anthropic.Anthropic:
-    return anthropic.Anthropic(api_key=settings.require_anthropic_api_key())
 
+def _seen_webhook_events(settings: Settings) -> TtlLruCache[str, bool]:
+    global seen_webhook_events
 
-def _async_webhook_client(settings: Settings) -> anthropic.AsyncAnthropic:
-    return anthropic.AsyncAnthropic(api_key=settings.require_anthropic_api_key())
+    if seen_webhook_events is None:
+        seen_webhook_events = TtlLruCache(
+            max_size=settings.app_webhook_event_cache_size,
+            ttl_seconds=WEBHOOK_EVENT_TTL_SECONDS,
+        )
+    return seen_webhook_events
 
 
 def _routing_scope(settings: Settings) -> str:
@@ -49,6 +201,12 @@ def _routing_scope(settings: Settings) -> str:
     return scope
 
 
+def _sandbox_timeout(routing_scope: str) -> int:
+    if routing_scope == "session":
+        return DEFAULT_APP_SANDBOX_TIMEOUT_SECONDS
+    return DEFAULT_SANDBOX_TIMEOUT_SECONDS
+
+
 def _routing_target(settings: Settings, session_id: str) -> tuple[str, str, str]:
     configured_environment_id = settings.require_anthropic_environment_id()
     scope = _routing_scope(settings)
@@ -57,13 +215,22 @@ def _routing_target(settings: Settings, session_id: str) -> tuple[str, str, str]
     if scope == "environment":
         return configured_environment_id, scope, configured_environment_id
 
-    session = _webhook_client(settings).beta.sessions.retrieve(session_id)
-    if session.environment_id != configured_environment_id:
+    environment_id, agent_id = _session_route(settings, session_id)
+    if environment_id != configured_environment_id:
         raise RuntimeError(
-            f"session {session_id} belongs to {session.environment_id}, "
+            f"session {session_id} belongs to {environment_id}, "
             f"but this worker is configured for {configured_environment_id}"
         )
-    return session.environment_id, scope, session.agent.id
+    return environment_id, scope, agent_id
+
+
+def _session_route(settings: Settings, session_id: str) -> tuple[str, str]:
+    route = session_routes.get(session_id)
+    if route is None:
+        session = _webhook_client().beta.sessions.retrieve(session_id)
+        route = (session.environment_id, session.agent.id)
+        session_routes.set(session_id, route)
+    return route
 
 
 def ensure_worker_for_work(settings: Settings, work: object):
@@ -78,10 +245,12 @@ def ensure_worker_for_work(settings: Settings, work: object):
         raise RuntimeError("claimed work item does not include id")
     session_id = str(session_id)
     environment_id, routing_scope, routing_id = _routing_target(settings, session_id)
-    with worker_locks_lock:
-        worker_lock = worker_locks.setdefault((environment_id, routing_scope, routing_id), Lock())
-
-    with worker_lock:
+    with (
+        worker_locks.hold((environment_id, routing_scope, routing_id)),
+        _store().lock_routing_key(
+            environment_id=environment_id, routing_scope=routing_scope, routing_id=routing_id
+        ),
+    ):
         return _ensure_worker_for_target(
             settings,
             environment_id,
@@ -100,79 +269,77 @@ def _ensure_worker_for_target(
     work_id: str,
     session_id: str,
 ):
-    assignment = store.get(
+    assignment = _store().get(
         environment_id=environment_id, routing_scope=routing_scope, routing_id=routing_id
     )
+    manager = _lifecycle(settings)
+    arrivals, mean_gap_seconds = manager.record_arrival(
+        (environment_id, routing_scope, routing_id), assignment
+    )
+    sandbox_id = assignment.sandbox_id if assignment else None
+    if sandbox_id is None and warm_pool is not None:
+        sandbox_id = warm_pool.claim()
     sandbox = ensure_worker_sandbox(
         settings,
         template_name=DEFAULT_TEMPLATE_NAME,
-        timeout_seconds=(
-            DEFAULT_APP_SANDBOX_TIMEOUT_SECONDS
-            if routing_scope == "session"
-            else DEFAULT_SANDBOX_TIMEOUT_SECONDS
+        timeout_seconds=manager.timeout_seconds(
+            arrivals, mean_gap_seconds, default_seconds=_sandbox_timeout(routing_scope)
         ),
         worker_max_idle_seconds=DEFAULT_WORKER_MAX_IDLE_SECONDS,
         log_level=DEFAULT_LOG_LEVEL,
         work_id=work_id,
         session_id=session_id,
-        sandbox_id=assignment.sandbox_id if assignment else None,
+        sandbox_id=sandbox_id,
     )
-    store.upsert(
+    _store().upsert(
         environment_id=environment_id,
         routing_scope=routing_scope,
         routing_id=routing_id,
         session_id=session_id,
         sandbox_id=sandbox.sandbox_id,
+        arrivals=arrivals,
+        mean_gap_seconds=mean_gap_seconds,
     )
     return sandbox
 
 
+def _dispatch_key(work: object) -> object:
+    data = getattr(work, "data", None)
+    return getattr(data, "id", None) or getattr(work, "id", None)
+
+
 async def drain_work_queue(settings: Settings) -> None:
     environment_id = settings.require_anthropic_environment_id()
-    async with _async_webhook_client(settings) as client:
+    work_dispatcher = _dispatcher(settings)
+    # The lease keeps the clients this pass uses open until its dispatched work has finished,
+    # even if /reload swaps in new resources mid-pass.
+    async with _resources().lease() as app_resources:
+        client = app_resources.async_client()
         async for work in client.beta.environments.work.poller(
             environment_id=environment_id,
             environment_key=settings.require_anthropic_environment_key(),
             drain=True,
             auto_stop=False,
         ):
-            await asyncio.to_thread(ensure_worker_for_work, settings, work)
-
-
-def _log_background_queue_result(environment_id: str, task: asyncio.Task[None]) -> None:
-    queue_drains.pop(environment_id, None)
-    try:
-        task.result()
-    except Exception:
-        logger.exception("failed to drain work queue")
-        return
-
-    logger.info("drained work queue for %s", environment_id)
+            await work_dispatcher.submit(
+                _dispatch_key(work), functools.partial(ensure_worker_for_work, settings, work)
+            )
+        await work_dispatcher.join()
 
 
 def start_queue_drain(settings: Settings) -> None:
-    environment_id = settings.require_anthropic_environment_id()
-    if environment_id in queue_drains:
-        return
-
-    task = asyncio.create_task(drain_work_queue(settings))
-    queue_drains[environment_id] = task
-    task.add_done_callback(lambda done: _log_background_queue_result(environment_id, done))
-
+    _drain_coalescer(settings).kick(
+        settings.require_anthropic_environment_id(),
+        functools.partial(drain_work_queue, settings),
+    )
 
-async def _read_limited_body(request: Request, max_bytes: int) -> str:
-    content_length = request.headers.get("content-length")
-    if content_length and int(content_length) > max_bytes:
-        raise ValueError("request body too large")
 
-    chunks: list[bytes] = []
-    size = 0
-    async for chunk in request.stream():
-        size += len(chunk)
-        if size > max_bytes:
-            raise ValueError("request body too large")
-        chunks.append(chunk)
-    return b"".join(chunks).decode()
+def _is_duplicate_event(settings: Settings, event_id: str) -> bool:
+    seen = _seen_webhook_events(settings)
+    if seen.get(event_id):
+        return True
+    seen.set(event_id, True)
+    return False
 
 
 def _has_admin_access(request: Request, settings: Settings) -> bool:
@@ -184,40 +351,69 @@ def _has_admin_access(request: Request, settings: Settings) -> bool:
 
 
 @app.get("/health")
-def health() -> dict[str, bool]:
-    return {"ok": True}
+def health() -> dict[str, object]:
+    response: dict[str, object] = {"ok": True, "session_route_cache": session_routes.stats()}
+    if warm_pool is not None:
+        response["warm_pool"] = warm_pool.stats()
+    if dispatcher is not None:
+        response["dispatcher"] = dispatcher.stats()
+    if lifecycle is not None:
+        response["lifecycle"] = lifecycle.stats()
+    if drain_coalescer is not None:
+        response["queue_drains"] = drain_coalescer.stats()
+    if seen_webhook_events is not None:
+        response["webhook_events"] = seen_webhook_events.stats()
+    return response
 
 
 @app.get("/sandboxes")
-def sandboxes(request: Request) -> dict[str, list[dict[str, str]]]:
+def sandboxes(request: Request) -> dict[str, list[dict[str, object]]]:
     if not _has_admin_access(request, _settings()):
         raise HTTPException(status_code=401, detail="unauthorized")
 
-    return {"sandboxes": [assignment.__dict__ for assignment in store.list()]}
+    return {"sandboxes": [assignment.__dict__ for assignment in _store().list()]}
+
+
+@app.post("/reload")
+async def reload(request: Request) -> dict[str, bool]:
+    global resources
+
+    if not _has_admin_access(request, _settings()):
+        raise HTTPException(status_code=401, detail="unauthorized")
+
+    previous = _resources()
+    resources = previous.reload()
+    await previous.retire()
+    return {"ok": True}
 
 
 @app.post("/webhook")
 async def webhook(request: Request) -> Response:
-    settings = _settings()
-    signing_key = settings.anthropic_webhook_signing_key
+    app_resources = _resources()
+    settings = app_resources.settings
+    signing_key = app_resources.signing_key
     if not signing_key:
         return Response("ANTHROPIC_WEBHOOK_SIGNING_KEY is required", status_code=503)
     try:
-        payload = await _read_limited_body(request, MAX_WEBHOOK_BODY_BYTES)
-    except ValueError:
+        payload = await read_verified_body(
+            request.stream(), request.headers, key=signing_key, max_bytes=MAX_WEBHOOK_BODY_BYTES
+        )
+    except WebhookBodyTooLarge:
         return Response("request body too large", status_code=413)
+    except WebhookSignatureError:
+        logger.exception("invalid webhook signature")
+        return Response("invalid signature", status_code=401)
 
     try:
-        event = _webhook_client(settings).beta.webhooks.unwrap(
-            payload,
-            headers=dict(request.headers),
-            key=signing_key,
-        )
+        # The signature is already checked; json.loads accepts the bytearray as is.
+        event = _webhook_client().beta.webhooks.parse_unverified(payload)
     except Exception:
-        logger.exception("invalid webhook signature")
-        return Response("invalid signature", status_code=401)
+        logger.exception("invalid webhook payload")
+        return Response("invalid payload", status_code=400)
 
     if event.data.type == "session.status_run_started":
+        if _is_duplicate_event(settings, event.id):
+            return Response(status_code=204)
         start_queue_drain(settings)
         return Response(status_code=204)
 
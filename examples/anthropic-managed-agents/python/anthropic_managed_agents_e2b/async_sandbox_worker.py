@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Sequence
+
+from e2b import AsyncSandbox, CommandExitException, NotFoundException
+
+from anthropic_managed_agents_e2b.app_sandbox_store import open_sandbox_store
+from anthropic_managed_agents_e2b.environment import (
+    WEBHOOK_SANDBOX_METADATA_KEY,
+    WEBHOOK_SANDBOX_STORE_METADATA_KEY,
+    WORKER_SANDBOX_METADATA_KEY,
+    WORKER_SANDBOX_STORE_METADATA_KEY,
+    add_sandbox_to_metadata_store,
+    metadata_writer,
+)
+from anthropic_managed_agents_e2b.sandbox_worker import (
+    REMOTE_WORKER_MANIFEST,
+    WORKER_SANDBOX_LIFECYCLE,
+    BootstrapResult,
+    BootstrapStep,
+    WorkerStatus,
+    bootstrap_command,
+    bootstrap_result,
+    bootstrap_scripts,
+    parse_worker_status,
+    raise_for_bootstrap,
+    webhook_config_steps,
+    webhook_sandbox_metadata,
+    webhook_server_envs,
+    webhook_server_start_step,
+    worker_code_version,
+    worker_process_check_command,
+    worker_sandbox_metadata,
+    worker_start_envs,
+    worker_start_step,
+    worker_status_command,
+    worker_upload_writes,
+)
+from anthropic_managed_agents_e2b.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+async def _run_script(
+    sandbox: AsyncSandbox, script: str, *, envs: dict[str, str], timeout: float
+) -> tuple[int, str, str]:
+    try:
+        result = await sandbox.commands.run(bootstrap_command(script), envs=envs, timeout=timeout)
+    except CommandExitException as error:
+        return error.exit_code, error.stdout, error.stderr
+    return result.exit_code or 0, result.stdout, result.stderr
+
+
+async def run_bootstrap(
+    sandbox: AsyncSandbox,
+    steps: Sequence[BootstrapStep],
+    *,
+    envs: dict[str, str],
+    timeout: float = 30,
+    batched: bool = True,
+) -> BootstrapResult:
+    exit_code = 0
+    stdout: list[str] = []
+    stderr: list[str] = []
+    for script in bootstrap_scripts(steps, batched=batched):
+        exit_code, out, err = await _run_script(sandbox, script, envs=envs, timeout=timeout)
+        stdout.append(out)
+        stderr.append(err)
+        if exit_code != 0:
+            break
+    return bootstrap_result(exit_code, stdout, stderr)
+
+
+async def create_or_connect_worker_sandbox(
+    settings: Settings,
+    *,
+    template_name: str,
+    timeout_seconds: int,
+    sandbox_id: str | None = None,
+    metadata: dict[str, str] | None = None,
+) -> AsyncSandbox:
+    if sandbox_id:
+        return await AsyncSandbox.connect(sandbox_id, timeout=timeout_seconds)
+
+    return await AsyncSandbox.create(
+        template_name,
+        timeout=timeout_seconds,
+        lifecycle=WORKER_SANDBOX_LIFECYCLE,
+        metadata=worker_sandbox_metadata(settings, metadata),
+    )
+
+
+async def upload_worker(sandbox: AsyncSandbox) -> list[str]:
+    try:
+        remote_manifest = await sandbox.files.read(REMOTE_WORKER_MANIFEST)
+    except NotFoundException:
+        remote_manifest = ""
+    writes = worker_upload_writes(remote_manifest)
+    if not writes:
+        return []
+    await sandbox.files.write_files(writes)
+    return [write["path"] for write in writes[:-1]]
+
+
+async def start_worker_process(
+    sandbox: AsyncSandbox,
+    settings: Settings,
+    *,
+    worker_max_idle_seconds: float | None,
+    log_level: str,
+    work_id: str | None = None,
+    session_id: str | None = None,
+) -> None:
+    envs = worker_start_envs(
+        settings,
+        worker_max_idle_seconds=worker_max_idle_seconds,
+        log_level=log_level,
+        work_id=work_id,
+        session_id=session_id,
+    )
+    result = await run_bootstrap(sandbox, [worker_start_step()], envs=envs, timeout=15)
+    raise_for_bootstrap(result, "worker start")
+
+
+async def read_worker_status(sandbox: AsyncSandbox) -> WorkerStatus | None:
+    try:
+        result = await sandbox.commands.run(worker_status_command(), timeout=5)
+    except Exception:
+        return None
+    return parse_worker_status(result.stdout)
+
+
+async def worker_process_is_running(sandbox: AsyncSandbox) -> bool:
+    try:
+        result = await sandbox.commands.run(worker_process_check_command(), timeout=5)
+    except Exception:
+        return False
+    return result.exit_code == 0
+
+
+async def ensure_worker_process(
+    sandbox: AsyncSandbox,
+    settings: Settings,
+    *,
+    worker_max_idle_seconds: float | None,
+    log_level: str,
+    work_id: str | None = None,
+    session_id: str | None = None,
+) -> None:
+    handles_claimed_work = bool(work_id or session_id)
+    if handles_claimed_work:
+        await upload_worker(sandbox)
+        running = False
+    else:
+        status = await read_worker_status(sandbox)
+        if status is not None and status.is_current(worker_code_version()):
+            return
+        # The liveness probe does not depend on the upload, so both share one round trip of time.
+        _, running = await asyncio.gather(
+            upload_worker(sandbox), worker_process_is_running(sandbox)
+        )
+    if running:
+        return
+    await start_worker_process(
+        sandbox,
+        settings,
+        worker_max_idle_seconds=worker_max_idle_seconds,
+        log_level=log_level,
+        work_id=work_id,
+        session_id=session_id,
+    )
+
+
+async def start_worker_sandbox(
+    settings: Settings,
+    *,
+    template_name: str,
+    timeout_seconds: int,
+    worker_max_idle_seconds: float | None,
+    log_level: str,
+    work_id: str | None = None,
+    session_id: str | None = None,
+    sandbox_id: str | None = None,
+) -> AsyncSandbox:
+    settings.require_anthropic_environment_id()
+    settings.require_anthropic_environment_key()
+    sandbox = await create_or_connect_worker_sandbox(
+        settings,
+        template_name=template_name,
+        timeout_seconds=timeout_seconds,
+        sandbox_id=sandbox_id,
+    )
+    await ensure_worker_process(
+        sandbox,
+        settings,
+        worker_max_idle_seconds=worker_max_idle_seconds,
+        log_level=log_level,
+        work_id=work_id,
+        session_id=session_id,
+    )
+    if settings.anthropic_api_key:
+        metadata_writer().add(
+            api_key=settings.anthropic_api_key,
+            environment_id=settings.require_anthropic_environment_id(),
+            legacy_key=WORKER_SANDBOX_METADATA_KEY,
+            store_key=WORKER_SANDBOX_STORE_METADATA_KEY,
+            sandbox_id=sandbox.sandbox_id,
+        )
+    return sandbox
+
+
+async def ensure_worker_sandbox(
+    settings: Settings,
+    *,
+    template_name: str,
+    timeout_seconds: int,
+    worker_max_idle_seconds: float | None,
+    log_level: str,
+    work_id: str | None = None,
+    session_id: str | None = None,
+    sandbox_id: str | None = None,
+) -> AsyncSandbox:
+    if sandbox_id:
+        try:
+            return await start_worker_sandbox(
+                settings,
+                template_name=template_name,
+                timeout_seconds=timeout_seconds,
+                worker_max_idle_seconds=worker_max_idle_seconds,
+                log_level=log_level,
+                work_id=work_id,
+                session_id=session_id,
+                sandbox_id=sandbox_id,
+            )
+        except Exception:
+            logger.exception(
+                "failed to connect worker sandbox %s; creating a replacement",
+                sandbox_id,
+            )
+
+    return await start_worker_sandbox(
+        settings,
+        template_name=template_name,
+        timeout_seconds=timeout_seconds,
+        worker_max_idle_seconds=worker_max_idle_seconds,
+        log_level=log_level,
+        work_id=work_id,
+        session_id=session_id,
+    )
+
+
+async def bootstrap_webhook_server(
+    sandbox: AsyncSandbox,
+    settings: Settings,
+    *,
+    worker_max_idle_seconds: float | None,
+    log_level: str,
+    port: int,
+    batched: bool = True,
+) -> BootstrapResult:
+    await upload_worker(sandbox)
+    envs = webhook_server_envs(
+        settings, worker_max_idle_seconds=worker_max_idle_seconds, log_level=log_level
+    )
+    result = await run_bootstrap(
+        sandbox,
+        [*webhook_config_steps(settings), webhook_server_start_step(port)],
+        envs=envs,
+        timeout=30,
+        batched=batched,
+    )
+    raise_for_bootstrap(result, "webhook server bootstrap")
+    return result
+
+
+async def start_webhook_server_sandbox(
+    settings: Settings,
+    *,
+    template_name: str,
+    timeout_seconds: int,
+    worker_max_idle_seconds: float | None,
+    log_level: str,
+    port: int,
+    sandbox_id: str | None = None,
+) -> AsyncSandbox:
+    settings.require_anthropic_environment_id()
+    settings.require_anthropic_environment_key()
+
+    if sandbox_id:
+        sandbox = await AsyncSandbox.connect(sandbox_id, timeout=timeout_seconds)
+    else:
+        sandbox = await AsyncSandbox.create(
+            template_name,
+            timeout=timeout_seconds,
+            lifecycle=WORKER_SANDBOX_LIFECYCLE,
+            metadata=webhook_sandbox_metadata(settings),
+        )
+
+    await bootstrap_webhook_server(
+        sandbox,
+        settings,
+        worker_max_idle_seconds=worker_max_idle_seconds,
+        log_level=log_level,
+        port=port,
+    )
+    if settings.anthropic_api_key:
+        await asyncio.to_thread(
+            add_sandbox_to_metadata_store,
+            api_key=settings.anthropic_api_key,
+            environment_id=settings.require_anthropic_environment_id(),
+            legacy_key=WEBHOOK_SANDBOX_METADATA_KEY,
+            store_key=WEBHOOK_SANDBOX_STORE_METADATA_KEY,
+            sandbox_id=sandbox.sandbox_id,
+        )
+    return sandbox
+
+
+async def stop_worker_sandbox(settings: Settings, sandbox_id: str) -> None:
+    await AsyncSandbox.kill(sandbox_id)
+    await asyncio.to_thread(open_sandbox_store().remove_sandbox, sandbox_id=sandbox_id)
+    if settings.anthropic_api_key and settings.anthropic_environment_id:
+        metadata_writer().remove(
+            api_key=settings.anthropic_api_key,
+            environment_id=settings.anthropic_environment_id,
+            sandbox_id=sandbox_id,
+        )
+        await asyncio.to_thread(metadata_writer().flush)
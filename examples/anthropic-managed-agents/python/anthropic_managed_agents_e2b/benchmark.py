@@ -0,0 +1,1172 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import importlib
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable, Iterator, Sequence
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass, replace
+from datetime import UTC, datetime
+from pathlib import Path
+from threading import Lock
+from types import ModuleType, SimpleNamespace
+from typing import TYPE_CHECKING, Any
+
+from e2b import NotFoundException
+
+from anthropic_managed_agents_e2b.app_resources import AppResources
+from anthropic_managed_agents_e2b.app_sandbox_store import (
+    JournalSandboxStore,
+    JsonSandboxStore,
+    SandboxAssignment,
+    SandboxStore,
+    SqliteSandboxStore,
+)
+from anthropic_managed_agents_e2b.keyed_locks import KeyedLocks
+from anthropic_managed_agents_e2b.sandbox_lifecycle import SandboxLifecycleManager, next_activity
+from anthropic_managed_agents_e2b.sandbox_worker import bootstrap_webhook_server
+from anthropic_managed_agents_e2b.settings import (
+    DEFAULT_APP_SANDBOX_TIMEOUT_SECONDS,
+    DEFAULT_SANDBOX_TIMEOUT_SECONDS,
+    EXAMPLE_ROOT,
+    MAX_WEBHOOK_BODY_BYTES,
+    Settings,
+)
+from anthropic_managed_agents_e2b.webhook_signature import read_verified_body
+
+if TYPE_CHECKING:
+    import anthropic
+
+STORE_BENCHMARK_BACKENDS = ("json", "journal", "sqlite")
+STORE_BENCHMARK_SIZES = (100, 1_000, 10_000)
+STORE_BENCHMARK_OPERATIONS = 200
+BOOTSTRAP_BENCHMARK_LATENCY_MS = 50.0
+BOOTSTRAP_BENCHMARK_REPEAT = 5
+LOCK_BENCHMARK_KEYS = 1_000_000
+LOCK_BENCHMARK_WARMUP_KEYS = 10_000
+# A leaked entry costs roughly 270 bytes, so even 100k leaked keys clear this budget.
+LOCK_BENCHMARK_MAX_RSS_GROWTH_MB = 16.0
+STARTUP_BENCHMARK_REPEAT = 5
+# What a fresh process imports before it can do useful work.
+STARTUP_BENCHMARK_TARGETS = {
+    "worker": "import anthropic_managed_agents_e2b.worker_runtime, anthropic",
+    "webhook-server": "import anthropic_managed_agents_e2b.webhook_runtime",
+}
+STARTUP_BUDGETS_MS = {"worker": 3500.0, "webhook-server": 1500.0}
+WEBHOOK_BENCHMARK_PAYLOAD_BYTES = 1_000_000
+# Uvicorn hands the body to the app in reads of up to 64 KiB.
+WEBHOOK_BENCHMARK_CHUNK_BYTES = 65_536
+WEBHOOK_BENCHMARK_REPEAT = 50
+LIFECYCLE_BENCHMARK_RESUME_MS = 1000.0
+LIFECYCLE_BENCHMARK_CREATE_MS = 2500.0
+LIFECYCLE_BENCHMARK_DAYS = 3.0
+# (keys, mean seconds between work items) for the synthetic trace: hot, warm, and cold keys.
+LIFECYCLE_BENCHMARK_PROFILE = ((20, 60.0), (50, 1200.0), (200, 6 * 3600.0))
+LOAD_BENCHMARK_TARGETS = ("app-webhook-server", "webhook-runtime")
+LOAD_BENCHMARK_CONCURRENCY = (1, 8, 32, 128)
+LOAD_BENCHMARK_REQUESTS = 400
+LOAD_BENCHMARK_SESSIONS = 100
+LOAD_BENCHMARK_API_MS = 20.0
+LOAD_BENCHMARK_SANDBOX_MS = 10.0
+LOAD_BENCHMARK_CREATE_MS = 150.0
+LOAD_BENCHMARK_WORKER_MS = 100.0
+LOAD_BENCHMARK_SETTLE_SECONDS = 120.0
+BENCHMARK_WEBHOOK_KEY = "whsec_" + base64.b64encode(b"benchmark-signing-key-0123456789").decode()
+BENCHMARK_SETTINGS = Settings(
+    anthropic_api_key=None,
+    anthropic_agent_id=None,
+    anthropic_environment_id="env_benchmark",
+    anthropic_environment_key="sk-ant-env-benchmark",
+    anthropic_webhook_signing_key="whsec_benchmark",
+    app_webhook_admin_token=None,
+    app_sandbox_routing_scope=None,
+)
+
+
+@dataclass(frozen=True)
+class LatencySummary:
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+@dataclass(frozen=True)
+class StoreBenchmarkResult:
+    backend: str
+    size: int
+    get: LatencySummary
+    upsert: LatencySummary
+
+
+def summarize_latencies(samples: Sequence[float]) -> LatencySummary:
+    ordered = sorted(samples)
+
+    def percentile(fraction: float) -> float:
+        index = min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))
+        return ordered[index] * 1000
+
+    return LatencySummary(
+        mean_ms=statistics.fmean(ordered) * 1000,
+        p50_ms=percentile(0.50),
+        p95_ms=percentile(0.95),
+        p99_ms=percentile(0.99),
+    )
+
+
+def _timed(operation: Callable[[], object], repeat: int) -> list[float]:
+    samples: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _open_benchmark_store(backend: str, directory: Path) -> SandboxStore:
+    if backend == "json":
+        return JsonSandboxStore(directory / "store.json")
+    if backend == "journal":
+        return JournalSandboxStore(directory / "store.jsonl")
+    if backend == "sqlite":
+        return SqliteSandboxStore(directory / "store.sqlite3")
+    raise ValueError(f"unknown store backend: {backend}")
+
+
+def _seed_store(store: SandboxStore, size: int) -> None:
+    now = datetime.now(UTC).isoformat()
+    assignments = [
+        SandboxAssignment(
+            environment_id="env_benchmark",
+            routing_scope="session",
+            routing_id=f"sesn_{index}",
+            session_id=f"sesn_{index}",
+            sandbox_id=f"sbx_{index}",
+            status="active",
+            created_at=now,
+            updated_at=now,
+        )
+        for index in range(size)
+    ]
+    if isinstance(store, JsonSandboxStore):
+        # Seeding through upsert() would be O(N^2) rewrites for the JSON store.
+        store._write(assignments)
+        return
+    for assignment in assignments:
+        store.upsert(
+            environment_id=assignment.environment_id,
+            routing_scope=assignment.routing_scope,
+            routing_id=assignment.routing_id,
+            session_id=assignment.session_id,
+            sandbox_id=assignment.sandbox_id,
+        )
+
+
+def benchmark_store(
+    *,
+    backends: Sequence[str] = STORE_BENCHMARK_BACKENDS,
+    sizes: Sequence[int] = STORE_BENCHMARK_SIZES,
+    operations: int = STORE_BENCHMARK_OPERATIONS,
+    seed: int = 0,
+) -> list[StoreBenchmarkResult]:
+    """Measure get/upsert latency of each store backend against stores of increasing size."""
+    results: list[StoreBenchmarkResult] = []
+    rng = random.Random(seed)
+    for backend in backends:
+        for size in sizes:
+            with tempfile.TemporaryDirectory() as directory:
+                store = _open_benchmark_store(backend, Path(directory))
+                _seed_store(store, size)
+
+                def get() -> None:
+                    index = rng.randrange(size)
+                    store.get(
+                        environment_id="env_benchmark",
+                        routing_scope="session",
+                        routing_id=f"sesn_{index}",
+                    )
+
+                def upsert() -> None:
+                    index = rng.randrange(size)
+                    store.upsert(
+                        environment_id="env_benchmark",
+                        routing_scope="session",
+                        routing_id=f"sesn_{index}",
+                        session_id=f"sesn_{index}",
+                        sandbox_id=f"sbx_{index}",
+                    )
+
+                results.append(
+                    StoreBenchmarkResult(
+                        backend=backend,
+                        size=size,
+                        get=summarize_latencies(_timed(get, operations)),
+                        upsert=summarize_latencies(_timed(upsert, operations)),
+                    )
+                )
+    return results
+
+
+def format_store_results(results: Sequence[StoreBenchmarkResult]) -> str:
+    lines = [
+        f"{'backend':<8} {'size':>7} {'get p50':>9} {'get p95':>9} "
+        f"{'upsert p50':>11} {'upsert p95':>11}",
+    ]
+    for result in results:
+        lines.append(
+            f"{result.backend:<8} {result.size:>7} "
+            f"{result.get.p50_ms:>7.3f}ms {result.get.p95_ms:>7.3f}ms "
+            f"{result.upsert.p50_ms:>9.3f}ms {result.upsert.p95_ms:>9.3f}ms"
+        )
+    return "\n".join(lines)
+
+
+class FakeSandbox:
+    """In-memory stand-in for ``e2b.Sandbox`` that sleeps ``latency`` seconds per API call."""
+
+    def __init__(self, sandbox_id: str = "sbx_fake", *, latency: float = 0.0) -> None:
+        self.sandbox_id = sandbox_id
+        self.latency = latency
+        self.round_trips = 0
+        self.stored_files: dict[str, str | bytes] = {}
+        self.commands = SimpleNamespace(run=self._run)
+        self.files = SimpleNamespace(
+            read=self._read, write=self._write, write_files=self._write_files
+        )
+
+    def _call(self) -> None:
+        self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _run(self, cmd: str, **_: object) -> SimpleNamespace:
+        self._call()
+        return SimpleNamespace(exit_code=0, stdout="", stderr="")
+
+    def _read(self, path: str, **_: object) -> str | bytes:
+        self._call()
+        if path not in self.stored_files:
+            raise NotFoundException(f"{path} not found")
+        return self.stored_files[path]
+
+    def _write(self, path: str, data: str | bytes, **_: object) -> None:
+        self._call()
+        self.stored_files[path] = data
+
+    def _write_files(self, files: list[dict[str, str | bytes]], **_: object) -> None:
+        self._call()
+        for file in files:
+            self.stored_files[str(file["path"])] = file["data"]
+
+
+@dataclass(frozen=True)
+class BootstrapBenchmarkResult:
+    mode: str
+    round_trips: int
+    latency: LatencySummary
+
+
+def benchmark_bootstrap(
+    *,
+    latency_ms: float = BOOTSTRAP_BENCHMARK_LATENCY_MS,
+    repeat: int = BOOTSTRAP_BENCHMARK_REPEAT,
+) -> list[BootstrapBenchmarkResult]:
+    """Time webhook sandbox bring-up against a fake sandbox, per-step versus batched."""
+    results: list[BootstrapBenchmarkResult] = []
+    for mode, batched, uploaded in (
+        ("per-step, cold", False, False),
+        ("batched, cold", True, False),
+        ("per-step, warm", False, True),
+        ("batched, warm", True, True),
+    ):
+        samples: list[float] = []
+        round_trips = 0
+        for _ in range(repeat):
+            sandbox = FakeSandbox(latency=latency_ms / 1000)
+            if uploaded:
+                bootstrap_webhook_server(
+                    sandbox,
+                    BENCHMARK_SETTINGS,
+                    worker_max_idle_seconds=None,
+                    log_level="INFO",
+                    port=8000,
+                )
+                sandbox.round_trips = 0
+            started = time.perf_counter()
+            bootstrap_webhook_server(
+                sandbox,
+                BENCHMARK_SETTINGS,
+                worker_max_idle_seconds=None,
+                log_level="INFO",
+                port=8000,
+                batched=batched,
+            )
+            samples.append(time.perf_counter() - started)
+            round_trips = sandbox.round_trips
+        results.append(
+            BootstrapBenchmarkResult(
+                mode=mode, round_trips=round_trips, latency=summarize_latencies(samples)
+            )
+        )
+    return results
+
+
+def format_bootstrap_results(results: Sequence[BootstrapBenchmarkResult]) -> str:
+    lines = [f"{'mode':<16} {'round trips':>11} {'mean':>10} {'p95':>10}"]
+    for result in results:
+        lines.append(
+            f"{result.mode:<16} {result.round_trips:>11} "
+            f"{result.latency.mean_ms:>8.1f}ms {result.latency.p95_ms:>8.1f}ms"
+        )
+    return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class LockBenchmarkResult:
+    registry: str
+    keys: int
+    live_entries: int
+    rss_start_mb: float
+    rss_end_mb: float
+    seconds: float
+
+
+class _UnboundedLocks:
+    """The previous registry: a ``setdefault`` dict that keeps every key's lock forever."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._entries: dict[Hashable, Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def hold(self, key: Hashable) -> AbstractContextManager[object]:
+        with self._lock:
+            return self._entries.setdefault(key, Lock())
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1_048_576
+    except OSError:
+        # Peak rather than current RSS, but still flat when nothing accumulates.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def benchmark_locks(*, keys: int = LOCK_BENCHMARK_KEYS) -> list[LockBenchmarkResult]:
+    """Lock one fresh session-scoped routing key at a time and watch resident memory."""
+    results: list[LockBenchmarkResult] = []
+    # The refcounted registry runs first so the unbounded one cannot inflate its baseline.
+    for name, registry in (("refcounted", KeyedLocks()), ("unbounded", _UnboundedLocks())):
+        for index in range(LOCK_BENCHMARK_WARMUP_KEYS):
+            with registry.hold(("env_benchmark", "session", f"warmup_{index}")):
+                pass
+        rss_start = _rss_mb()
+        started = time.perf_counter()
+        for index in range(keys):
+            with registry.hold(("env_benchmark", "session", f"sesn_{index}")):
+                pass
+        results.append(
+            LockBenchmarkResult(
+                registry=name,
+                keys=keys,
+                live_entries=len(registry),
+                rss_start_mb=rss_start,
+                rss_end_mb=_rss_mb(),
+                seconds=time.perf_counter() - started,
+            )
+        )
+    return results
+
+
+def lock_budget_failures(
+    results: Sequence[LockBenchmarkResult],
+    *,
+    max_rss_growth_mb: float = LOCK_BENCHMARK_MAX_RSS_GROWTH_MB,
+) -> list[str]:
+    """Leaks in the refcounted registry; the unbounded one is the baseline and is expected to."""
+    failures: list[str] = []
+    for result in results:
+        if result.registry != "refcounted":
+            continue
+        if result.live_entries:
+            failures.append(
+                f"{result.registry}: {result.live_entries} lock entries still live after release"
+            )
+        growth = result.rss_end_mb - result.rss_start_mb
+        if growth > max_rss_growth_mb:
+            failures.append(
+                f"{result.registry}: RSS grew {growth:.1f}MB over {result.keys} keys, "
+                f"more than the {max_rss_growth_mb:.0f}MB budget"
+            )
+    return failures
+
+
+def format_lock_results(results: Sequence[LockBenchmarkResult]) -> str:
+    lines = [f"{'registry':<12} {'keys':>9} {'live':>9} {'rss growth':>12} {'per key':>10}"]
+    for result in results:
+        lines.append(
+            f"{result.registry:<12} {result.keys:>9} {result.live_entries:>9} "
+            f"{result.rss_end_mb - result.rss_start_mb:>10.1f}MB "
+            f"{result.seconds / result.keys * 1_000_000:>8.2f}us"
+        )
+    return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class StartupBenchmarkResult:
+    target: str
+    wall: LatencySummary
+    import_ms: float
+    heaviest: tuple[tuple[str, float], ...]
+
+
+def _top_level_imports(importtime_log: str) -> dict[str, float]:
+    """Cumulative milliseconds per top-level import in ``python -X importtime`` output."""
+    imports: dict[str, float] = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        imports[name.strip()] = int(cumulative) / 1000
+    return imports
+
+
+def benchmark_startup(
+    *,
+    targets: Sequence[str] = tuple(STARTUP_BENCHMARK_TARGETS),
+    repeat: int = STARTUP_BENCHMARK_REPEAT,
+) -> list[StartupBenchmarkResult]:
+    """Start a fresh interpreter per sample and time the imports each runtime needs."""
+    env = {**os.environ, "PYTHONPATH": str(EXAMPLE_ROOT)}
+    results: list[StartupBenchmarkResult] = []
+    for target in targets:
+        samples: list[float] = []
+        import_totals: list[float] = []
+        imports: dict[str, float] = {}
+        for _ in range(repeat):
+            started = time.perf_counter()
+            completed = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", STARTUP_BENCHMARK_TARGETS[target]],
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            samples.append(time.perf_counter() - started)
+            imports = _top_level_imports(completed.stderr)
+            import_totals.append(sum(imports.values()))
+        heaviest = sorted(imports.items(), key=lambda item: item[1], reverse=True)[:3]
+        results.append(
+            StartupBenchmarkResult(
+                target=target,
+                wall=summarize_latencies(samples),
+                import_ms=statistics.median(import_totals),
+                heaviest=tuple(heaviest),
+            )
+        )
+    return results
+
+
+def startup_budget_failures(
+    results: Sequence[StartupBenchmarkResult], budgets_ms: dict[str, float]
+) -> list[str]:
+    return [
+        f"{result.target}: {result.wall.p50_ms:.0f}ms exceeds the {budgets_ms[result.target]:.0f}ms"
+        " startup budget"
+        for result in results
+        if result.target in budgets_ms and result.wall.p50_ms > budgets_ms[result.target]
+    ]
+
+
+def format_startup_results(results: Sequence[StartupBenchmarkResult]) -> str:
+    lines = [f"{'target':<16} {'p50':>10} {'p95':>10} {'imports':>10}  heaviest imports"]
+    for result in results:
+        heaviest = ", ".join(f"{name} {ms:.0f}ms" for name, ms in result.heaviest)
+        lines.append(
+            f"{result.target:<16} {result.wall.p50_ms:>8.0f}ms {result.wall.p95_ms:>8.0f}ms "
+            f"{result.import_ms:>8.0f}ms  {heaviest}"
+        )
+    return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class LifecycleBenchmarkResult:
+    policy: str
+    arrivals: int
+    warm_hits: int
+    resumes: int
+    creates: int
+    running_hours: float
+    added_latency_ms: float
+    cost_saved_pct: float
+
+
+def synthetic_lifecycle_trace(
+    *, days: float = LIFECYCLE_BENCHMARK_DAYS, seed: int = 0
+) -> dict[str, list[float]]:
+    """Poisson arrivals per key, mixing the hot, warm, and cold keys of the benchmark profile."""
+    rng = random.Random(seed)
+    horizon = days * 86_400
+    trace: dict[str, list[float]] = {}
+    for profile, (keys, mean_gap) in enumerate(LIFECYCLE_BENCHMARK_PROFILE):
+        for index in range(keys):
+            at = rng.expovariate(1 / mean_gap)
+            times: list[float] = []
+            while at < horizon:
+                times.append(at)
+                at += rng.expovariate(1 / mean_gap)
+            trace[f"profile{profile}/key{index}"] = times
+    return trace
+
+
+def _replay_lifecycle(
+    trace: dict[str, list[float]],
+    manager: SandboxLifecycleManager,
+    *,
+    default_timeout: int,
+    resume_ms: float,
+    create_ms: float,
+) -> tuple[int, int, int, int, float, float]:
+    arrivals = warm_hits = resumes = creates = 0
+    running_seconds = latency_ms = 0.0
+    for times in trace.values():
+        previous: SandboxAssignment | None = None
+        timeout = default_timeout
+        for at in times:
+            now = datetime.fromtimestamp(at, UTC)
+            arrivals += 1
+            if previous is None:
+                creates += 1
+                latency_ms += create_ms
+            else:
+                idle = at - datetime.fromisoformat(previous.updated_at).timestamp()
+                if idle <= timeout:
+                    warm_hits += 1
+                    running_seconds += idle
+                else:
+                    running_seconds += timeout
+                    if manager.adaptive and manager.policy.should_kill(
+                        previous.arrivals, previous.mean_gap_seconds, idle
+                    ):
+                        creates += 1
+                        latency_ms += create_ms
+                    else:
+                        resumes += 1
+                        latency_ms += resume_ms
+            count, mean_gap = next_activity(previous, now)
+            timeout = manager.timeout_seconds(count, mean_gap, default_seconds=default_timeout)
+            previous = SandboxAssignment(
+                environment_id="env_benchmark",
+                routing_scope="session",
+                routing_id="benchmark",
+                session_id="benchmark",
+                sandbox_id="benchmark",
+                status="active",
+                created_at=now.isoformat(),
+                updated_at=now.isoformat(),
+                arrivals=count,
+                mean_gap_seconds=mean_gap,
+            )
+        if previous is not None:
+            running_seconds += timeout
+    return arrivals, warm_hits, resumes, creates, running_seconds, latency_ms
+
+
+def benchmark_lifecycle(
+    trace: dict[str, list[float]],
+    *,
+    default_timeout: int = DEFAULT_APP_SANDBOX_TIMEOUT_SECONDS,
+    resume_ms: float = LIFECYCLE_BENCHMARK_RESUME_MS,
+    create_ms: float = LIFECYCLE_BENCHMARK_CREATE_MS,
+) -> list[LifecycleBenchmarkResult]:
+    """Replay arrivals against fixed timeouts and the adaptive policy.
+
+    Cost is the time sandboxes spend running; paused storage is not counted. Added latency is
+    the mean wait per work item for a resume or a fresh create. Savings are relative to the
+    fixed ``default_timeout``, which is what the server uses without ``APP_SANDBOX_LIFECYCLE``.
+    """
+    policies = (
+        (f"fixed {default_timeout}s", SandboxLifecycleManager(mode="fixed"), default_timeout),
+        (
+            f"fixed {DEFAULT_SANDBOX_TIMEOUT_SECONDS}s",
+            SandboxLifecycleManager(mode="fixed"),
+            DEFAULT_SANDBOX_TIMEOUT_SECONDS,
+        ),
+        ("adaptive", SandboxLifecycleManager(mode="adaptive"), default_timeout),
+    )
+    results: list[LifecycleBenchmarkResult] = []
+    baseline_seconds: float | None = None
+    for name, manager, timeout in policies:
+        arrivals, warm_hits, resumes, creates, running_seconds, latency_ms = _replay_lifecycle(
+            trace, manager, default_timeout=timeout, resume_ms=resume_ms, create_ms=create_ms
+        )
+        if baseline_seconds is None:
+            baseline_seconds = running_seconds
+        results.append(
+            LifecycleBenchmarkResult(
+                policy=name,
+                arrivals=arrivals,
+                warm_hits=warm_hits,
+                resumes=resumes,
+                creates=creates,
+                running_hours=running_seconds / 3600,
+                added_latency_ms=latency_ms / arrivals if arrivals else 0.0,
+                cost_saved_pct=(
+                    100 * (1 - running_seconds / baseline_seconds) if baseline_seconds else 0.0
+                ),
+            )
+        )
+    return results
+
+
+def format_lifecycle_results(results: Sequence[LifecycleBenchmarkResult]) -> str:
+    lines = [
+        f"{'policy':<14} {'arrivals':>9} {'warm':>8} {'resumes':>8} {'creates':>8} "
+        f"{'running':>10} {'latency':>10} {'saved':>8}"
+    ]
+    for result in results:
+        lines.append(
+            f"{result.policy:<14} {result.arrivals:>9} {result.warm_hits:>8} "
+            f"{result.resumes:>8} {result.creates:>8} {result.running_hours:>9.1f}h "
+            f"{result.added_latency_ms:>8.0f}ms {result.cost_saved_pct:>7.1f}%"
+        )
+    return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class WebhookBenchmarkResult:
+    path: str
+    payload_bytes: int
+    latency: LatencySummary
+    peak_mb: float
+
+
+def _signed_webhook(payload_bytes: int) -> tuple[str, bytes, dict[str, str]]:
+    from standardwebhooks import Webhook
+
+    key = BENCHMARK_WEBHOOK_KEY
+    event = {"type": "event", "id": "wevt_benchmark", "data": {"type": "session.status_idled"}}
+    padding = payload_bytes - len(json.dumps({**event, "padding": ""}))
+    body = json.dumps({**event, "padding": "x" * max(0, padding)}).encode()
+    timestamp = datetime.now(UTC)
+    headers = {
+        "content-length": str(len(body)),
+        "content-type": "application/json",
+        "webhook-id": "msg_benchmark",
+        "webhook-timestamp": str(int(timestamp.timestamp())),
+        "webhook-signature": Webhook(key).sign("msg_benchmark", timestamp, body.decode()),
+    }
+    return key, body, headers
+
+
+async def _chunks(body: bytes) -> AsyncIterator[bytes]:
+    for start in range(0, len(body), WEBHOOK_BENCHMARK_CHUNK_BYTES):
+        yield body[start : start + WEBHOOK_BENCHMARK_CHUNK_BYTES]
+
+
+async def _buffered_verify(key: str, body: bytes, headers: dict[str, str]) -> object:
+    """What the servers did before: buffer, join, decode, copy headers, then unwrap()."""
+    from standardwebhooks import Webhook
+
+    chunks: list[bytes] = []
+    size = 0
+    async for chunk in _chunks(body):
+        size += len(chunk)
+        if size > MAX_WEBHOOK_BODY_BYTES:
+            raise ValueError("request body too large")
+        chunks.append(chunk)
+    payload = b"".join(chunks).decode()
+    # beta.webhooks.unwrap() verifies with standardwebhooks and then parses the JSON again.
+    Webhook(key).verify(payload, dict(headers))
+    return json.loads(payload)
+
+
+async def _streaming_verify(key: str, body: bytes, headers: dict[str, str]) -> object:
+    payload = await read_verified_body(
+        _chunks(body), headers, key=key, max_bytes=MAX_WEBHOOK_BODY_BYTES
+    )
+    return json.loads(payload)
+
+
+async def _time_verify(
+    verify: Callable[[str, bytes, dict[str, str]], Awaitable[object]],
+    signed: tuple[str, bytes, dict[str, str]],
+    repeat: int,
+) -> list[float]:
+    await verify(*signed)
+    samples: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await verify(*signed)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def benchmark_webhook_verification(
+    *,
+    payload_bytes: int = WEBHOOK_BENCHMARK_PAYLOAD_BYTES,
+    repeat: int = WEBHOOK_BENCHMARK_REPEAT,
+) -> list[WebhookBenchmarkResult]:
+    """Verify and parse one signed payload fed in 64 KiB chunks, as the webhook handlers do."""
+    signed = _signed_webhook(payload_bytes)
+    results: list[WebhookBenchmarkResult] = []
+    for name, verify in (("buffered", _buffered_verify), ("streaming", _streaming_verify)):
+        samples = asyncio.run(_time_verify(verify, signed, repeat))
+        tracemalloc.start()
+        asyncio.run(verify(*signed))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append(
+            WebhookBenchmarkResult(
+                path=name,
+                payload_bytes=len(signed[1]),
+                latency=summarize_latencies(samples),
+                peak_mb=peak / 1_048_576,
+            )
+        )
+    return results
+
+
+def format_webhook_results(results: Sequence[WebhookBenchmarkResult]) -> str:
+    lines = [f"{'path':<10} {'payload':>9} {'p50':>9} {'p95':>9} {'peak memory':>12}"]
+    for result in results:
+        lines.append(
+            f"{result.path:<10} {result.payload_bytes:>9} {result.latency.p50_ms:>7.2f}ms "
+            f"{result.latency.p95_ms:>7.2f}ms {result.peak_mb:>10.2f}MB"
+        )
+    return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class LoadBenchmarkResult:
+    target: str
+    concurrency: int
+    requests: int
+    requests_per_second: float
+    latency: LatencySummary
+    work_latency: LatencySummary | None
+    sandbox_creates: int | None
+    sandbox_connects: int | None
+    worker_starts: int
+    lock_contended: int | None
+
+
+def _sdk_http() -> ModuleType:
+    """The HTTP package the installed SDK is built on: ``httpx``, or ``httpx2`` from 1.x on."""
+    import anthropic
+
+    client_class = next(
+        base for base in anthropic.DefaultAsyncHttpxClient.__mro__ if base.__name__ == "AsyncClient"
+    )
+    return importlib.import_module(client_class.__module__.partition(".")[0])
+
+
+class FakeWorkApi:
+    """In-process stand-in for the self-hosted environment work endpoints.
+
+    ``client()`` returns a real ``AsyncAnthropic`` whose transport calls ``handle()``, so the
+    SDK poller, its scoped client, and the connection pool run unchanged. Every request sleeps
+    ``latency`` seconds, and an empty poll is held for its ``block_ms`` like the real long-poll.
+    """
+
+    def __init__(self, *, environment_id: str, latency: float) -> None:
+        self.environment_id = environment_id
+        self.latency = latency
+        self.queued: asyncio.Queue[dict[str, object]] = asyncio.Queue()
+        self.claimed: dict[str, dict[str, object]] = {}
+        self.enqueued_at: dict[str, float] = {}
+        self.requests = 0
+        self.http = _sdk_http()
+
+    def enqueue(self, session_id: str) -> str:
+        work_id = f"work_load_{len(self.enqueued_at):06d}"
+        self.enqueued_at[work_id] = time.perf_counter()
+        self.queued.put_nowait(
+            {
+                "type": "work",
+                "id": work_id,
+                "environment_id": self.environment_id,
+                "created_at": datetime.now(UTC).isoformat(),
+                "metadata": {},
+                "state": "queued",
+                "data": {"type": "session", "id": session_id},
+            }
+        )
+        return work_id
+
+    async def handle(self, request: Any) -> Any:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        path = request.url.path
+        if not path.endswith("/work/poll"):
+            # ack and stop: .../work/{work_id}/{action}
+            work_id = path.rsplit("/", 2)[-2]
+            return self.http.Response(200, json={**self.claimed[work_id], "state": "active"})
+        block_ms = request.url.params.get("block_ms")
+        try:
+            if block_ms:
+                item = await asyncio.wait_for(self.queued.get(), int(block_ms) / 1000)
+            else:
+                item = self.queued.get_nowait()
+        except (TimeoutError, asyncio.QueueEmpty):
+            return self.http.Response(
+                200, content=b"null", headers={"content-type": "application/json"}
+            )
+        self.claimed[str(item["id"])] = item
+        return self.http.Response(200, json=item)
+
+    def client(self) -> anthropic.AsyncAnthropic:
+        import anthropic
+
+        return anthropic.AsyncAnthropic(
+            api_key="sk-ant-load-test",
+            http_client=anthropic.DefaultAsyncHttpxClient(
+                transport=self.http.MockTransport(self.handle)
+            ),
+        )
+
+
+class FakeSandboxApi:
+    """Stand-in for the ``e2b.Sandbox`` class methods, handing out ``FakeSandbox`` instances."""
+
+    def __init__(self, *, latency: float, create_latency: float) -> None:
+        self.latency = latency
+        self.create_latency = create_latency
+        self.sandboxes: dict[str, FakeSandbox] = {}
+        self.creates = 0
+        self.connects = 0
+        self._lock = Lock()
+
+    def create(self, template: str, **_: object) -> FakeSandbox:
+        time.sleep(self.create_latency)
+        with self._lock:
+            self.creates += 1
+            sandbox = FakeSandbox(f"sbx_load_{self.creates:06d}", latency=self.latency)
+            self.sandboxes[sandbox.sandbox_id] = sandbox
+        return sandbox
+
+    def connect(self, sandbox_id: str, **_: object) -> FakeSandbox:
+        time.sleep(self.latency)
+        with self._lock:
+            self.connects += 1
+            sandbox = self.sandboxes.get(sandbox_id)
+        if sandbox is None:
+            raise NotFoundException(f"sandbox {sandbox_id} not found")
+        return sandbox
+
+
+def _load_test_supervisor(max_workers: int, *, run_seconds: float) -> object:
+    """A ``WorkerSupervisor`` whose worker processes are sleeps instead of subprocesses."""
+    # Imported here so the other benchmarks and CLI commands do not load FastAPI.
+    from anthropic_managed_agents_e2b.webhook_runtime import WorkerSupervisor
+
+    class LoadTestSupervisor(WorkerSupervisor):
+        started = 0
+
+        @property
+        def idle(self) -> bool:
+            return not (self.active or self.pending)
+
+        async def _start(self) -> None:
+            self.started += 1
+            pid = self.started
+            self.children[pid] = SimpleNamespace(pid=pid)
+            self._spawn(self._exit(pid))
+
+        async def _exit(self, pid: int) -> None:
+            await asyncio.sleep(run_seconds)
+            del self.children[pid]
+            await self._start_pending()
+
+    return LoadTestSupervisor(max_workers)
+
+
+@contextmanager
+def _patched(module: ModuleType, **attributes: object) -> Iterator[None]:
+    saved = {name: getattr(module, name) for name in attributes}
+    for name, value in attributes.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+def _signed_run_started(index: int, session_id: str) -> tuple[bytes, dict[str, str]]:
+    from standardwebhooks import Webhook
+
+    event_id = f"wevt_load_{index:06d}"
+    body = json.dumps(
+        {
+            "type": "event",
+            "id": event_id,
+            "created_at": datetime.now(UTC).isoformat(),
+            "data": {"type": "session.status_run_started", "id": session_id},
+        }
+    ).encode()
+    timestamp = datetime.now(UTC)
+    headers = {
+        "content-type": "application/json",
+        "webhook-id": event_id,
+        "webhook-timestamp": str(int(timestamp.timestamp())),
+        "webhook-signature": Webhook(BENCHMARK_WEBHOOK_KEY).sign(
+            event_id, timestamp, body.decode()
+        ),
+    }
+    return body, headers
+
+
+async def _send_webhooks(
+    app: object,
+    webhooks: Sequence[tuple[str, bytes, dict[str, str]]],
+    *,
+    concurrency: int,
+    before_send: Callable[[str], object],
+) -> tuple[list[float], float]:
+    """POST each webhook to ``app`` from ``concurrency`` clients; return latencies and wall time."""
+    http = _sdk_http()
+    pending = iter(webhooks)
+    samples: list[float] = []
+    async with http.AsyncClient(
+        transport=http.ASGITransport(app=app), base_url="http://load-test"
+    ) as client:
+
+        async def sender() -> None:
+            for session_id, body, headers in pending:
+                before_send(session_id)
+                started = time.perf_counter()
+                response = await client.post("/webhook", content=body, headers=headers)
+                samples.append(time.perf_counter() - started)
+                if response.status_code != 204:
+                    raise RuntimeError(f"webhook returned {response.status_code}: {response.text}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(sender() for _ in range(concurrency)))
+        return samples, time.perf_counter() - started
+
+
+async def _settle(done: Callable[[], bool], *, timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    while not done():
+        if time.perf_counter() > deadline:
+            raise RuntimeError("load test work did not finish before the settle timeout")
+        await asyncio.sleep(0.005)
+
+
+async def _load_app_webhook_server(
+    webhooks: Sequence[tuple[str, bytes, dict[str, str]]],
+    *,
+    concurrency: int,
+    routing_scope: str,
+    backend: str,
+    directory: Path,
+    api_ms: float,
+    sandbox_ms: float,
+    create_ms: float,
+) -> LoadBenchmarkResult:
+    import anthropic
+
+    from anthropic_managed_agents_e2b import app_webhook_server, sandbox_worker
+
+    settings = replace(
+        BENCHMARK_SETTINGS,
+        anthropic_webhook_signing_key=BENCHMARK_WEBHOOK_KEY,
+        app_sandbox_routing_scope=routing_scope,
+    )
+    work_api = FakeWorkApi(
+        environment_id=settings.require_anthropic_environment_id(), latency=api_ms / 1000
+    )
+    sandbox_api = FakeSandboxApi(latency=sandbox_ms / 1000, create_latency=create_ms / 1000)
+    # Without an API key the shared clients must be passed in, and metadata writes are skipped.
+    resources = AppResources(
+        settings,
+        client=anthropic.Anthropic(api_key="sk-ant-load-test"),
+        async_client=work_api.client(),
+    )
+    locks = KeyedLocks()
+    finished: dict[str, float] = {}
+    ensure_worker_for_work = app_webhook_server.ensure_worker_for_work
+
+    def timed_ensure_worker(settings: Settings, work: object) -> object:
+        result = ensure_worker_for_work(settings, work)
+        finished[work.id] = time.perf_counter()
+        return result
+
+    with (
+        _patched(sandbox_worker, Sandbox=sandbox_api),
+        _patched(
+            app_webhook_server,
+            store=_open_benchmark_store(backend, directory),
+            resources=resources,
+            dispatcher=None,
+            drain_coalescer=None,
+            seen_webhook_events=None,
+            lifecycle=None,
+            worker_locks=locks,
+            ensure_worker_for_work=timed_ensure_worker,
+        ),
+    ):
+        try:
+            samples, elapsed = await _send_webhooks(
+                app_webhook_server.app,
+                webhooks,
+                concurrency=concurrency,
+                before_send=work_api.enqueue,
+            )
+            await _settle(
+                lambda: len(finished) == len(webhooks), timeout=LOAD_BENCHMARK_SETTLE_SECONDS
+            )
+        finally:
+            if app_webhook_server.drain_coalescer is not None:
+                await app_webhook_server.drain_coalescer.aclose()
+            if app_webhook_server.dispatcher is not None:
+                app_webhook_server.dispatcher.shutdown()
+            await resources.aclose()
+
+    return LoadBenchmarkResult(
+        target="app-webhook-server",
+        concurrency=concurrency,
+        requests=len(samples),
+        requests_per_second=len(samples) / elapsed,
+        latency=summarize_latencies(samples),
+        work_latency=summarize_latencies(
+            [finished[work_id] - work_api.enqueued_at[work_id] for work_id in finished]
+        ),
+        sandbox_creates=sandbox_api.creates,
+        sandbox_connects=sandbox_api.connects,
+        worker_starts=len(finished),
+        lock_contended=locks.contended,
+    )
+
+
+async def _load_webhook_runtime(
+    webhooks: Sequence[tuple[str, bytes, dict[str, str]]],
+    *,
+    concurrency: int,
+    max_workers: int,
+    worker_ms: float,
+) -> LoadBenchmarkResult:
+    from anthropic_managed_agents_e2b import webhook_runtime
+
+    supervisor = _load_test_supervisor(max_workers, run_seconds=worker_ms / 1000)
+    # The server's lifespan, which is not run here, builds the cached client before traffic.
+    webhook_runtime.webhook_client()
+    with _patched(
+        webhook_runtime,
+        supervisor=supervisor,
+        webhook_signing_key=lambda: BENCHMARK_WEBHOOK_KEY,
+    ):
+        samples, elapsed = await _send_webhooks(
+            webhook_runtime.app, webhooks, concurrency=concurrency, before_send=lambda _: None
+        )
+        await _settle(lambda: supervisor.idle, timeout=LOAD_BENCHMARK_SETTLE_SECONDS)
+
+    return LoadBenchmarkResult(
+        target="webhook-runtime",
+        concurrency=concurrency,
+        requests=len(samples),
+        requests_per_second=len(samples) / elapsed,
+        latency=summarize_latencies(samples),
+        work_latency=None,
+        sandbox_creates=None,
+        sandbox_connects=None,
+        worker_starts=supervisor.started,
+        lock_contended=None,
+    )
+
+
+def benchmark_load(
+    *,
+    targets: Sequence[str] = LOAD_BENCHMARK_TARGETS,
+    concurrency: Sequence[int] = LOAD_BENCHMARK_CONCURRENCY,
+    requests: int = LOAD_BENCHMARK_REQUESTS,
+    sessions: int = LOAD_BENCHMARK_SESSIONS,
+    routing_scope: str = "session",
+    backend: str = "journal",
+    api_ms: float = LOAD_BENCHMARK_API_MS,
+    sandbox_ms: float = LOAD_BENCHMARK_SANDBOX_MS,
+    create_ms: float = LOAD_BENCHMARK_CREATE_MS,
+    worker_ms: float = LOAD_BENCHMARK_WORKER_MS,
+    max_workers: int = 4,
+) -> list[LoadBenchmarkResult]:
+    """Drive both webhook apps with signed run-started webhooks at increasing concurrency.
+
+    Nothing leaves the process: the apps are called through ASGI, the Anthropic work queue is a
+    ``FakeWorkApi``, E2B is a ``FakeSandboxApi``, and the in-sandbox supervisor sleeps instead of
+    spawning workers. Each webhook for the app server first queues one work item, and is counted
+    done once its worker sandbox is ready.
+    """
+    results: list[LoadBenchmarkResult] = []
+    for level in concurrency:
+        webhooks = []
+        for index in range(requests):
+            session_id = f"sesn_load_{index % sessions:06d}"
+            webhooks.append((session_id, *_signed_run_started(index, session_id)))
+        for target in targets:
+            if target == "app-webhook-server":
+                with tempfile.TemporaryDirectory() as directory:
+                    run = _load_app_webhook_server(
+                        webhooks,
+                        concurrency=level,
+                        routing_scope=routing_scope,
+                        backend=backend,
+                        directory=Path(directory),
+                        api_ms=api_ms,
+                        sandbox_ms=sandbox_ms,
+                        create_ms=create_ms,
+                    )
+                    results.append(asyncio.run(run))
+            elif target == "webhook-runtime":
+                run = _load_webhook_runtime(
+                    webhooks, concurrency=level, max_workers=max_workers, worker_ms=worker_ms
+                )
+                results.append(asyncio.run(run))
+            else:
+                raise ValueError(f"unknown load test target: {target}")
+    return results
+
+
+def load_budget_failures(results: Sequence[LoadBenchmarkResult], *, max_p95_ms: float) -> list[str]:
+    return [
+        f"{result.target} at concurrency {result.concurrency}: "
+        f"p95 {result.latency.p95_ms:.1f}ms exceeds {max_p95_ms:.1f}ms"
+        for result in results
+        if result.latency.p95_ms > max_p95_ms
+    ]
+
+
+def format_load_results(results: Sequence[LoadBenchmarkResult]) -> str:
+    def count(value: int | None) -> str:
+        return "-" if value is None else str(value)
+
+    lines = [
+        f"{'target':<19} {'conc':>5} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} "
+        f"{'work p95':>10} {'creates':>8} {'connects':>9} {'starts':>7} {'contended':>10}"
+    ]
+    for result in results:
+        work_p95 = "-" if result.work_latency is None else f"{result.work_latency.p95_ms:.1f}ms"
+        lines.append(
+            f"{result.target:<19} {result.concurrency:>5} {result.requests_per_second:>8.0f} "
+            f"{result.latency.p50_ms:>7.2f}ms {result.latency.p95_ms:>7.2f}ms "
+            f"{result.latency.p99_ms:>7.2f}ms {work_p95:>10} {count(result.sandbox_creates):>8} "
+            f"{count(result.sandbox_connects):>9} {result.worker_starts:>7} "
+            f"{count(result.lock_contended):>10}"
+        )
+    return "\n".join(lines)
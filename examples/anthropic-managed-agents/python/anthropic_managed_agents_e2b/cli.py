@@ -1,9 +1,53 @@
 from __future__ import annotations
 
 import argparse
+from datetime import timedelta
 from pathlib import Path
 
 from anthropic_managed_agents_e2b.agent import DEFAULT_MODEL, create_agent
+from anthropic_managed_agents_e2b.app_sandbox_store import open_sandbox_store
+from anthropic_managed_agents_e2b.benchmark import (
+    BOOTSTRAP_BENCHMARK_LATENCY_MS,
+    BOOTSTRAP_BENCHMARK_REPEAT,
+    LIFECYCLE_BENCHMARK_CREATE_MS,
+    LIFECYCLE_BENCHMARK_DAYS,
+    LIFECYCLE_BENCHMARK_RESUME_MS,
+    LOAD_BENCHMARK_API_MS,
+    LOAD_BENCHMARK_CONCURRENCY,
+    LOAD_BENCHMARK_CREATE_MS,
+    LOAD_BENCHMARK_REQUESTS,
+    LOAD_BENCHMARK_SANDBOX_MS,
+    LOAD_BENCHMARK_SESSIONS,
+    LOAD_BENCHMARK_TARGETS,
+    LOAD_BENCHMARK_WORKER_MS,
+    LOCK_BENCHMARK_KEYS,
+    STARTUP_BENCHMARK_REPEAT,
+    STARTUP_BENCHMARK_TARGETS,
+    STARTUP_BUDGETS_MS,
+    STORE_BENCHMARK_BACKENDS,
+    STORE_BENCHMARK_OPERATIONS,
+    STORE_BENCHMARK_SIZES,
+    WEBHOOK_BENCHMARK_PAYLOAD_BYTES,
+    WEBHOOK_BENCHMARK_REPEAT,
+    benchmark_bootstrap,
+    benchmark_lifecycle,
+    benchmark_load,
+    benchmark_locks,
+    benchmark_startup,
+    benchmark_store,
+    benchmark_webhook_verification,
+    format_bootstrap_results,
+    format_lifecycle_results,
+    format_load_results,
+    format_lock_results,
+    format_startup_results,
+    format_store_results,
+    format_webhook_results,
+    load_budget_failures,
+    lock_budget_failures,
+    startup_budget_failures,
+    synthetic_lifecycle_trace,
+)
 from anthropic_managed_agents_e2b.environment import (
     WEBHOOK_SANDBOX_METADATA_KEY,
     WEBHOOK_SANDBOX_STORE_METADATA_KEY,
@@ -14,6 +58,13 @@ from anthropic_managed_agents_e2b.environment import (
     retrieve_environment,
     sandbox_store,
 )
+from anthropic_managed_agents_e2b.sandbox_lifecycle import read_trace
+from anthropic_managed_agents_e2b.sandbox_reaper import (
+    DEFAULT_REAP_PARALLELISM,
+    ReapSelection,
+    reap_sandboxes,
+    select_sandboxes,
+)
 from anthropic_managed_agents_e2b.sandbox_worker import (
     REMOTE_LOG,
     REMOTE_WEBHOOK_LOG,
@@ -24,6 +75,7 @@ from anthropic_managed_agents_e2b.sandbox_worker import (
 )
 from anthropic_managed_agents_e2b.session import stream_message
 from anthropic_managed_agents_e2b.settings import (
+    DEFAULT_APP_SANDBOX_TIMEOUT_SECONDS,
     DEFAULT_LOG_LEVEL,
     DEFAULT_SANDBOX_TIMEOUT_SECONDS,
     DEFAULT_TEMPLATE_NAME,
@@ -194,6 +246,58 @@ def stop_worker_main() -> None:
     print(f"killed {args.sandbox_id}")
 
 
+def reap_workers_main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Kill many E2B sandboxes at once and clean up the store and metadata."
+    )
+    parser.add_argument(
+        "--older-than",
+        type=float,
+        metavar="SECONDS",
+        help="Only sandboxes created at least this many seconds ago.",
+    )
+    parser.add_argument(
+        "--status", action="append", default=[], help="Store assignment status to reap."
+    )
+    parser.add_argument(
+        "--routing-scope", action="append", default=[], help="Store routing scope to reap."
+    )
+    parser.add_argument(
+        "--managed-by", help="Also reap E2B sandboxes whose managed_by metadata matches."
+    )
+    parser.add_argument("--parallelism", type=int, default=DEFAULT_REAP_PARALLELISM)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Print the selection without killing."
+    )
+    args = parser.parse_args()
+
+    settings = load_settings()
+    store = open_sandbox_store()
+    selection = ReapSelection(
+        older_than=None if args.older_than is None else timedelta(seconds=args.older_than),
+        statuses=frozenset(args.status),
+        routing_scopes=frozenset(args.routing_scope),
+        managed_by=args.managed_by,
+    )
+    sandbox_ids = select_sandboxes(settings, store, selection)
+    if args.dry_run:
+        for sandbox_id in sandbox_ids:
+            print(sandbox_id)
+        print(f"selected {len(sandbox_ids)}")
+        return
+
+    result = reap_sandboxes(settings, store, sandbox_ids, parallelism=args.parallelism)
+    for sandbox_id in result.killed:
+        print(f"killed {sandbox_id}")
+    for sandbox_id in result.failed:
+        print(f"failed {sandbox_id}")
+    print(
+        f"selected={len(result.selected)} killed={len(result.killed)} failed={len(result.failed)}"
+    )
+    if result.failed:
+        raise SystemExit(1)
+
+
 def send_message_main() -> None:
     parser = argparse.ArgumentParser(
         description="Create a Managed Agents session and send a message."
@@ -225,3 +329,192 @@ def upload_file_main() -> None:
         remote_path=args.remote_path,
     )
     print(f"uploaded {args.file} to {remote_path}")
+
+
+def benchmark_main() -> None:
+    parser = argparse.ArgumentParser(description="Run local performance benchmarks.")
+    benchmarks = parser.add_subparsers(dest="benchmark", required=True)
+    store_parser = benchmarks.add_parser(
+        "store", help="Measure app sandbox store get/upsert latency as the store grows."
+    )
+    store_parser.add_argument(
+        "--backend",
+        action="append",
+        choices=STORE_BENCHMARK_BACKENDS,
+        help="Backend to measure. Repeat to compare several; defaults to all.",
+    )
+    store_parser.add_argument("--size", type=int, action="append", help="Store size to seed.")
+    store_parser.add_argument("--operations", type=int, default=STORE_BENCHMARK_OPERATIONS)
+    bootstrap_parser = benchmarks.add_parser(
+        "bootstrap", help="Time webhook sandbox bring-up against a fake sandbox."
+    )
+    bootstrap_parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=BOOTSTRAP_BENCHMARK_LATENCY_MS,
+        help="Simulated latency of each sandbox API call.",
+    )
+    bootstrap_parser.add_argument("--repeat", type=int, default=BOOTSTRAP_BENCHMARK_REPEAT)
+    locks_parser = benchmarks.add_parser(
+        "locks", help="Measure routing key lock registry memory over many distinct sessions."
+    )
+    locks_parser.add_argument("--keys", type=int, default=LOCK_BENCHMARK_KEYS)
+    locks_parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit non-zero when the refcounted registry keeps entries or RSS grows past budget.",
+    )
+    startup_parser = benchmarks.add_parser(
+        "startup", help="Time cold interpreter start plus imports for the sandbox runtimes."
+    )
+    startup_parser.add_argument(
+        "--target",
+        action="append",
+        choices=tuple(STARTUP_BENCHMARK_TARGETS),
+        help="Runtime to measure. Repeat to compare several; defaults to all.",
+    )
+    startup_parser.add_argument("--repeat", type=int, default=STARTUP_BENCHMARK_REPEAT)
+    startup_parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit non-zero when a median start exceeds its budget.",
+    )
+    lifecycle_parser = benchmarks.add_parser(
+        "lifecycle",
+        help="Replay work arrivals to compare sandbox timeout policies on cost and resume latency.",
+    )
+    lifecycle_parser.add_argument(
+        "--trace",
+        type=Path,
+        help="Trace written by APP_LIFECYCLE_TRACE_PATH. Defaults to a synthetic trace.",
+    )
+    lifecycle_parser.add_argument("--days", type=float, default=LIFECYCLE_BENCHMARK_DAYS)
+    lifecycle_parser.add_argument(
+        "--default-timeout",
+        type=int,
+        default=DEFAULT_APP_SANDBOX_TIMEOUT_SECONDS,
+        help="Fixed timeout the savings are measured against.",
+    )
+    lifecycle_parser.add_argument("--resume-ms", type=float, default=LIFECYCLE_BENCHMARK_RESUME_MS)
+    lifecycle_parser.add_argument("--create-ms", type=float, default=LIFECYCLE_BENCHMARK_CREATE_MS)
+    webhook_parser = benchmarks.add_parser(
+        "webhook", help="Compare buffered and streaming webhook signature verification."
+    )
+    webhook_parser.add_argument(
+        "--payload-bytes", type=int, default=WEBHOOK_BENCHMARK_PAYLOAD_BYTES
+    )
+    webhook_parser.add_argument("--repeat", type=int, default=WEBHOOK_BENCHMARK_REPEAT)
+    load_parser = benchmarks.add_parser(
+        "load",
+        help="Load-test both webhook servers offline against fake Anthropic and E2B APIs.",
+    )
+    load_parser.add_argument(
+        "--target",
+        action="append",
+        choices=LOAD_BENCHMARK_TARGETS,
+        help="Server to load. Repeat to compare several; defaults to all.",
+    )
+    load_parser.add_argument(
+        "--concurrency",
+        type=int,
+        action="append",
+        help="Concurrent webhook senders. Repeat for several levels.",
+    )
+    load_parser.add_argument("--requests", type=int, default=LOAD_BENCHMARK_REQUESTS)
+    load_parser.add_argument(
+        "--sessions",
+        type=int,
+        default=LOAD_BENCHMARK_SESSIONS,
+        help="Distinct sessions the webhooks are spread over.",
+    )
+    load_parser.add_argument(
+        "--routing-scope", choices=("session", "environment"), default="session"
+    )
+    load_parser.add_argument("--backend", choices=STORE_BENCHMARK_BACKENDS, default="journal")
+    load_parser.add_argument(
+        "--api-ms",
+        type=float,
+        default=LOAD_BENCHMARK_API_MS,
+        help="Simulated latency of each Anthropic API request.",
+    )
+    load_parser.add_argument(
+        "--sandbox-ms",
+        type=float,
+        default=LOAD_BENCHMARK_SANDBOX_MS,
+        help="Simulated latency of each E2B sandbox call.",
+    )
+    load_parser.add_argument(
+        "--create-ms",
+        type=float,
+        default=LOAD_BENCHMARK_CREATE_MS,
+        help="Simulated latency of creating an E2B sandbox.",
+    )
+    load_parser.add_argument(
+        "--worker-ms",
+        type=float,
+        default=LOAD_BENCHMARK_WORKER_MS,
+        help="How long each simulated in-sandbox worker runs.",
+    )
+    load_parser.add_argument(
+        "--max-p95-ms",
+        type=float,
+        help="Exit non-zero when a webhook p95 latency exceeds this budget.",
+    )
+    args = parser.parse_args()
+
+    if args.benchmark == "store":
+        results = benchmark_store(
+            backends=args.backend or STORE_BENCHMARK_BACKENDS,
+            sizes=args.size or STORE_BENCHMARK_SIZES,
+            operations=args.operations,
+        )
+        print(format_store_results(results))
+    elif args.benchmark == "bootstrap":
+        results = benchmark_bootstrap(latency_ms=args.latency_ms, repeat=args.repeat)
+        print(format_bootstrap_results(results))
+    elif args.benchmark == "locks":
+        results = benchmark_locks(keys=args.keys)
+        print(format_lock_results(results))
+        failures = lock_budget_failures(results)
+        if args.check and failures:
+            raise SystemExit("\n".join(failures))
+    elif args.benchmark == "startup":
+        results = benchmark_startup(
+            targets=args.target or tuple(STARTUP_BENCHMARK_TARGETS), repeat=args.repeat
+        )
+        print(format_startup_results(results))
+        failures = startup_budget_failures(results, STARTUP_BUDGETS_MS)
+        if args.check and failures:
+            raise SystemExit("\n".join(failures))
+    elif args.benchmark == "lifecycle":
+        trace = read_trace(args.trace) if args.trace else synthetic_lifecycle_trace(days=args.days)
+        results = benchmark_lifecycle(
+            trace,
+            default_timeout=args.default_timeout,
+            resume_ms=args.resume_ms,
+            create_ms=args.create_ms,
+        )
+        print(format_lifecycle_results(results))
+    elif args.benchmark == "webhook":
+        results = benchmark_webhook_verification(
+            payload_bytes=args.payload_bytes, repeat=args.repeat
+        )
+        print(format_webhook_results(results))
+    elif args.benchmark == "load":
+        results = benchmark_load(
+            targets=args.target or LOAD_BENCHMARK_TARGETS,
+            concurrency=args.concurrency or LOAD_BENCHMARK_CONCURRENCY,
+            requests=args.requests,
+            sessions=args.sessions,
+            routing_scope=args.routing_scope,
+            backend=args.backend,
+            api_ms=args.api_ms,
+            sandbox_ms=args.sandbox_ms,
+            create_ms=args.create_ms,
+            worker_ms=args.worker_ms,
+        )
+        print(format_load_results(results))
+        if args.max_p95_ms is not None:
+            failures = load_budget_failures(results, max_p95_ms=args.max_p95_ms)
+            if failures:
+                raise SystemExit("\n".join(failures))
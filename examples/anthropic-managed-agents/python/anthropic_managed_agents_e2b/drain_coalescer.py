@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class DrainCoalescer:
+    """Runs at most one queue drain loop per key and folds repeated kicks into it.
+
+    The first ``kick()`` for a key starts a loop that waits ``debounce_seconds``, so a burst of
+    webhooks becomes one drain, then runs ``drain()``. A kick that lands while the loop is
+    debouncing or draining is not dropped: it marks the key dirty and the loop drains again once
+    the current pass returns. After a pass the loop stays alive for ``grace_seconds`` waiting for
+    the next kick, so follow-up work reuses the same task and its warm client connections, and
+    exits once the grace period passes without one. Each pass runs the ``drain`` from the most
+    recent kick, so a caller can rebind it, for example to new settings, without the loop exiting.
+    """
+
+    def __init__(self, *, debounce_seconds: float, grace_seconds: float) -> None:
+        self.debounce_seconds = debounce_seconds
+        self.grace_seconds = grace_seconds
+        self._pending: dict[str, asyncio.Event] = {}
+        self._drains: dict[str, Callable[[], Awaitable[None]]] = {}
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self.kicks = 0
+        self.coalesced = 0
+        self.drains = 0
+        self.failures = 0
+
+    def kick(self, key: str, drain: Callable[[], Awaitable[None]]) -> None:
+        """Request a drain for ``key``. Must be called on the event loop."""
+        self.kicks += 1
+        self._drains[key] = drain
+        pending = self._pending.get(key)
+        if pending is not None:
+            if pending.is_set():
+                self.coalesced += 1
+            pending.set()
+            return
+        pending = self._pending[key] = asyncio.Event()
+        pending.set()
+        self._tasks[key] = asyncio.create_task(self._run(key, pending))
+
+    async def _run(self, key: str, pending: asyncio.Event) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self.debounce_seconds)
+                pending.clear()
+                self.drains += 1
+                try:
+                    await self._drains[key]()
+                except Exception:
+                    self.failures += 1
+                    logger.exception("failed to drain work queue for %s", key)
+                else:
+                    logger.info("drained work queue for %s", key)
+                try:
+                    await asyncio.wait_for(pending.wait(), self.grace_seconds)
+                except TimeoutError:
+                    # A kick can land in the same loop iteration as the timeout.
+                    if not pending.is_set():
+                        return
+        finally:
+            del self._pending[key]
+            del self._drains[key]
+            del self._tasks[key]
+
+    async def aclose(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "active": sorted(self._tasks),
+            "kicks": self.kicks,
+            "coalesced": self.coalesced,
+            "drains": self.drains,
+            "failures": self.failures,
+        }
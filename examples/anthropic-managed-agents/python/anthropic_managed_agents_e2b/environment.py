@@ -1,6 +1,13 @@
 from __future__ import annotations
 
+import atexit
 import json
+import logging
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import cache
 
 import anthropic
 
@@ -9,10 +16,23 @@ WORKER_SANDBOX_METADATA_KEY = "e2b_worker_sandbox_id"
 WEBHOOK_SANDBOX_METADATA_KEY = "e2b_webhook_sandbox_id"
 WORKER_SANDBOX_STORE_METADATA_KEY = "e2b_worker_sandbox_ids"
 WEBHOOK_SANDBOX_STORE_METADATA_KEY = "e2b_webhook_sandbox_ids"
+SANDBOX_METADATA_KEYS = (
+    (WORKER_SANDBOX_METADATA_KEY, WORKER_SANDBOX_STORE_METADATA_KEY),
+    (WEBHOOK_SANDBOX_METADATA_KEY, WEBHOOK_SANDBOX_STORE_METADATA_KEY),
+)
+# Newest ids are kept; older ones are pruned so the metadata value stays small.
+MAX_STORED_SANDBOX_IDS = 20
+METADATA_WRITE_DELAY_SECONDS = 1.0
+logger = logging.getLogger(__name__)
+
+
+@cache
+def _client(api_key: str) -> anthropic.Anthropic:
+    return anthropic.Anthropic(api_key=api_key)
 
 
 def create_self_hosted_environment(*, api_key: str, name: str):
-    client = anthropic.Anthropic(api_key=api_key)
+    client = _client(api_key)
     return client.beta.environments.create(
         name=name,
         config={"type": "self_hosted"},
@@ -20,7 +40,7 @@ def create_self_hosted_environment(*, api_key: str, name: str):
 
 
 def retrieve_environment(*, api_key: str, environment_id: str):
-    client = anthropic.Anthropic(api_key=api_key)
+    client = _client(api_key)
     return client.beta.environments.retrieve(environment_id)
 
 
@@ -30,7 +50,7 @@ def update_environment_metadata(
     environment_id: str,
     metadata: dict[str, str | None],
 ):
-    client = anthropic.Anthropic(api_key=api_key)
+    client = _client(api_key)
     return client.beta.environments.update(
         environment_id,
         metadata=metadata,
@@ -59,6 +79,66 @@ def serialize_sandbox_store(sandbox_ids: list[str]) -> str:
     return json.dumps(list(dict.fromkeys(sandbox_ids)), separators=(",", ":"))
 
 
+@dataclass(frozen=True)
+class SandboxMetadataChange:
+    """Add ``sandbox_id`` under ``legacy_key``/``store_key``, or remove it everywhere."""
+
+    sandbox_id: str
+    legacy_key: str | None = None
+    store_key: str | None = None
+
+    @property
+    def is_removal(self) -> bool:
+        return self.store_key is None
+
+
+def sandbox_metadata_update(
+    metadata: dict[str, str], changes: Iterable[SandboxMetadataChange]
+) -> dict[str, str | None]:
+    """Apply changes in order and return only the metadata keys that differ."""
+    current: dict[str, str | None] = dict(metadata)
+    stores = {
+        store_key: sandbox_store(metadata, store_key=store_key, legacy_key=legacy_key)
+        for legacy_key, store_key in SANDBOX_METADATA_KEYS
+    }
+    for change in changes:
+        if change.is_removal:
+            for legacy_key, store_key in SANDBOX_METADATA_KEYS:
+                if current.get(legacy_key) == change.sandbox_id:
+                    current[legacy_key] = None
+                stores[store_key] = [
+                    item for item in stores[store_key] if item != change.sandbox_id
+                ]
+            continue
+        ids = stores.setdefault(change.store_key, [])
+        stores[change.store_key] = [
+            change.sandbox_id,
+            *(item for item in ids if item != change.sandbox_id),
+        ]
+        current[change.legacy_key] = change.sandbox_id
+
+    for store_key, ids in stores.items():
+        original_ids = sandbox_store(metadata, store_key=store_key, legacy_key="")
+        if ids[:MAX_STORED_SANDBOX_IDS] != original_ids:
+            current[store_key] = serialize_sandbox_store(ids[:MAX_STORED_SANDBOX_IDS])
+    return {key: value for key, value in current.items() if metadata.get(key) != value}
+
+
+def apply_sandbox_metadata_changes(
+    *, api_key: str, environment_id: str, changes: Iterable[SandboxMetadataChange]
+):
+    """One retrieve and at most one update for any number of changes."""
+    env = retrieve_environment(api_key=api_key, environment_id=environment_id)
+    metadata = sandbox_metadata_update(env.metadata, changes)
+    if not metadata:
+        return env
+    return update_environment_metadata(
+        api_key=api_key,
+        environment_id=environment_id,
+        metadata=metadata,
+    )
+
+
 def add_sandbox_to_metadata_store(
     *,
     api_key: str,
@@ -67,16 +147,10 @@ def add_sandbox_to_metadata_store(
     legacy_key: str,
     sandbox_id: str,
 ):
-    env = retrieve_environment(api_key=api_key, environment_id=environment_id)
-    sandbox_ids = sandbox_store(env.metadata, store_key=store_key, legacy_key=legacy_key)
-    sandbox_ids = [sandbox_id, *(item for item in sandbox_ids if item != sandbox_id)]
-    return update_environment_metadata(
+    return apply_sandbox_metadata_changes(
         api_key=api_key,
         environment_id=environment_id,
-        metadata={
-            legacy_key: sandbox_id,
-            store_key: serialize_sandbox_store(sandbox_ids),
-        },
+        changes=[SandboxMetadataChange(sandbox_id, legacy_key=legacy_key, store_key=store_key)],
     )
 
 
@@ -86,26 +160,77 @@ def clear_matching_sandbox_metadata(
     environment_id: str,
     sandbox_id: str,
 ):
-    env = retrieve_environment(api_key=api_key, environment_id=environment_id)
-    metadata: dict[str, str | None] = {}
-    for legacy_key, store_key in (
-        (WORKER_SANDBOX_METADATA_KEY, WORKER_SANDBOX_STORE_METADATA_KEY),
-        (WEBHOOK_SANDBOX_METADATA_KEY, WEBHOOK_SANDBOX_STORE_METADATA_KEY),
-    ):
-        if env.metadata.get(legacy_key) == sandbox_id:
-            metadata[legacy_key] = None
-        sandbox_ids = sandbox_store(env.metadata, store_key=store_key, legacy_key=legacy_key)
-        updated_ids = [item for item in sandbox_ids if item != sandbox_id]
-        if updated_ids != sandbox_ids:
-            metadata[store_key] = serialize_sandbox_store(updated_ids)
-    if not metadata:
-        return env
-    return update_environment_metadata(
+    return apply_sandbox_metadata_changes(
         api_key=api_key,
         environment_id=environment_id,
-        metadata=metadata,
+        changes=[SandboxMetadataChange(sandbox_id)],
     )
 
 
+class SandboxMetadataWriter:
+    """Coalesces sandbox metadata changes into one update per environment.
+
+    ``add()`` and ``remove()`` only queue the change. A background thread waits ``delay_seconds``
+    after the first queued change so a burst of sandbox starts becomes one retrieve and one
+    update. ``flush()`` writes whatever is queued immediately.
+    """
+
+    def __init__(self, *, delay_seconds: float = METADATA_WRITE_DELAY_SECONDS) -> None:
+        self.delay_seconds = delay_seconds
+        self._pending: dict[tuple[str, str], list[SandboxMetadataChange]] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.writes = 0
+        self.coalesced_changes = 0
+
+    def add(
+        self, *, api_key: str, environment_id: str, store_key: str, legacy_key: str, sandbox_id: str
+    ) -> None:
+        change = SandboxMetadataChange(sandbox_id, legacy_key=legacy_key, store_key=store_key)
+        self._queue(api_key, environment_id, change)
+
+    def remove(self, *, api_key: str, environment_id: str, sandbox_id: str) -> None:
+        self._queue(api_key, environment_id, SandboxMetadataChange(sandbox_id))
+
+    def flush(self) -> None:
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            for (api_key, environment_id), changes in pending.items():
+                try:
+                    apply_sandbox_metadata_changes(
+                        api_key=api_key, environment_id=environment_id, changes=changes
+                    )
+                except Exception:
+                    logger.exception("failed to update sandbox metadata for %s", environment_id)
+                    continue
+                self.writes += 1
+                self.coalesced_changes += len(changes)
+
+    def _queue(self, api_key: str, environment_id: str, change: SandboxMetadataChange) -> None:
+        with self._lock:
+            self._pending.setdefault((api_key, environment_id), []).append(change)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            time.sleep(self.delay_seconds)
+            self.flush()
+
+
+@cache
+def metadata_writer() -> SandboxMetadataWriter:
+    writer = SandboxMetadataWriter()
+    atexit.register(writer.flush)
+    return writer
+
+
 def console_url(environment_id: str) -> str:
     return CONSOLE_URL.format(environment_id=environment_id)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from collections.abc import Hashable, Iterator
+from contextlib import contextmanager
+from threading import Lock
+
+
+class _KeyedLock:
+    __slots__ = ("lock", "users")
+
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.users = 0
+
+
+class KeyedLocks:
+    """One lock per key, kept only while some thread holds it or is waiting for it.
+
+    Each entry counts its holders and waiters, and the last one to leave deletes it, so the
+    registry size tracks the number of busy keys rather than every key ever seen. ``contended``
+    counts the acquisitions that found the key already held or awaited.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._entries: dict[Hashable, _KeyedLock] = {}
+        self.acquisitions = 0
+        self.contended = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "live": len(self._entries),
+                "acquisitions": self.acquisitions,
+                "contended": self.contended,
+            }
+
+    @contextmanager
+    def hold(self, key: Hashable) -> Iterator[None]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _KeyedLock()
+            else:
+                self.contended += 1
+            entry.users += 1
+            self.acquisitions += 1
+        try:
+            with entry.lock:
+                yield
+        finally:
+            with self._lock:
+                entry.users -= 1
+                if entry.users == 0:
+                    del self._entries[key]
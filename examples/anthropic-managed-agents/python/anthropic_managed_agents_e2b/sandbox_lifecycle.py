@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+from anthropic_managed_agents_e2b.app_sandbox_store import (
+    AssignmentKey,
+    SandboxAssignment,
+    SandboxStore,
+)
+from anthropic_managed_agents_e2b.sandbox_reaper import ReapResult, reap_sandboxes
+from anthropic_managed_agents_e2b.settings import DEFAULT_SANDBOX_TIMEOUT_SECONDS, Settings
+
+logger = logging.getLogger(__name__)
+LIFECYCLE_MODES = {"fixed", "adaptive"}
+LIFECYCLE_SWEEP_SECONDS = 300.0
+# Weight of the newest gap in the moving average; higher adapts faster to bursts.
+GAP_SMOOTHING = 0.3
+
+
+def next_activity(previous: SandboxAssignment | None, now: datetime) -> tuple[int, float]:
+    """Arrival count and mean inter-arrival gap after one more work item for this key."""
+    if previous is None:
+        return 1, 0.0
+    gap = max(0.0, (now - datetime.fromisoformat(previous.updated_at)).total_seconds())
+    # Assignments written before activity tracking have arrivals == 0; count them as one.
+    arrivals = max(previous.arrivals, 1) + 1
+    if arrivals == 2:
+        return arrivals, gap
+    return arrivals, (1 - GAP_SMOOTHING) * previous.mean_gap_seconds + GAP_SMOOTHING * gap
+
+
+@dataclass(frozen=True)
+class LifecyclePolicy:
+    """Chooses how long a worker sandbox keeps running before it pauses, and when to kill it.
+
+    ``resume_cost_seconds`` is how much running time one resume is worth avoiding. A key whose
+    mean gap is shorter than that is hot: keeping it running until the next item is cheaper than
+    resuming, so it stays warm for ``warm_gap_multiplier`` mean gaps (clamped to the min and max
+    timeouts). Any other key is cold and pauses after ``min_timeout_seconds``. Keys with fewer
+    than ``min_arrivals`` items keep the routing scope default. A paused sandbox is killed once
+    it has been idle for ``kill_idle_seconds`` and for ``kill_gap_multiplier`` mean gaps.
+    """
+
+    min_timeout_seconds: int = 60
+    max_timeout_seconds: int = DEFAULT_SANDBOX_TIMEOUT_SECONDS
+    resume_cost_seconds: float = 300.0
+    warm_gap_multiplier: float = 5.0
+    min_arrivals: int = 3
+    kill_idle_seconds: float = 86_400.0
+    kill_gap_multiplier: float = 10.0
+
+    def timeout_seconds(self, arrivals: int, mean_gap_seconds: float, default_seconds: int) -> int:
+        if arrivals < self.min_arrivals:
+            return default_seconds
+        if mean_gap_seconds >= self.resume_cost_seconds:
+            return self.min_timeout_seconds
+        warm_seconds = round(self.warm_gap_multiplier * mean_gap_seconds)
+        return min(self.max_timeout_seconds, max(self.min_timeout_seconds, warm_seconds))
+
+    def should_kill(self, arrivals: int, mean_gap_seconds: float, idle_seconds: float) -> bool:
+        if idle_seconds < self.kill_idle_seconds:
+            return False
+        if arrivals < self.min_arrivals:
+            return True
+        return idle_seconds > self.kill_gap_multiplier * mean_gap_seconds
+
+
+class SandboxLifecycleManager:
+    """Per-routing-key activity accounting for the app-owned webhook server.
+
+    ``record_arrival()`` runs on every routed work item and returns the activity to store with the
+    assignment. In ``adaptive`` mode ``timeout_seconds()`` applies the policy and ``sweep()`` kills
+    idle sandboxes; in ``fixed`` mode the timeout is the routing scope default and nothing is
+    killed. When ``trace_path`` is set each arrival is appended to it as a JSON line, which the
+    ``lifecycle`` benchmark can replay.
+    """
+
+    def __init__(
+        self,
+        *,
+        mode: str,
+        policy: LifecyclePolicy | None = None,
+        trace_path: Path | None = None,
+    ) -> None:
+        if mode not in LIFECYCLE_MODES:
+            raise RuntimeError("APP_SANDBOX_LIFECYCLE must be fixed or adaptive")
+        self.mode = mode
+        self.policy = policy or LifecyclePolicy()
+        self.trace_path = trace_path
+        self._trace_lock = threading.Lock()
+        self.arrivals = 0
+        self.warm_timeouts = 0
+        self.early_pauses = 0
+        self.killed = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> SandboxLifecycleManager:
+        return cls(
+            mode=settings.app_sandbox_lifecycle, trace_path=settings.app_lifecycle_trace_path
+        )
+
+    @property
+    def adaptive(self) -> bool:
+        return self.mode == "adaptive"
+
+    def record_arrival(
+        self, key: AssignmentKey, previous: SandboxAssignment | None, *, now: datetime | None = None
+    ) -> tuple[int, float]:
+        now = now or datetime.now(UTC)
+        self.arrivals += 1
+        if self.trace_path is not None:
+            self._trace(key, now)
+        return next_activity(previous, now)
+
+    def timeout_seconds(
+        self, arrivals: int, mean_gap_seconds: float, *, default_seconds: int
+    ) -> int:
+        if not self.adaptive:
+            return default_seconds
+        timeout = self.policy.timeout_seconds(arrivals, mean_gap_seconds, default_seconds)
+        if arrivals >= self.policy.min_arrivals:
+            if timeout == self.policy.min_timeout_seconds:
+                self.early_pauses += 1
+            else:
+                self.warm_timeouts += 1
+        return timeout
+
+    def select_idle(
+        self,
+        assignments: Iterable[SandboxAssignment],
+        *,
+        environment_id: str,
+        now: datetime | None = None,
+    ) -> list[str]:
+        now = now or datetime.now(UTC)
+        selected = (
+            assignment.sandbox_id
+            for assignment in assignments
+            if assignment.environment_id == environment_id
+            and self.policy.should_kill(
+                assignment.arrivals,
+                assignment.mean_gap_seconds,
+                (now - datetime.fromisoformat(assignment.updated_at)).total_seconds(),
+            )
+        )
+        return list(dict.fromkeys(selected))
+
+    def sweep(self, settings: Settings, store: SandboxStore) -> ReapResult:
+        """Kill the sandboxes of keys the policy considers abandoned.
+
+        A work item racing the sweep for the same key is safe: connecting to the killed sandbox
+        fails and ``ensure_worker_sandbox`` creates a replacement.
+        """
+        if not self.adaptive:
+            return ReapResult(selected=[])
+        sandbox_ids = self.select_idle(
+            store.list(), environment_id=settings.require_anthropic_environment_id()
+        )
+        result = reap_sandboxes(settings, store, sandbox_ids)
+        self.killed += len(result.killed)
+        return result
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "mode": self.mode,
+            "arrivals": self.arrivals,
+            "warm_timeouts": self.warm_timeouts,
+            "early_pauses": self.early_pauses,
+            "killed": self.killed,
+        }
+
+    def _trace(self, key: AssignmentKey, now: datetime) -> None:
+        line = json.dumps({"key": "/".join(key), "at": now.timestamp()}, separators=(",", ":"))
+        with self._trace_lock:
+            try:
+                with self.trace_path.open("a") as trace:
+                    trace.write(line + "\n")
+            except OSError:
+                logger.exception("failed to append lifecycle trace")
+
+
+def read_trace(path: Path) -> dict[str, list[float]]:
+    """Arrival times per key from a trace written by ``SandboxLifecycleManager``."""
+    arrivals: dict[str, list[float]] = {}
+    for line in path.read_text().splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        arrivals.setdefault(str(record["key"]), []).append(float(record["at"]))
+    for times in arrivals.values():
+        times.sort()
+    return arrivals
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+
+from e2b import Sandbox, SandboxQuery
+
+from anthropic_managed_agents_e2b.app_sandbox_store import SandboxAssignment, SandboxStore
+from anthropic_managed_agents_e2b.environment import (
+    SandboxMetadataChange,
+    apply_sandbox_metadata_changes,
+)
+from anthropic_managed_agents_e2b.settings import Settings
+
+logger = logging.getLogger(__name__)
+DEFAULT_REAP_PARALLELISM = 16
+
+
+@dataclass(frozen=True)
+class ReapSelection:
+    """Which sandboxes to reap.
+
+    Store filters (age, status, routing scope) combine with AND and select from the app sandbox
+    store. ``managed_by`` selects running or paused E2B sandboxes by their ``managed_by``
+    metadata, also limited by age. Sandboxes picked by either source are reaped.
+    """
+
+    older_than: timedelta | None = None
+    statuses: frozenset[str] = frozenset()
+    routing_scopes: frozenset[str] = frozenset()
+    managed_by: str | None = None
+
+    @property
+    def uses_store(self) -> bool:
+        return bool(self.older_than is not None or self.statuses or self.routing_scopes)
+
+    def matches(self, assignment: SandboxAssignment, *, now: datetime) -> bool:
+        if self.statuses and assignment.status not in self.statuses:
+            return False
+        if self.routing_scopes and assignment.routing_scope not in self.routing_scopes:
+            return False
+        if self.older_than is not None:
+            created_at = datetime.fromisoformat(assignment.created_at)
+            if now - created_at < self.older_than:
+                return False
+        return True
+
+
+@dataclass
+class ReapResult:
+    selected: list[str]
+    killed: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+
+
+def select_store_sandboxes(
+    assignments: Iterable[SandboxAssignment],
+    selection: ReapSelection,
+    *,
+    environment_id: str | None = None,
+    now: datetime | None = None,
+) -> list[str]:
+    now = now or datetime.now(UTC)
+    selected = (
+        assignment.sandbox_id
+        for assignment in assignments
+        if (environment_id is None or assignment.environment_id == environment_id)
+        and selection.matches(assignment, now=now)
+    )
+    return list(dict.fromkeys(selected))
+
+
+def select_managed_sandboxes(
+    selection: ReapSelection,
+    *,
+    environment_id: str | None = None,
+    now: datetime | None = None,
+) -> list[str]:
+    if selection.managed_by is None:
+        return []
+    now = now or datetime.now(UTC)
+    metadata = {"managed_by": selection.managed_by}
+    if environment_id:
+        metadata["anthropic.environment_id"] = environment_id
+    paginator = Sandbox.list(query=SandboxQuery(metadata=metadata))
+    selected: list[str] = []
+    while paginator.has_next:
+        for info in paginator.next_items():
+            if selection.older_than is not None and now - info.started_at < selection.older_than:
+                continue
+            selected.append(info.sandbox_id)
+    return selected
+
+
+def select_sandboxes(
+    settings: Settings,
+    store: SandboxStore,
+    selection: ReapSelection,
+    *,
+    now: datetime | None = None,
+) -> list[str]:
+    if not selection.uses_store and selection.managed_by is None:
+        raise RuntimeError(
+            "Choose at least one of --older-than, --status, --routing-scope, or --managed-by"
+        )
+    now = now or datetime.now(UTC)
+    environment_id = settings.anthropic_environment_id
+    selected: list[str] = []
+    if selection.uses_store:
+        selected += select_store_sandboxes(
+            store.list(), selection, environment_id=environment_id, now=now
+        )
+    selected += select_managed_sandboxes(selection, environment_id=environment_id, now=now)
+    return list(dict.fromkeys(selected))
+
+
+def _kill(sandbox_id: str) -> bool:
+    try:
+        # False means E2B no longer knows the sandbox, which is as good as killed.
+        Sandbox.kill(sandbox_id)
+    except Exception:
+        logger.exception("failed to kill sandbox %s", sandbox_id)
+        return False
+    return True
+
+
+def reap_sandboxes(
+    settings: Settings,
+    store: SandboxStore,
+    sandbox_ids: list[str],
+    *,
+    parallelism: int = DEFAULT_REAP_PARALLELISM,
+) -> ReapResult:
+    """Kill sandboxes concurrently, then clean up the store and metadata with one write each.
+
+    Sandboxes whose kill failed stay in the store and metadata so a later run can retry them.
+    """
+    if parallelism < 1:
+        raise RuntimeError("--parallelism must be at least 1")
+    result = ReapResult(selected=sandbox_ids)
+    if not sandbox_ids:
+        return result
+    with ThreadPoolExecutor(
+        max_workers=min(parallelism, len(sandbox_ids)), thread_name_prefix="reap"
+    ) as executor:
+        for sandbox_id, killed in zip(sandbox_ids, executor.map(_kill, sandbox_ids), strict=True):
+            (result.killed if killed else result.failed).append(sandbox_id)
+
+    if result.killed:
+        store.remove_sandboxes(sandbox_ids=result.killed)
+        if settings.anthropic_api_key and settings.anthropic_environment_id:
+            apply_sandbox_metadata_changes(
+                api_key=settings.anthropic_api_key,
+                environment_id=settings.anthropic_environment_id,
+                changes=[SandboxMetadataChange(sandbox_id) for sandbox_id in result.killed],
+            )
+    return result
@@ -1,19 +1,24 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 import shlex
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import cache
 from pathlib import Path
 
-from e2b import Sandbox
+from e2b import CommandExitException, NotFoundException, Sandbox
 
-from anthropic_managed_agents_e2b.app_sandbox_store import JsonSandboxStore
+from anthropic_managed_agents_e2b.app_sandbox_store import open_sandbox_store
 from anthropic_managed_agents_e2b.environment import (
     WEBHOOK_SANDBOX_METADATA_KEY,
     WEBHOOK_SANDBOX_STORE_METADATA_KEY,
     WORKER_SANDBOX_METADATA_KEY,
     WORKER_SANDBOX_STORE_METADATA_KEY,
     add_sandbox_to_metadata_store,
-    clear_matching_sandbox_metadata,
+    metadata_writer,
 )
 from anthropic_managed_agents_e2b.settings import PACKAGE_ROOT, Settings
 
@@ -22,8 +27,10 @@ REMOTE_CONFIG_DIR = f"{REMOTE_DIR}/config"
 REMOTE_WORKDIR = "/mnt/session"
 REMOTE_PACKAGE_DIR = f"{REMOTE_DIR}/anthropic_managed_agents_e2b"
 REMOTE_WORKER = f"{REMOTE_DIR}/worker.py"
+REMOTE_WORKER_MANIFEST = f"{REMOTE_DIR}/worker-manifest.sha256"
 REMOTE_PID = f"{REMOTE_DIR}/worker.pid"
 REMOTE_LOG = f"{REMOTE_DIR}/worker.log"
+REMOTE_WORKER_STATUS = f"{REMOTE_DIR}/worker-status.json"
 REMOTE_WEBHOOK_PID = f"{REMOTE_DIR}/webhook.pid"
 REMOTE_WEBHOOK_LOG = f"{REMOTE_DIR}/webhook.log"
 REMOTE_ENVIRONMENT_ID = f"{REMOTE_CONFIG_DIR}/anthropic-environment-id"
@@ -38,6 +45,131 @@ from anthropic_managed_agents_e2b.worker_runtime import main
 if __name__ == "__main__":
     main()
 """
+WORKER_PACKAGE_FILES = (
+    "__init__.py",
+    "worker_runtime.py",
+    "webhook_runtime.py",
+    "webhook_signature.py",
+)
+BOOTSTRAP_STATUS_PREFIX = "__anthropic_managed_agents_bootstrap_step__"
+WORKER_SANDBOX_LIFECYCLE = {"on_timeout": "pause", "auto_resume": True}
+# Three missed heartbeats from worker_runtime.heartbeat(); a paused sandbox also reads as stale.
+WORKER_HEARTBEAT_STALE_SECONDS = 15.0
+
+
+@dataclass(frozen=True)
+class BootstrapStep:
+    name: str
+    script: str
+
+
+@dataclass(frozen=True)
+class WorkerStatus:
+    pid: int
+    code_version: str
+    age_seconds: float
+
+    def is_current(self, code_version: str) -> bool:
+        """Whether a live worker is running exactly the local worker code."""
+        return (
+            self.code_version == code_version and self.age_seconds <= WORKER_HEARTBEAT_STALE_SECONDS
+        )
+
+
+@dataclass(frozen=True)
+class BootstrapResult:
+    exit_code: int
+    step_exit_codes: dict[str, int]
+    stdout: str
+    stderr: str
+    round_trips: int
+
+    @property
+    def failed_step(self) -> str | None:
+        return next((name for name, code in self.step_exit_codes.items() if code != 0), None)
+
+
+def render_bootstrap_script(steps: Sequence[BootstrapStep]) -> str:
+    """Render steps as one bash script that reports each step's exit status and stops on failure."""
+    lines = ["set -u"]
+    for step in steps:
+        lines += [
+            f"(\nset -eu\n{step.script.strip()}\n)",
+            "code=$?",
+            f"printf '{BOOTSTRAP_STATUS_PREFIX} %s %s\\n' {shlex.quote(step.name)} \"$code\"",
+            'if [ "$code" -ne 0 ]; then exit "$code"; fi',
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def bootstrap_command(script: str) -> str:
+    return f"bash -lc {shlex.quote(script)}"
+
+
+def bootstrap_scripts(steps: Sequence[BootstrapStep], *, batched: bool) -> list[str]:
+    if batched:
+        return [render_bootstrap_script(steps)]
+    return [render_bootstrap_script([step]) for step in steps]
+
+
+def bootstrap_result(
+    exit_code: int, stdout: Sequence[str], stderr: Sequence[str]
+) -> BootstrapResult:
+    """Split the per-step status lines out of the bootstrap output of each round trip."""
+    step_exit_codes: dict[str, int] = {}
+    output: list[str] = []
+    for line in "".join(stdout).splitlines():
+        prefix, _, status = line.partition(" ")
+        name, _, code = status.rpartition(" ")
+        if prefix == BOOTSTRAP_STATUS_PREFIX and name and code.isdigit():
+            step_exit_codes[name] = int(code)
+        else:
+            output.append(line)
+    return BootstrapResult(
+        exit_code=exit_code,
+        step_exit_codes=step_exit_codes,
+        stdout="\n".join(output),
+        stderr="".join(stderr),
+        round_trips=len(stdout),
+    )
+
+
+def _run_script(
+    sandbox: Sandbox, script: str, *, envs: dict[str, str], timeout: float
+) -> tuple[int, str, str]:
+    try:
+        result = sandbox.commands.run(bootstrap_command(script), envs=envs, timeout=timeout)
+    except CommandExitException as error:
+        return error.exit_code, error.stdout, error.stderr
+    return result.exit_code or 0, result.stdout, result.stderr
+
+
+def run_bootstrap(
+    sandbox: Sandbox,
+    steps: Sequence[BootstrapStep],
+    *,
+    envs: dict[str, str],
+    timeout: float = 30,
+    batched: bool = True,
+) -> BootstrapResult:
+    """Run bootstrap steps in one remote command, or one command per step with ``batched=False``."""
+    exit_code = 0
+    stdout: list[str] = []
+    stderr: list[str] = []
+    for script in bootstrap_scripts(steps, batched=batched):
+        exit_code, out, err = _run_script(sandbox, script, envs=envs, timeout=timeout)
+        stdout.append(out)
+        stderr.append(err)
+        if exit_code != 0:
+            break
+    return bootstrap_result(exit_code, stdout, stderr)
+
+
+def raise_for_bootstrap(result: BootstrapResult, action: str) -> None:
+    if result.exit_code == 0:
+        return
+    step = result.failed_step or "unknown step"
+    raise RuntimeError(f"{action} failed at {step}:\n{result.stdout}\n{result.stderr}")
 
 
 def create_or_connect_worker_sandbox(
@@ -46,6 +178,7 @@ def create_or_connect_worker_sandbox(
     template_name: str,
     timeout_seconds: int,
     sandbox_id: str | None = None,
+    metadata: dict[str, str] | None = None,
 ) -> Sandbox:
     if sandbox_id:
         return Sandbox.connect(sandbox_id, timeout=timeout_seconds)
@@ -53,29 +186,118 @@ def create_or_connect_worker_sandbox(
     return Sandbox.create(
         template_name,
         timeout=timeout_seconds,
-        lifecycle={"on_timeout": "pause", "auto_resume": True},
-        metadata={
-            "managed_by": "anthropic-managed-agents-e2b",
-            "anthropic.environment_id": settings.anthropic_environment_id or "",
-        },
+        lifecycle=WORKER_SANDBOX_LIFECYCLE,
+        metadata=worker_sandbox_metadata(settings, metadata),
     )
 
 
-def upload_worker(sandbox: Sandbox) -> None:
-    sandbox.commands.run(f"mkdir -p {shlex.quote(REMOTE_PACKAGE_DIR)}", timeout=15)
-    sandbox.files.write(REMOTE_WORKER, REMOTE_WORKER_ENTRYPOINT)
-    sandbox.files.write(
-        f"{REMOTE_PACKAGE_DIR}/__init__.py",
-        (PACKAGE_ROOT / "__init__.py").read_text(),
-    )
-    sandbox.files.write(
-        f"{REMOTE_PACKAGE_DIR}/worker_runtime.py",
-        (PACKAGE_ROOT / "worker_runtime.py").read_text(),
+def worker_sandbox_metadata(
+    settings: Settings, metadata: dict[str, str] | None = None
+) -> dict[str, str]:
+    return {
+        "managed_by": "anthropic-managed-agents-e2b",
+        "anthropic.environment_id": settings.anthropic_environment_id or "",
+        **(metadata or {}),
+    }
+
+
+def webhook_sandbox_metadata(settings: Settings) -> dict[str, str]:
+    return {
+        "managed_by": "anthropic-managed-agents-e2b-webhook",
+        "anthropic.environment_id": settings.anthropic_environment_id or "",
+    }
+
+
+@cache
+def worker_upload_files() -> dict[str, str]:
+    files = {REMOTE_WORKER: REMOTE_WORKER_ENTRYPOINT}
+    for name in WORKER_PACKAGE_FILES:
+        files[f"{REMOTE_PACKAGE_DIR}/{name}"] = (PACKAGE_ROOT / name).read_text()
+    return files
+
+
+def worker_manifest(files: dict[str, str]) -> str:
+    # Same format as `sha256sum <paths>`, so the template can bake a matching manifest.
+    return "".join(
+        f"{hashlib.sha256(content.encode()).hexdigest()}  {path}\n"
+        for path, content in files.items()
     )
-    sandbox.files.write(
-        f"{REMOTE_PACKAGE_DIR}/webhook_runtime.py",
-        (PACKAGE_ROOT / "webhook_runtime.py").read_text(),
+
+
+def worker_code_version() -> str:
+    """Hash of the manifest, matching what ``worker_runtime.code_version()`` reports."""
+    return hashlib.sha256(worker_manifest(worker_upload_files()).encode()).hexdigest()
+
+
+def worker_status_command() -> str:
+    # The age comes from the sandbox clock, and a worker that was killed without clearing its
+    # status file fails the pid check, so neither clock skew nor a leftover file reads as live.
+    script = (
+        "import json, os, time\n"
+        f"status = json.load(open({REMOTE_WORKER_STATUS!r}))\n"
+        'os.kill(int(status["pid"]), 0)\n'
+        'status["age_seconds"] = time.time() - float(status["heartbeat_at"])\n'
+        "print(json.dumps(status))\n"
     )
+    return f"python -c {shlex.quote(script)}"
+
+
+def parse_worker_status(raw: str) -> WorkerStatus | None:
+    try:
+        status = json.loads(raw)
+        return WorkerStatus(
+            pid=int(status["pid"]),
+            code_version=str(status["code_version"]),
+            age_seconds=float(status["age_seconds"]),
+        )
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def read_worker_status(sandbox: Sandbox) -> WorkerStatus | None:
+    try:
+        result = sandbox.commands.run(worker_status_command(), timeout=5)
+    except Exception:
+        return None
+    return parse_worker_status(result.stdout)
+
+
+def _parse_manifest(manifest: str) -> dict[str, str]:
+    hashes: dict[str, str] = {}
+    for line in manifest.splitlines():
+        digest, _, path = line.partition("  ")
+        if digest and path:
+            hashes[path] = digest
+    return hashes
+
+
+def worker_upload_writes(remote_manifest: str) -> list[dict[str, str]]:
+    """Files to write so the sandbox matches the local worker package, or ``[]`` if it does."""
+    files = worker_upload_files()
+    manifest = worker_manifest(files)
+    if remote_manifest == manifest:
+        return []
+
+    local_hashes = _parse_manifest(manifest)
+    remote_hashes = _parse_manifest(remote_manifest)
+    changed = [path for path in files if remote_hashes.get(path) != local_hashes[path]]
+    # The manifest goes last so an interrupted upload is retried on the next call.
+    return [
+        *({"path": path, "data": files[path]} for path in changed),
+        {"path": REMOTE_WORKER_MANIFEST, "data": manifest},
+    ]
+
+
+def upload_worker(sandbox: Sandbox) -> list[str]:
+    try:
+        remote_manifest = sandbox.files.read(REMOTE_WORKER_MANIFEST)
+    except NotFoundException:
+        remote_manifest = ""
+    writes = worker_upload_writes(remote_manifest)
+    if not writes:
+        return []
+    sandbox.files.write_files(writes)
+    return [write["path"] for write in writes[:-1]]
 
 
 def start_worker_process(
@@ -87,6 +309,25 @@ def start_worker_process(
     work_id: str | None = None,
     session_id: str | None = None,
 ) -> None:
+    envs = worker_start_envs(
+        settings,
+        worker_max_idle_seconds=worker_max_idle_seconds,
+        log_level=log_level,
+        work_id=work_id,
+        session_id=session_id,
+    )
+    result = run_bootstrap(sandbox, [worker_start_step()], envs=envs, timeout=15)
+    raise_for_bootstrap(result, "worker start")
+
+
+def worker_start_envs(
+    settings: Settings,
+    *,
+    worker_max_idle_seconds: float | None,
+    log_level: str,
+    work_id: str | None = None,
+    session_id: str | None = None,
+) -> dict[str, str]:
     envs = {
         "ANTHROPIC_ENVIRONMENT_ID": settings.require_anthropic_environment_id(),
         "ANTHROPIC_ENVIRONMENT_KEY": settings.require_anthropic_environment_key(),
@@ -99,26 +340,33 @@ def start_worker_process(
         envs["ANTHROPIC_WORK_ID"] = work_id
     if session_id:
         envs["ANTHROPIC_SESSION_ID"] = session_id
-    wrapper = f"""
-    set -eu
-    cd /mnt/session
-    nohup python {shlex.quote(REMOTE_WORKER)} > {shlex.quote(REMOTE_LOG)} 2>&1 < /dev/null &
-    printf '%s\\n' "$!" > {shlex.quote(REMOTE_PID)}
-    """
-    result = sandbox.commands.run(f"bash -lc {shlex.quote(wrapper)}", envs=envs, timeout=15)
-    if result.exit_code not in (0, None):
-        raise RuntimeError(f"worker start failed:\n{result.stdout}\n{result.stderr}")
+    return envs
 
 
-def worker_process_is_running(sandbox: Sandbox) -> bool:
-    check = (
+def worker_start_step() -> BootstrapStep:
+    return BootstrapStep(
+        "start_worker",
+        f"""
+        cd {shlex.quote(REMOTE_WORKDIR)}
+        nohup python {shlex.quote(REMOTE_WORKER)} > {shlex.quote(REMOTE_LOG)} 2>&1 < /dev/null &
+        printf '%s\\n' "$!" > {shlex.quote(REMOTE_PID)}
+        """,
+    )
+
+
+def worker_process_check_command() -> str:
+    # commands.run already starts a shell, so the check runs in it directly.
+    return (
         f"test -f {shlex.quote(REMOTE_PID)} && "
         f'pid="$(cat {shlex.quote(REMOTE_PID)})" && '
         'test -n "$pid" && '
         'kill -0 "$pid"'
     )
+
+
+def worker_process_is_running(sandbox: Sandbox) -> bool:
     try:
-        result = sandbox.commands.run(f"bash -lc {shlex.quote(check)}", timeout=5)
+        result = sandbox.commands.run(worker_process_check_command(), timeout=5)
     except Exception:
         return False
     return result.exit_code == 0
@@ -133,8 +381,12 @@ def ensure_worker_process(
     work_id: str | None = None,
     session_id: str | None = None,
 ) -> None:
-    upload_worker(sandbox)
     handles_claimed_work = bool(work_id or session_id)
+    if not handles_claimed_work:
+        status = read_worker_status(sandbox)
+        if status is not None and status.is_current(worker_code_version()):
+            return
+    upload_worker(sandbox)
     if not handles_claimed_work and worker_process_is_running(sandbox):
         return
     start_worker_process(
@@ -175,7 +427,7 @@ def start_worker_sandbox(
         session_id=session_id,
     )
     if settings.anthropic_api_key:
-        add_sandbox_to_metadata_store(
+        metadata_writer().add(
             api_key=settings.anthropic_api_key,
             environment_id=settings.require_anthropic_environment_id(),
             legacy_key=WORKER_SANDBOX_METADATA_KEY,
@@ -225,14 +477,9 @@ def ensure_worker_sandbox(
     )
 
 
-def start_webhook_server_process(
-    sandbox: Sandbox,
-    settings: Settings,
-    *,
-    worker_max_idle_seconds: float | None,
-    log_level: str,
-    port: int,
-) -> None:
+def webhook_server_envs(
+    settings: Settings, *, worker_max_idle_seconds: float | None, log_level: str
+) -> dict[str, str]:
     envs = {
         "ANTHROPIC_ENVIRONMENT_ID": settings.require_anthropic_environment_id(),
         "ANTHROPIC_ENVIRONMENT_KEY": settings.require_anthropic_environment_key(),
@@ -243,52 +490,99 @@ def start_webhook_server_process(
     }
     if settings.anthropic_webhook_signing_key:
         envs["ANTHROPIC_WEBHOOK_SIGNING_KEY"] = settings.anthropic_webhook_signing_key
-    uvicorn_command = (
-        "python -m uvicorn anthropic_managed_agents_e2b.webhook_runtime:app "
-        f"--host 0.0.0.0 --port {port} > {shlex.quote(REMOTE_WEBHOOK_LOG)} "
-        "2>&1 < /dev/null &"
+    return envs
+
+
+def webhook_config_steps(settings: Settings) -> list[BootstrapStep]:
+    # Values come from the command environment so secrets never appear in the script text.
+    config_files = [
+        ("environment_id", REMOTE_ENVIRONMENT_ID, "ANTHROPIC_ENVIRONMENT_ID"),
+        ("environment_key", REMOTE_ENVIRONMENT_KEY, "ANTHROPIC_ENVIRONMENT_KEY"),
+        ("worker_max_idle_seconds", REMOTE_WORKER_MAX_IDLE_SECONDS, "WORKER_MAX_IDLE_SECONDS"),
+        ("log_level", REMOTE_LOG_LEVEL, "LOG_LEVEL"),
+    ]
+    if settings.anthropic_webhook_signing_key:
+        config_files.append(
+            ("webhook_signing_key", REMOTE_WEBHOOK_SIGNING_KEY, "ANTHROPIC_WEBHOOK_SIGNING_KEY")
+        )
+    config_dir = shlex.quote(REMOTE_CONFIG_DIR)
+    return [
+        BootstrapStep("make_config_dir", f"mkdir -p {config_dir} && chmod 700 {config_dir}"),
+        *(
+            BootstrapStep(
+                f"write_{name}",
+                f"umask 077 && printf '%s\\n' \"${env_name}\" > {shlex.quote(path)}",
+            )
+            for name, path, env_name in config_files
+        ),
+        BootstrapStep("chmod_config", f"chmod 600 {config_dir}/*"),
+    ]
+
+
+def webhook_server_start_step(port: int) -> BootstrapStep:
+    return BootstrapStep(
+        "start_webhook_server",
+        f"""
+        cd {shlex.quote(REMOTE_DIR)}
+        nohup python -m uvicorn anthropic_managed_agents_e2b.webhook_runtime:app \\
+            --host 0.0.0.0 --port {port} > {shlex.quote(REMOTE_WEBHOOK_LOG)} 2>&1 < /dev/null &
+        printf '%s\\n' "$!" > {shlex.quote(REMOTE_WEBHOOK_PID)}
+        """,
     )
-    wrapper = f"""
-    set -eu
-    cd /opt/anthropic-managed-agents
-    nohup {uvicorn_command}
-    printf '%s\\n' "$!" > {shlex.quote(REMOTE_WEBHOOK_PID)}
-    """
-    result = sandbox.commands.run(f"bash -lc {shlex.quote(wrapper)}", envs=envs, timeout=15)
-    if result.exit_code not in (0, None):
-        raise RuntimeError(f"webhook server start failed:\n{result.stdout}\n{result.stderr}")
 
 
-def write_webhook_config(
+def start_webhook_server_process(
     sandbox: Sandbox,
     settings: Settings,
     *,
     worker_max_idle_seconds: float | None,
     log_level: str,
+    port: int,
 ) -> None:
-    sandbox.commands.run(
-        f"mkdir -p {shlex.quote(REMOTE_CONFIG_DIR)} && chmod 700 {shlex.quote(REMOTE_CONFIG_DIR)}",
-        timeout=5,
+    envs = webhook_server_envs(
+        settings, worker_max_idle_seconds=worker_max_idle_seconds, log_level=log_level
     )
-    sandbox.files.write(
-        REMOTE_ENVIRONMENT_ID,
-        f"{settings.require_anthropic_environment_id()}\n",
+    result = run_bootstrap(sandbox, [webhook_server_start_step(port)], envs=envs, timeout=15)
+    raise_for_bootstrap(result, "webhook server start")
+
+
+def write_webhook_config(
+    sandbox: Sandbox,
+    settings: Settings,
+    *,
+    worker_max_idle_seconds: float | None,
+    log_level: str,
+) -> None:
+    envs = webhook_server_envs(
+        settings, worker_max_idle_seconds=worker_max_idle_seconds, log_level=log_level
     )
-    sandbox.files.write(
-        REMOTE_ENVIRONMENT_KEY,
-        f"{settings.require_anthropic_environment_key()}\n",
+    result = run_bootstrap(sandbox, webhook_config_steps(settings), envs=envs, timeout=15)
+    raise_for_bootstrap(result, "webhook config")
+
+
+def bootstrap_webhook_server(
+    sandbox: Sandbox,
+    settings: Settings,
+    *,
+    worker_max_idle_seconds: float | None,
+    log_level: str,
+    port: int,
+    batched: bool = True,
+) -> BootstrapResult:
+    """Upload the runtime, write the config files, and start Uvicorn in one remote command."""
+    upload_worker(sandbox)
+    envs = webhook_server_envs(
+        settings, worker_max_idle_seconds=worker_max_idle_seconds, log_level=log_level
     )
-    sandbox.files.write(
-        REMOTE_WORKER_MAX_IDLE_SECONDS,
-        "none\n" if worker_max_idle_seconds is None else f"{worker_max_idle_seconds}\n",
+    result = run_bootstrap(
+        sandbox,
+        [*webhook_config_steps(settings), webhook_server_start_step(port)],
+        envs=envs,
+        timeout=30,
+        batched=batched,
     )
-    sandbox.files.write(REMOTE_LOG_LEVEL, f"{log_level}\n")
-    if settings.anthropic_webhook_signing_key:
-        sandbox.files.write(
-            REMOTE_WEBHOOK_SIGNING_KEY,
-            f"{settings.anthropic_webhook_signing_key}\n",
-        )
-    sandbox.commands.run(f"chmod 600 {shlex.quote(REMOTE_CONFIG_DIR)}/*", timeout=5)
+    raise_for_bootstrap(result, "webhook server bootstrap")
+    return result
 
 
 def start_webhook_server_sandbox(
@@ -310,21 +604,11 @@ def start_webhook_server_sandbox(
         sandbox = Sandbox.create(
             template_name,
             timeout=timeout_seconds,
-            lifecycle={"on_timeout": "pause", "auto_resume": True},
-            metadata={
-                "managed_by": "anthropic-managed-agents-e2b-webhook",
-                "anthropic.environment_id": settings.anthropic_environment_id or "",
-            },
+            lifecycle=WORKER_SANDBOX_LIFECYCLE,
+            metadata=webhook_sandbox_metadata(settings),
         )
 
-    upload_worker(sandbox)
-    write_webhook_config(
-        sandbox,
-        settings,
-        worker_max_idle_seconds=worker_max_idle_seconds,
-        log_level=log_level,
-    )
-    start_webhook_server_process(
+    bootstrap_webhook_server(
         sandbox,
         settings,
         worker_max_idle_seconds=worker_max_idle_seconds,
@@ -344,13 +628,15 @@ def start_webhook_server_sandbox(
 
 def stop_worker_sandbox(settings: Settings, sandbox_id: str) -> None:
     Sandbox.kill(sandbox_id)
-    JsonSandboxStore().remove_sandbox(sandbox_id=sandbox_id)
+    open_sandbox_store().remove_sandbox(sandbox_id=sandbox_id)
     if settings.anthropic_api_key and settings.anthropic_environment_id:
-        clear_matching_sandbox_metadata(
+        # Removing through the writer keeps it ordered after any add still waiting to be written.
+        metadata_writer().remove(
             api_key=settings.anthropic_api_key,
             environment_id=settings.anthropic_environment_id,
             sandbox_id=sandbox_id,
         )
+        metadata_writer().flush()
 
 
 def upload_file_to_sandbox(*, sandbox_id: str, local_path: Path, remote_path: str) -> str:
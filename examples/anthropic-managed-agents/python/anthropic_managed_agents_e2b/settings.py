@@ -16,6 +16,13 @@ DEFAULT_APP_SANDBOX_TIMEOUT_SECONDS = 300
 DEFAULT_WEBHOOK_PORT = 8000
 DEFAULT_LOG_LEVEL = "INFO"
 MAX_WEBHOOK_BODY_BYTES = 1_048_576
+DEFAULT_APP_WARM_POOL_SIZE = 0
+DEFAULT_APP_WARM_POOL_TTL_SECONDS = 3600.0
+DEFAULT_APP_MAX_IN_FLIGHT_WORK = 16
+DEFAULT_APP_SANDBOX_LIFECYCLE = "fixed"
+DEFAULT_APP_DRAIN_DEBOUNCE_SECONDS = 0.25
+DEFAULT_APP_DRAIN_GRACE_SECONDS = 30.0
+DEFAULT_APP_WEBHOOK_EVENT_CACHE_SIZE = 10_000
 
 
 def load_dotenv_files() -> None:
@@ -28,6 +35,26 @@ def _optional(name: str) -> str | None:
     return value or None
 
 
+def _int(name: str, default: int) -> int:
+    value = _optional(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise RuntimeError(f"{name} must be an integer") from None
+
+
+def _float(name: str, default: float) -> float:
+    value = _optional(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise RuntimeError(f"{name} must be a number") from None
+
+
 @dataclass(frozen=True)
 class Settings:
     anthropic_api_key: str | None
@@ -37,6 +64,15 @@ class Settings:
     anthropic_webhook_signing_key: str | None
     app_webhook_admin_token: str | None
     app_sandbox_routing_scope: str | None
+    app_warm_pool_size: int = DEFAULT_APP_WARM_POOL_SIZE
+    app_warm_pool_max_size: int = DEFAULT_APP_WARM_POOL_SIZE
+    app_warm_pool_ttl_seconds: float = DEFAULT_APP_WARM_POOL_TTL_SECONDS
+    app_max_in_flight_work: int = DEFAULT_APP_MAX_IN_FLIGHT_WORK
+    app_sandbox_lifecycle: str = DEFAULT_APP_SANDBOX_LIFECYCLE
+    app_lifecycle_trace_path: Path | None = None
+    app_drain_debounce_seconds: float = DEFAULT_APP_DRAIN_DEBOUNCE_SECONDS
+    app_drain_grace_seconds: float = DEFAULT_APP_DRAIN_GRACE_SECONDS
+    app_webhook_event_cache_size: int = DEFAULT_APP_WEBHOOK_EVENT_CACHE_SIZE
 
     def require(self, field_name: str, env_name: str) -> str:
         value = getattr(self, field_name)
@@ -62,6 +98,8 @@ class Settings:
 
 def load_settings() -> Settings:
     load_dotenv_files()
+    warm_pool_size = _int("APP_WARM_POOL_SIZE", DEFAULT_APP_WARM_POOL_SIZE)
+    trace_path = _optional("APP_LIFECYCLE_TRACE_PATH")
     return Settings(
         anthropic_api_key=_optional("ANTHROPIC_API_KEY"),
         anthropic_agent_id=_optional("ANTHROPIC_AGENT_ID"),
@@ -70,4 +108,19 @@ def load_settings() -> Settings:
         anthropic_webhook_signing_key=_optional("ANTHROPIC_WEBHOOK_SIGNING_KEY"),
         app_webhook_admin_token=_optional("APP_WEBHOOK_ADMIN_TOKEN"),
         app_sandbox_routing_scope=_optional("APP_SANDBOX_ROUTING_SCOPE"),
+        app_warm_pool_size=warm_pool_size,
+        app_warm_pool_max_size=_int("APP_WARM_POOL_MAX_SIZE", warm_pool_size),
+        app_warm_pool_ttl_seconds=_float(
+            "APP_WARM_POOL_TTL_SECONDS", DEFAULT_APP_WARM_POOL_TTL_SECONDS
+        ),
+        app_max_in_flight_work=_int("APP_MAX_IN_FLIGHT_WORK", DEFAULT_APP_MAX_IN_FLIGHT_WORK),
+        app_sandbox_lifecycle=_optional("APP_SANDBOX_LIFECYCLE") or DEFAULT_APP_SANDBOX_LIFECYCLE,
+        app_lifecycle_trace_path=Path(trace_path) if trace_path else None,
+        app_drain_debounce_seconds=_float(
+            "APP_DRAIN_DEBOUNCE_SECONDS", DEFAULT_APP_DRAIN_DEBOUNCE_SECONDS
+        ),
+        app_drain_grace_seconds=_float("APP_DRAIN_GRACE_SECONDS", DEFAULT_APP_DRAIN_GRACE_SECONDS),
+        app_webhook_event_cache_size=_int(
+            "APP_WEBHOOK_EVENT_CACHE_SIZE", DEFAULT_APP_WEBHOOK_EVENT_CACHE_SIZE
+        ),
     )
@@ -1,23 +1,43 @@
 from __future__ import annotations
 
+import shlex
+
 from e2b import Template
 
+from anthropic_managed_agents_e2b.sandbox_worker import (
+    REMOTE_WORKER,
+    REMOTE_WORKER_ENTRYPOINT,
+    REMOTE_WORKER_MANIFEST,
+    worker_upload_files,
+)
+
 REMOTE_DIR = "/opt/anthropic-managed-agents"
 REMOTE_CONFIG_DIR = f"{REMOTE_DIR}/config"
 REMOTE_PACKAGE_DIR = f"{REMOTE_DIR}/anthropic_managed_agents_e2b"
 PACKAGE_FILES = [
     "__init__.py",
     "agent.py",
+    "app_resources.py",
     "app_sandbox_store.py",
     "app_webhook_server.py",
+    "async_sandbox_worker.py",
+    "benchmark.py",
+    "caching.py",
     "cli.py",
+    "drain_coalescer.py",
     "environment.py",
+    "keyed_locks.py",
+    "sandbox_lifecycle.py",
+    "sandbox_reaper.py",
     "sandbox_worker.py",
     "session.py",
     "settings.py",
     "template.py",
     "template_builder.py",
+    "warm_pool.py",
     "webhook_runtime.py",
+    "webhook_signature.py",
+    "work_dispatcher.py",
     "worker_runtime.py",
 ]
 
@@ -45,7 +65,7 @@ def worker_template() -> Template:
         )
         .run_cmd(
             "python -m pip install --no-cache-dir "
-            "'anthropic[webhooks]>=0.103.0' 'fastapi>=0.116.0' 'uvicorn>=0.35.0'"
+            "'anthropic[webhooks]>=1.2.0' 'fastapi>=0.116.0' 'uvicorn>=0.35.0'"
         )
         .run_cmd(
             "sudo mkdir -p /mnt/session /opt/anthropic-managed-agents "
@@ -56,6 +76,15 @@ def worker_template() -> Template:
             "sudo chmod 700 /opt/anthropic-managed-agents/config"
         )
         .copy(PACKAGE_FILES, REMOTE_PACKAGE_DIR)
+        .run_cmd(
+            f"printf %s {shlex.quote(REMOTE_WORKER_ENTRYPOINT)} > {REMOTE_WORKER} && "
+            f"sha256sum {' '.join(worker_upload_files())} > {REMOTE_WORKER_MANIFEST}"
+        )
+        # Bytecode baked into the image spares every cold worker process from compiling it.
+        .run_cmd(
+            "python -m compileall -q /opt/anthropic-managed-agents "
+            '"$(python -c \'import sysconfig; print(sysconfig.get_paths()["purelib"])\')"'
+        )
         .run_cmd("python --version && rg --version | head -1")
         .set_workdir("/mnt/session")
     )
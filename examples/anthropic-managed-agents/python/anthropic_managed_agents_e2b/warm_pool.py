@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from e2b import Sandbox
+
+from anthropic_managed_agents_e2b.sandbox_worker import (
+    create_or_connect_worker_sandbox,
+    upload_worker,
+)
+from anthropic_managed_agents_e2b.settings import Settings
+
+logger = logging.getLogger(__name__)
+WARM_POOL_METADATA = {"anthropic.pool": "warm"}
+WARM_POOL_RETRY_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class WarmSandbox:
+    sandbox_id: str
+    created_at: float
+
+
+class WarmSandboxPool:
+    """Idle worker sandboxes with the worker package already uploaded.
+
+    ``claim()`` pops the oldest ready sandbox in O(1) and wakes a background thread that creates
+    replacements. The pool starts at ``size`` idle sandboxes and grows by one on every miss, up
+    to ``max_size``; each TTL eviction shrinks it back by one. Pool sandboxes use the same
+    pause-on-timeout lifecycle as regular workers, so an unclaimed sandbox pauses after
+    ``timeout_seconds`` and resumes when it is claimed.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        template_name: str,
+        timeout_seconds: int,
+        size: int,
+        max_size: int,
+        ttl_seconds: float,
+    ) -> None:
+        self.settings = settings
+        self.template_name = template_name
+        self.timeout_seconds = timeout_seconds
+        self.size = size
+        self.max_size = max(size, max_size)
+        self.ttl_seconds = ttl_seconds
+        self._target = size
+        self._ready: deque[WarmSandbox] = deque()
+        self._creating = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.create_failures = 0
+        self._claim_seconds_total = 0.0
+        self._claim_seconds_max = 0.0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._replenish_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self, *, kill: bool = True) -> None:
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+        with self._lock:
+            idle = list(self._ready)
+            self._ready.clear()
+        if kill:
+            for warm in idle:
+                _kill_quietly(warm.sandbox_id)
+
+    def claim(self) -> str | None:
+        """Return the id of a ready sandbox, or ``None`` when the pool is empty."""
+        started = time.perf_counter()
+        expired: list[WarmSandbox] = []
+        claimed: WarmSandbox | None = None
+        with self._lock:
+            now = time.monotonic()
+            while self._ready:
+                warm = self._ready.popleft()
+                if now - warm.created_at < self.ttl_seconds:
+                    claimed = warm
+                    break
+                expired.append(warm)
+                self.evictions += 1
+                self._target = max(self.size, self._target - 1)
+            if claimed is None:
+                self.misses += 1
+                self._target = min(self.max_size, self._target + 1)
+            else:
+                self.hits += 1
+            elapsed = time.perf_counter() - started
+            self._claim_seconds_total += elapsed
+            self._claim_seconds_max = max(self._claim_seconds_max, elapsed)
+        self._wake.set()
+        for warm in expired:
+            _kill_quietly(warm.sandbox_id)
+        return claimed.sandbox_id if claimed else None
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            claims = self.hits + self.misses
+            return {
+                "ready": len(self._ready),
+                "creating": self._creating,
+                "target": self._target,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "create_failures": self.create_failures,
+                "claim_seconds_avg": self._claim_seconds_total / claims if claims else 0.0,
+                "claim_seconds_max": self._claim_seconds_max,
+            }
+
+    def _replenish_loop(self) -> None:
+        while not self._stopped.is_set():
+            self._evict_expired()
+            with self._lock:
+                wanted = self._target - len(self._ready) - self._creating
+                if wanted > 0:
+                    self._creating += 1
+            if wanted <= 0:
+                self._wake.wait(timeout=min(self.ttl_seconds, 60.0))
+                self._wake.clear()
+                continue
+
+            try:
+                warm = self._create()
+            except Exception:
+                logger.exception("failed to create warm worker sandbox")
+                with self._lock:
+                    self._creating -= 1
+                    self.create_failures += 1
+                self._stopped.wait(WARM_POOL_RETRY_SECONDS)
+                continue
+
+            with self._lock:
+                self._creating -= 1
+                if self._stopped.is_set() or len(self._ready) >= self.max_size:
+                    surplus = warm
+                else:
+                    self._ready.append(warm)
+                    surplus = None
+            if surplus is not None:
+                _kill_quietly(surplus.sandbox_id)
+
+    def _evict_expired(self) -> None:
+        expired: list[WarmSandbox] = []
+        with self._lock:
+            now = time.monotonic()
+            while self._ready and now - self._ready[0].created_at >= self.ttl_seconds:
+                expired.append(self._ready.popleft())
+                self.evictions += 1
+                self._target = max(self.size, self._target - 1)
+        for warm in expired:
+            _kill_quietly(warm.sandbox_id)
+
+    def _create(self) -> WarmSandbox:
+        sandbox = create_or_connect_worker_sandbox(
+            self.settings,
+            template_name=self.template_name,
+            timeout_seconds=self.timeout_seconds,
+            metadata=WARM_POOL_METADATA,
+        )
+        try:
+            upload_worker(sandbox)
+        except Exception:
+            _kill_quietly(sandbox.sandbox_id)
+            raise
+        return WarmSandbox(sandbox_id=sandbox.sandbox_id, created_at=time.monotonic())
+
+
+def _kill_quietly(sandbox_id: str) -> None:
+    try:
+        Sandbox.kill(sandbox_id)
+    except Exception:
+        logger.exception("failed to kill warm worker sandbox %s", sandbox_id)
@@ -1,13 +1,27 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import logging
 import os
 import subprocess
-import threading
+from collections.abc import AsyncIterator, Coroutine
+from contextlib import asynccontextmanager
+from functools import cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import anthropic
 from fastapi import FastAPI, Request, Response
 
+from anthropic_managed_agents_e2b.webhook_signature import (
+    WebhookBodyTooLarge,
+    WebhookSignatureError,
+    read_verified_body,
+)
+
+if TYPE_CHECKING:
+    import anthropic
+
 REMOTE_DIR = Path("/opt/anthropic-managed-agents")
 REMOTE_CONFIG_DIR = REMOTE_DIR / "config"
 REMOTE_WORKDIR = Path("/mnt/session")
@@ -15,6 +29,7 @@ REMOTE_WORKER = REMOTE_DIR / "worker.py"
 REMOTE_PID = REMOTE_DIR / "worker.pid"
 REMOTE_PIDS_DIR = REMOTE_DIR / "worker-pids"
 REMOTE_LOG = REMOTE_DIR / "worker.log"
+REMOTE_WORKER_POOL_SOCKET = REMOTE_DIR / "worker-pool.sock"
 REMOTE_ENVIRONMENT_ID = REMOTE_CONFIG_DIR / "anthropic-environment-id"
 REMOTE_ENVIRONMENT_KEY = REMOTE_CONFIG_DIR / "anthropic-environment-key"
 REMOTE_WEBHOOK_SIGNING_KEY = REMOTE_CONFIG_DIR / "anthropic-webhook-signing-key"
@@ -22,13 +37,22 @@ REMOTE_WORKER_MAX_IDLE_SECONDS = REMOTE_CONFIG_DIR / "worker-max-idle-seconds"
 REMOTE_LOG_LEVEL = REMOTE_CONFIG_DIR / "log-level"
 MAX_WEBHOOK_BODY_BYTES = 1_048_576
 MAX_WORKERS = max(1, int(os.environ.get("MAX_WORKERS", "4")))
-WORKER_RETRY_SECONDS = 5
+WORKER_POOL = os.environ.get("WORKER_POOL", "1").lower() not in {"0", "false", "no"}
+WORKER_POOL_START_SECONDS = 30.0
+# After a failed pool start, items run in their own processes for this long before a retry.
+WORKER_POOL_RETRY_SECONDS = 60.0
+# How often starts held back by a saturated pool are offered to it again.
+WORKER_POOL_PENDING_POLL_SECONDS = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+@cache
+def webhook_client() -> anthropic.Anthropic:
+    # The SDK import is most of the server's startup time; lifespan() warms it in the background.
+    import anthropic
 
-app = FastAPI()
-client = anthropic.Anthropic(api_key="not-needed")
-worker_state_lock = threading.Lock()
-pending_worker_starts = 0
-worker_retry_timer: threading.Timer | None = None
+    return anthropic.Anthropic(api_key="not-needed")
 
 
 def file_value(path: Path) -> str | None:
@@ -75,80 +99,242 @@ def pid_file_value(path: Path) -> int | None:
         return None
 
 
-def _active_worker_pids_locked() -> list[int]:
-    REMOTE_PIDS_DIR.mkdir(parents=True, exist_ok=True)
-    pids: list[int] = []
-
-    for path in REMOTE_PIDS_DIR.iterdir():
-        pid = pid_file_value(path)
-        if pid is not None and process_is_running(pid):
-            pids.append(pid)
-        else:
-            path.unlink(missing_ok=True)
-
-    latest_pid = pid_file_value(REMOTE_PID)
-    if latest_pid is not None and process_is_running(latest_pid) and latest_pid not in pids:
-        pids.append(latest_pid)
-
-    return pids
-
+class WorkerSupervisor:
+    """Tracks worker processes in memory and starts queued work as soon as a slot frees.
+
+    Children are awaited through asyncio's child watcher, so an exit wakes the event loop
+    directly instead of being found by a pid scan. Pid files are written only so a restarted
+    server can ``recover()`` workers that outlived it; those are watched through a pidfd.
+
+    With ``pool_socket`` set, starts go to a long-lived ``worker_runtime.WorkerPool`` process
+    that runs each item as a task on an already-imported client. A process per item is the
+    fallback when the pool cannot be reached; the pool is then restarted in the background, at
+    most once per ``WORKER_POOL_RETRY_SECONDS``, so a webhook never waits on a pool start. Items
+    running in the pool count against ``max_workers`` too.
+    """
+
+    def __init__(self, max_workers: int, *, pool_socket: Path | None = None) -> None:
+        self.max_workers = max_workers
+        self.pool_socket = pool_socket
+        self.pool: asyncio.subprocess.Process | None = None
+        self.pool_running = 0
+        self._pool_lock = asyncio.Lock()
+        self._pool_retry_at = 0.0
+        self._pool_restart: asyncio.Task[bool] | None = None
+        self._pending_poll: asyncio.Task[None] | None = None
+        self.children: dict[int, asyncio.subprocess.Process] = {}
+        self.adopted: dict[int, int] = {}
+        self.starting = 0
+        self.pending = 0
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @property
+    def active(self) -> int:
+        return len(self.children) + len(self.adopted) + self.starting
+
+    def recover(self) -> None:
+        REMOTE_PIDS_DIR.mkdir(parents=True, exist_ok=True)
+        for path in REMOTE_PIDS_DIR.iterdir():
+            pid = pid_file_value(path)
+            if pid is None or not process_is_running(pid) or not self._adopt(pid):
+                path.unlink(missing_ok=True)
+
+        latest_pid = pid_file_value(REMOTE_PID)
+        if latest_pid is not None and latest_pid not in self.adopted:
+            if process_is_running(latest_pid):
+                self._adopt(latest_pid)
+
+    async def request_start(self) -> None:
+        if self.pool_socket is not None and await self._start_in_pool():
+            return
+        if self.active + self.pool_running >= self.max_workers:
+            self.pending = min(self.pending + 1, self.max_workers)
+            self._poll_pending()
+            return
+        await self._start()
+
+    async def start_pool(self) -> bool:
+        if self.pool_socket is None:
+            return False
+        async with self._pool_lock:
+            if await self.pool_status() is not None:
+                return True
+            if self.pool is not None and self.pool.returncode is None:
+                # Alive but not answering on the socket; replace it rather than leak it.
+                await self._kill_pool()
+            with REMOTE_LOG.open("ab") as log_file:
+                self.pool = await asyncio.create_subprocess_exec(
+                    "python",
+                    str(REMOTE_WORKER),
+                    cwd=REMOTE_WORKDIR,
+                    stdin=subprocess.DEVNULL,
+                    stdout=log_file,
+                    stderr=subprocess.STDOUT,
+                    start_new_session=True,
+                    env={
+                        **worker_env(),
+                        "WORKER_POOL_SOCKET": str(self.pool_socket),
+                        "MAX_WORKERS": str(self.max_workers),
+                    },
+                )
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + WORKER_POOL_START_SECONDS
+            while self.pool.returncode is None and loop.time() < deadline:
+                if await self.pool_status() is not None:
+                    return True
+                await asyncio.sleep(0.05)
+            await self._kill_pool()
+            self._pool_retry_at = loop.time() + WORKER_POOL_RETRY_SECONDS
+            logger.warning(
+                "worker pool did not start; running one process per item for %.0f seconds",
+                WORKER_POOL_RETRY_SECONDS,
+            )
+            return False
 
-def active_worker_pids() -> list[int]:
-    with worker_state_lock:
-        return _active_worker_pids_locked()
+    async def pool_status(self) -> dict[str, object] | None:
+        return await self._pool_request({"op": "status"})
 
+    async def _kill_pool(self) -> None:
+        if self.pool is None or self.pool.returncode is not None:
+            return
+        self.pool.kill()
+        await self.pool.wait()
 
-def _schedule_worker_retry_locked() -> None:
-    global worker_retry_timer
+    def _restart_pool(self) -> None:
+        if self._pool_restart is not None and not self._pool_restart.done():
+            return
+        if asyncio.get_running_loop().time() < self._pool_retry_at:
+            return
+        self._pool_restart = asyncio.create_task(self.start_pool())
+
+    def close(self) -> None:
+        for task in (self._pool_restart, self._pending_poll):
+            if task is not None:
+                task.cancel()
+        loop = asyncio.get_running_loop()
+        for pidfd in self.adopted.values():
+            loop.remove_reader(pidfd)
+            os.close(pidfd)
+        self.adopted.clear()
+
+    def _adopt(self, pid: int) -> bool:
+        try:
+            pidfd = os.pidfd_open(pid)
+        except (AttributeError, OSError):
+            return False
+        self.adopted[pid] = pidfd
+        asyncio.get_running_loop().add_reader(pidfd, self._adopted_exited, pid)
+        return True
+
+    async def _start_in_pool(self) -> bool:
+        response = await self._pool_request({"op": "start"})
+        if response is None:
+            # Its tasks died with it. This item runs in its own process while the pool restarts.
+            self.pool_running = 0
+            self._restart_pool()
+            return False
+        self.pool_running = int(response.get("running", 0))
+        if not response.get("accepted"):
+            # The pool is up but its queue is full; a separate process takes the item instead.
+            logger.info("worker pool is full; starting the item in its own process")
+            return False
+        return True
+
+    async def _pool_request(self, request: dict[str, object]) -> dict[str, object] | None:
+        try:
+            reader, writer = await asyncio.open_unix_connection(str(self.pool_socket))
+        except OSError:
+            return None
+        try:
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            return json.loads(await reader.readline())
+        except (OSError, ValueError):
+            return None
+        finally:
+            writer.close()
+
+    async def _start(self) -> None:
+        self.starting += 1
+        try:
+            with REMOTE_LOG.open("ab") as log_file:
+                process = await asyncio.create_subprocess_exec(
+                    "python",
+                    str(REMOTE_WORKER),
+                    cwd=REMOTE_WORKDIR,
+                    stdin=subprocess.DEVNULL,
+                    stdout=log_file,
+                    stderr=subprocess.STDOUT,
+                    start_new_session=True,
+                    env=worker_env(),
+                )
+        finally:
+            self.starting -= 1
+        self.children[process.pid] = process
+        REMOTE_PID.write_text(f"{process.pid}\n")
+        REMOTE_PIDS_DIR.mkdir(parents=True, exist_ok=True)
+        (REMOTE_PIDS_DIR / f"{process.pid}.pid").write_text(f"{process.pid}\n")
+        self._spawn(self._wait(process))
 
-    if worker_retry_timer is not None or pending_worker_starts == 0:
-        return
+    async def _wait(self, process: asyncio.subprocess.Process) -> None:
+        await process.wait()
+        del self.children[process.pid]
+        (REMOTE_PIDS_DIR / f"{process.pid}.pid").unlink(missing_ok=True)
+        await self._start_pending()
+
+    def _adopted_exited(self, pid: int) -> None:
+        pidfd = self.adopted.pop(pid)
+        asyncio.get_running_loop().remove_reader(pidfd)
+        os.close(pidfd)
+        (REMOTE_PIDS_DIR / f"{pid}.pid").unlink(missing_ok=True)
+        self._spawn(self._start_pending())
+
+    async def _start_pending(self) -> None:
+        while self.pending:
+            if self.pool_socket is not None and await self._start_in_pool():
+                self.pending -= 1
+                continue
+            if self.active + self.pool_running >= self.max_workers:
+                return
+            self.pending -= 1
+            await self._start()
+
+    def _poll_pending(self) -> None:
+        # Pool tasks finishing do not wake this process, so held-back starts are retried.
+        if self.pool_socket is None:
+            return
+        if self._pending_poll is None or self._pending_poll.done():
+            self._pending_poll = asyncio.create_task(self._retry_pending())
 
-    worker_retry_timer = threading.Timer(
-        WORKER_RETRY_SECONDS,
-        lambda: start_worker_if_capacity(retrying_pending_start=True),
-    )
-    worker_retry_timer.daemon = True
-    worker_retry_timer.start()
+    async def _retry_pending(self) -> None:
+        while self.pending:
+            await asyncio.sleep(WORKER_POOL_PENDING_POLL_SECONDS)
+            await self._start_pending()
 
+    def _spawn(self, coroutine: Coroutine[object, object, None]) -> None:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
 
-def cleanup_worker_on_exit(process: subprocess.Popen[bytes]) -> None:
-    process.wait()
-    with worker_state_lock:
-        (REMOTE_PIDS_DIR / f"{process.pid}.pid").unlink(missing_ok=True)
-        _schedule_worker_retry_locked()
 
+supervisor = WorkerSupervisor(
+    MAX_WORKERS, pool_socket=REMOTE_WORKER_POOL_SOCKET if WORKER_POOL else None
+)
 
-def start_worker_if_capacity(*, retrying_pending_start: bool = False) -> None:
-    global pending_worker_starts, worker_retry_timer
 
-    with worker_state_lock:
-        if retrying_pending_start:
-            worker_retry_timer = None
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    supervisor.recover()
+    warm_client = asyncio.get_running_loop().run_in_executor(None, webhook_client)
+    await supervisor.start_pool()
+    await warm_client
+    try:
+        yield
+    finally:
+        supervisor.close()
 
-        if len(_active_worker_pids_locked()) >= MAX_WORKERS:
-            if not retrying_pending_start:
-                pending_worker_starts = min(pending_worker_starts + 1, MAX_WORKERS)
-            _schedule_worker_retry_locked()
-            return
 
-        if retrying_pending_start:
-            pending_worker_starts = max(0, pending_worker_starts - 1)
-
-        with REMOTE_LOG.open("ab") as log_file:
-            process = subprocess.Popen(
-                ["python", str(REMOTE_WORKER)],
-                cwd=REMOTE_WORKDIR,
-                stdin=subprocess.DEVNULL,
-                stdout=log_file,
-                stderr=subprocess.STDOUT,
-                start_new_session=True,
-                env=worker_env(),
-            )
-        REMOTE_PID.write_text(f"{process.pid}\n")
-        (REMOTE_PIDS_DIR / f"{process.pid}.pid").write_text(f"{process.pid}\n")
-        threading.Thread(target=cleanup_worker_on_exit, args=(process,), daemon=True).start()
-        _schedule_worker_retry_locked()
+app = FastAPI(lifespan=lifespan)
 
 
 def webhook_signing_key() -> str | None:
@@ -158,25 +344,20 @@ def webhook_signing_key() -> str | None:
     return config_value("ANTHROPIC_WEBHOOK_SIGNING_KEY", key_file)
 
 
-async def read_limited_body(request: Request, max_bytes: int) -> str:
-    content_length = request.headers.get("content-length")
-    if content_length and int(content_length) > max_bytes:
-        raise ValueError("request body too large")
-
-    chunks: list[bytes] = []
-    size = 0
-    async for chunk in request.stream():
-        size += len(chunk)
-        if size > max_bytes:
-            raise ValueError("request body too large")
-        chunks.append(chunk)
-    return b"".join(chunks).decode()
-
-
 @app.get("/health")
-def health() -> dict[str, bool | int]:
-    pids = active_worker_pids()
-    return {"ok": True, "worker_running": len(pids) > 0, "worker_count": len(pids)}
+async def health() -> dict[str, object]:
+    count = len(supervisor.children) + len(supervisor.adopted)
+    response: dict[str, object] = {
+        "ok": True,
+        "worker_running": count > 0,
+        "worker_count": count,
+        "pending_worker_starts": supervisor.pending,
+    }
+    pool = await supervisor.pool_status() if supervisor.pool_socket is not None else None
+    if pool is not None:
+        response["worker_pool"] = pool
+        response["worker_running"] = count > 0 or bool(pool.get("running"))
+    return response
 
 
 @app.post("/webhook")
@@ -186,20 +367,21 @@ async def webhook(request: Request) -> Response:
         return Response("ANTHROPIC_WEBHOOK_SIGNING_KEY is required", status_code=503)
 
     try:
-        payload = await read_limited_body(request, MAX_WEBHOOK_BODY_BYTES)
-    except ValueError:
+        payload = await read_verified_body(
+            request.stream(), request.headers, key=signing_key, max_bytes=MAX_WEBHOOK_BODY_BYTES
+        )
+    except WebhookBodyTooLarge:
         return Response("request body too large", status_code=413)
+    except WebhookSignatureError:
+        return Response("invalid signature", status_code=401)
 
     try:
-        event = client.beta.webhooks.unwrap(
-            payload,
-            headers=dict(request.headers),
-            key=signing_key,
-        )
+        # The signature is already checked; json.loads accepts the bytearray as is.
+        event = webhook_client().beta.webhooks.parse_unverified(payload)
     except Exception:
-        return Response("invalid signature", status_code=401)
+        return Response("invalid payload", status_code=400)
 
     if event.data.type == "session.status_run_started":
-        start_worker_if_capacity()
+        await supervisor.request_start()
 
     return Response(status_code=204)
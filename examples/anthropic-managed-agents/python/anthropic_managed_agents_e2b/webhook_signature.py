@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import hmac
+import math
+import time
+from collections.abc import AsyncIterable, Mapping
+from functools import cache
+
+# Same replay window and secret format as the standardwebhooks package behind webhooks.unwrap().
+WEBHOOK_TOLERANCE_SECONDS = 300
+WEBHOOK_SECRET_PREFIX = "whsec_"
+
+
+class WebhookBodyTooLarge(ValueError):
+    pass
+
+
+class WebhookSignatureError(ValueError):
+    pass
+
+
+@cache
+def _signing_secret(key: str) -> bytes:
+    if key.startswith(WEBHOOK_SECRET_PREFIX):
+        key = key[len(WEBHOOK_SECRET_PREFIX) :]
+    try:
+        secret = base64.b64decode(key + "==")
+    except binascii.Error as error:
+        raise WebhookSignatureError("the webhook signing key is not valid base64") from error
+    if not secret:
+        raise WebhookSignatureError("the webhook signing key is empty")
+    return secret
+
+
+def _v1_signatures(header: str) -> list[bytes]:
+    signatures: list[bytes] = []
+    for versioned in header.split(" "):
+        version, _, signature = versioned.partition(",")
+        if version != "v1":
+            continue
+        try:
+            signatures.append(base64.b64decode(signature, validate=True))
+        except binascii.Error:
+            continue
+    return signatures
+
+
+async def read_verified_body(
+    chunks: AsyncIterable[bytes],
+    headers: Mapping[str, str],
+    *,
+    key: str,
+    max_bytes: int,
+    now: float | None = None,
+) -> bytearray:
+    """Read a webhook body while checking its Standard Webhooks signature.
+
+    Missing or stale signature headers and an oversized ``content-length`` are rejected before
+    any of the body is read. Each chunk updates the HMAC as it arrives and is copied once into a
+    buffer sized from ``content-length``, so the digest is ready when the last chunk lands and
+    the verified body is returned without joining or decoding it. ``headers`` must be
+    case-insensitive or lower-cased, as Starlette's are.
+    """
+    msg_id = headers.get("webhook-id")
+    timestamp = headers.get("webhook-timestamp")
+    signature_header = headers.get("webhook-signature")
+    if not (msg_id and timestamp and signature_header):
+        raise WebhookSignatureError("missing webhook signature headers")
+    try:
+        sent_at = float(timestamp)
+    except ValueError:
+        raise WebhookSignatureError("invalid webhook timestamp") from None
+    # float() accepts "nan" and "inf", and nan slips through the tolerance comparison below.
+    if not math.isfinite(sent_at):
+        raise WebhookSignatureError("invalid webhook timestamp")
+    if abs((time.time() if now is None else now) - sent_at) > WEBHOOK_TOLERANCE_SECONDS:
+        raise WebhookSignatureError("webhook timestamp outside the tolerance window")
+    signatures = _v1_signatures(signature_header)
+    if not signatures:
+        raise WebhookSignatureError("no v1 webhook signature")
+
+    content_length = headers.get("content-length")
+    try:
+        expected_size = int(content_length) if content_length else None
+    except ValueError:
+        raise WebhookBodyTooLarge("invalid content-length") from None
+    if expected_size is not None and not 0 <= expected_size <= max_bytes:
+        raise WebhookBodyTooLarge("request body too large")
+
+    mac = hmac.new(
+        _signing_secret(key), f"{msg_id}.{math.floor(sent_at)}.".encode(), hashlib.sha256
+    )
+    body = bytearray(expected_size or 0)
+    # A bytearray cannot grow while a view of it exists, so chunked bodies append instead.
+    view = memoryview(body) if expected_size is not None else None
+    size = 0
+    try:
+        async for chunk in chunks:
+            end = size + len(chunk)
+            if end > max_bytes:
+                raise WebhookBodyTooLarge("request body too large")
+            mac.update(chunk)
+            if view is None:
+                body += chunk
+            elif end > len(view):
+                raise WebhookSignatureError("request body is longer than content-length")
+            else:
+                view[size:end] = chunk
+            size = end
+    finally:
+        if view is not None:
+            view.release()
+    if expected_size is not None and size != expected_size:
+        raise WebhookSignatureError("request body is shorter than content-length")
+
+    digest = mac.digest()
+    if not any(hmac.compare_digest(digest, signature) for signature in signatures):
+        raise WebhookSignatureError("no matching webhook signature")
+    return body
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import time
+from collections.abc import Callable, Hashable
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+LATENCY_BUCKETS_SECONDS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in the cumulative ``le`` form Prometheus uses."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS_SECONDS) -> None:
+        self.buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self._counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def snapshot(self) -> dict[str, object]:
+        cumulative: dict[str, int] = {}
+        total = 0
+        for bound, count in zip((*self.buckets, float("inf")), self._counts, strict=True):
+            total += count
+            cumulative[f"{bound:g}"] = total
+        return {"count": self.count, "sum": self.sum, "buckets": cumulative}
+
+
+class WorkDispatcher:
+    """Runs blocking work handlers on a dedicated thread pool with bounded concurrency.
+
+    ``submit()`` waits while ``max_in_flight`` items are already accepted, which holds the
+    caller (the queue poller) back instead of claiming work it cannot start. Items with the
+    same key run one at a time in submission order; different keys run in parallel.
+    """
+
+    def __init__(self, *, max_in_flight: int) -> None:
+        if max_in_flight < 1:
+            raise RuntimeError("max_in_flight must be at least 1")
+        self.max_in_flight = max_in_flight
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_in_flight, thread_name_prefix="work-dispatch"
+        )
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._tails: dict[Hashable, asyncio.Task[None]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_seconds = LatencyHistogram()
+        self.run_seconds = LatencyHistogram()
+
+    async def submit(self, key: Hashable, handler: Callable[[], object]) -> None:
+        await self._slots.acquire()
+        self.queued += 1
+        previous = self._tails.get(key)
+        task = asyncio.create_task(self._run(handler, previous, time.perf_counter()))
+        self._tails[key] = task
+        self._tasks.add(task)
+        task.add_done_callback(lambda done: self._finish(key, done))
+
+    async def join(self) -> None:
+        while self._tasks:
+            await asyncio.wait(set(self._tasks))
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "wait_seconds": self.wait_seconds.snapshot(),
+            "run_seconds": self.run_seconds.snapshot(),
+        }
+
+    async def _run(
+        self,
+        handler: Callable[[], object],
+        previous: asyncio.Task[None] | None,
+        accepted_at: float,
+    ) -> None:
+        if previous is not None:
+            await asyncio.wait({previous})
+        started = time.perf_counter()
+        self.queued -= 1
+        self.in_flight += 1
+        self.wait_seconds.observe(started - accepted_at)
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, handler)
+        except Exception:
+            self.failed += 1
+            logger.exception("failed to dispatch work item")
+        else:
+            self.completed += 1
+        finally:
+            self.in_flight -= 1
+            self.run_seconds.observe(time.perf_counter() - started)
+
+    def _finish(self, key: Hashable, task: asyncio.Task[None]) -> None:
+        self._tasks.discard(task)
+        if self._tails.get(key) is task:
+            del self._tails[key]
+        self._slots.release()
@@ -1,12 +1,24 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import json
 import logging
 import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-from anthropic import AsyncAnthropic
+if TYPE_CHECKING:
+    from anthropic import AsyncAnthropic
 
 WORKDIR = "/mnt/session"
+REMOTE_DIR = Path("/opt/anthropic-managed-agents")
+REMOTE_WORKER_MANIFEST = REMOTE_DIR / "worker-manifest.sha256"
+REMOTE_WORKER_STATUS = REMOTE_DIR / "worker-status.json"
+WORKER_HEARTBEAT_SECONDS = 5.0
+WORKER_POOL_SOCKET_ENV = "WORKER_POOL_SOCKET"
+logger = logging.getLogger(__name__)
 
 
 def max_idle_seconds() -> float | None:
@@ -23,40 +35,196 @@ def run_seconds() -> float | None:
     return float(raw)
 
 
-async def run_worker() -> None:
-    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"))
-    logger = logging.getLogger(__name__)
+def max_workers() -> int:
+    return max(1, int(os.environ.get("MAX_WORKERS", "4")))
 
-    environment_id = os.environ["ANTHROPIC_ENVIRONMENT_ID"]
-    environment_key = os.environ["ANTHROPIC_ENVIRONMENT_KEY"]
-    max_run_seconds = run_seconds()
 
-    async with AsyncAnthropic(auth_token=environment_key) as client:
-        worker = client.beta.environments.work.worker(
+async def run_item(
+    client: AsyncAnthropic,
+    *,
+    environment_id: str,
+    environment_key: str,
+    work_id: str | None,
+    session_id: str | None,
+) -> None:
+    max_run_seconds = run_seconds()
+    worker = client.beta.environments.work.worker(
+        environment_id=environment_id,
+        environment_key=environment_key,
+        workdir=WORKDIR,
+        max_idle=max_idle_seconds(),
+    )
+    runner = (
+        worker.handle_item(
+            work_id=work_id,
             environment_id=environment_id,
+            session_id=session_id,
             environment_key=environment_key,
-            workdir=WORKDIR,
-            max_idle=max_idle_seconds(),
         )
-        runner = (
-            worker.handle_item(
-                work_id=os.environ.get("ANTHROPIC_WORK_ID"),
+        if work_id or session_id
+        else worker.run()
+    )
+    if max_run_seconds is None:
+        await runner
+        return
+
+    try:
+        await asyncio.wait_for(runner, timeout=max_run_seconds)
+    except TimeoutError:
+        logger.info("worker reached WORKER_RUN_SECONDS=%s; exiting", max_run_seconds)
+
+
+def code_version() -> str:
+    try:
+        return hashlib.sha256(REMOTE_WORKER_MANIFEST.read_bytes()).hexdigest()
+    except OSError:
+        return ""
+
+
+def write_worker_status(version: str) -> None:
+    status = {"pid": os.getpid(), "code_version": version, "heartbeat_at": time.time()}
+    temporary = REMOTE_WORKER_STATUS.with_name(f".{REMOTE_WORKER_STATUS.name}.{os.getpid()}")
+    temporary.write_text(json.dumps(status))
+    os.replace(temporary, REMOTE_WORKER_STATUS)
+
+
+async def heartbeat() -> None:
+    """Refresh the status file the orchestrator reads instead of probing the process."""
+    version = code_version()
+    while True:
+        try:
+            write_worker_status(version)
+        except OSError:
+            logger.warning("failed to write %s", REMOTE_WORKER_STATUS)
+        await asyncio.sleep(WORKER_HEARTBEAT_SECONDS)
+
+
+def clear_worker_status() -> None:
+    try:
+        if json.loads(REMOTE_WORKER_STATUS.read_text()).get("pid") == os.getpid():
+            REMOTE_WORKER_STATUS.unlink()
+    except (OSError, ValueError):
+        pass
+
+
+async def run_worker() -> None:
+    from anthropic import AsyncAnthropic
+
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"))
+
+    environment_id = os.environ["ANTHROPIC_ENVIRONMENT_ID"]
+    environment_key = os.environ["ANTHROPIC_ENVIRONMENT_KEY"]
+    heartbeat_task = asyncio.create_task(heartbeat())
+    try:
+        async with AsyncAnthropic(auth_token=environment_key) as client:
+            await run_item(
+                client,
                 environment_id=environment_id,
-                session_id=os.environ.get("ANTHROPIC_SESSION_ID"),
                 environment_key=environment_key,
+                work_id=os.environ.get("ANTHROPIC_WORK_ID"),
+                session_id=os.environ.get("ANTHROPIC_SESSION_ID"),
             )
-            if os.environ.get("ANTHROPIC_WORK_ID") or os.environ.get("ANTHROPIC_SESSION_ID")
-            else worker.run()
-        )
-        if max_run_seconds is None:
-            await runner
-            return
+    finally:
+        heartbeat_task.cancel()
+        clear_worker_status()
+
+
+class WorkerPool:
+    """Runs work items as asyncio tasks on one event loop and one client.
+
+    Requests arrive as one JSON line per connection on a Unix socket. ``{"op": "start"}`` with
+    optional ``work_id`` and ``session_id`` runs an item; at most ``max_workers`` run at once and
+    as many again may wait for a slot, after which starts are refused. ``{"op": "status"}``
+    reports the counts.
+    """
+
+    def __init__(
+        self, client: AsyncAnthropic, *, environment_id: str, environment_key: str, max_workers: int
+    ) -> None:
+        self.client = client
+        self.environment_id = environment_id
+        self.environment_key = environment_key
+        self.max_workers = max_workers
+        self.running = 0
+        self.waiting = 0
+        self._slots = asyncio.Semaphore(max_workers)
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def start(self, *, work_id: str | None, session_id: str | None) -> bool:
+        if self.waiting >= self.max_workers:
+            return False
+        self.waiting += 1
+        task = asyncio.create_task(self._run(work_id=work_id, session_id=session_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    def status(self) -> dict[str, int]:
+        return {"max_workers": self.max_workers, "running": self.running, "waiting": self.waiting}
+
+    async def serve(self, socket_path: str) -> None:
+        Path(socket_path).unlink(missing_ok=True)
+        server = await asyncio.start_unix_server(self._handle_connection, path=socket_path)
+        os.chmod(socket_path, 0o600)
+        logger.info("worker pool listening on %s", socket_path)
+        async with server:
+            await server.serve_forever()
 
+    async def _run(self, *, work_id: str | None, session_id: str | None) -> None:
+        async with self._slots:
+            self.waiting -= 1
+            self.running += 1
+            try:
+                await run_item(
+                    self.client,
+                    environment_id=self.environment_id,
+                    environment_key=self.environment_key,
+                    work_id=work_id,
+                    session_id=session_id,
+                )
+            except Exception:
+                logger.exception("work item failed")
+            finally:
+                self.running -= 1
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
         try:
-            await asyncio.wait_for(runner, timeout=max_run_seconds)
-        except TimeoutError:
-            logger.info("worker reached WORKER_RUN_SECONDS=%s; exiting", max_run_seconds)
+            request = json.loads(await reader.readline() or b"{}")
+            response: dict[str, object] = self.status()
+            if request.get("op", "start") == "start":
+                response["accepted"] = self.start(
+                    work_id=request.get("work_id"), session_id=request.get("session_id")
+                )
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+        except (ValueError, AttributeError, ConnectionError):
+            logger.warning("ignored malformed worker pool request")
+        finally:
+            writer.close()
+
+
+async def run_worker_pool(socket_path: str) -> None:
+    from anthropic import AsyncAnthropic
+
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"))
+
+    environment_id = os.environ["ANTHROPIC_ENVIRONMENT_ID"]
+    environment_key = os.environ["ANTHROPIC_ENVIRONMENT_KEY"]
+    async with AsyncAnthropic(auth_token=environment_key) as client:
+        pool = WorkerPool(
+            client,
+            environment_id=environment_id,
+            environment_key=environment_key,
+            max_workers=max_workers(),
+        )
+        await pool.serve(socket_path)
 
 
 def main() -> None:
-    asyncio.run(run_worker())
+    socket_path = os.environ.get(WORKER_POOL_SOCKET_ENV)
+    if socket_path:
+        asyncio.run(run_worker_pool(socket_path))
+    else:
+        asyncio.run(run_worker())
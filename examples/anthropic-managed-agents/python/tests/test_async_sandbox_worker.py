@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import unittest
+from collections.abc import Callable
+from types import SimpleNamespace
+
+from e2b import NotFoundException
+
+from anthropic_managed_agents_e2b import async_sandbox_worker, sandbox_worker
+from anthropic_managed_agents_e2b.settings import Settings
+
+SETTINGS = Settings(
+    anthropic_api_key=None,
+    anthropic_agent_id=None,
+    anthropic_environment_id="env_test",
+    anthropic_environment_key="sk-ant-env-test",
+    anthropic_webhook_signing_key="whsec_test",
+    app_webhook_admin_token=None,
+    app_sandbox_routing_scope=None,
+)
+WORKER_ARGS = {"worker_max_idle_seconds": 60.0, "log_level": "INFO"}
+
+
+class RecordingSandbox:
+    """In-memory stand-in for ``e2b.Sandbox`` that records every call it receives."""
+
+    def __init__(self, *, status: dict[str, object] | None = None, running: bool = False) -> None:
+        self.status = status
+        self.running = running
+        self.stored_files: dict[str, str | bytes] = {}
+        self.calls: list[tuple[object, ...]] = []
+        self.files = SimpleNamespace(read=self._read, write_files=self._write_files)
+        self.commands = SimpleNamespace(run=self._run)
+
+    def _read(self, path: str, **_: object) -> str | bytes:
+        self.calls.append(("files.read", path))
+        if path not in self.stored_files:
+            raise NotFoundException(path)
+        return self.stored_files[path]
+
+    def _write_files(self, files: list[dict[str, str | bytes]], **_: object) -> None:
+        self.calls.append(("files.write_files", tuple((f["path"], f["data"]) for f in files)))
+        for file in files:
+            self.stored_files[file["path"]] = file["data"]
+
+    def _run(
+        self,
+        cmd: str,
+        envs: dict[str, str] | None = None,
+        timeout: float | None = None,
+        **_: object,
+    ) -> SimpleNamespace:
+        self.calls.append(("commands.run", cmd, tuple(sorted((envs or {}).items())), timeout))
+        if cmd == sandbox_worker.worker_status_command():
+            stdout = json.dumps(self.status) if self.status is not None else ""
+            return SimpleNamespace(exit_code=0 if stdout else 1, stdout=stdout, stderr="")
+        if cmd == sandbox_worker.worker_process_check_command():
+            return SimpleNamespace(exit_code=0 if self.running else 1, stdout="", stderr="")
+        return SimpleNamespace(exit_code=0, stdout="", stderr="")
+
+
+def _awaitable(function: Callable[..., object]) -> Callable[..., object]:
+    async def call(*args: object, **kwargs: object) -> object:
+        await asyncio.sleep(0)
+        return function(*args, **kwargs)
+
+    return call
+
+
+class AsyncRecordingSandbox(RecordingSandbox):
+    """The same fake with the ``e2b.AsyncSandbox`` coroutine surface."""
+
+    def __init__(self, **kwargs: object) -> None:
+        super().__init__(**kwargs)
+        self.files = SimpleNamespace(
+            read=_awaitable(self._read), write_files=_awaitable(self._write_files)
+        )
+        self.commands = SimpleNamespace(run=_awaitable(self._run))
+
+
+def _current_status() -> dict[str, object]:
+    return {"pid": 42, "code_version": sandbox_worker.worker_code_version(), "age_seconds": 1.0}
+
+
+class AsyncSandboxWorkerParityTest(unittest.IsolatedAsyncioTestCase):
+    """The async module must send exactly the calls ``sandbox_worker`` sends."""
+
+    async def _both(
+        self, run_sync: Callable[[RecordingSandbox], object], run_async: Callable, **state: object
+    ) -> tuple[list[tuple[object, ...]], list[tuple[object, ...]]]:
+        sync_sandbox = RecordingSandbox(**state)
+        async_sandbox = AsyncRecordingSandbox(**state)
+        run_sync(sync_sandbox)
+        await run_async(async_sandbox)
+        return sync_sandbox.calls, async_sandbox.calls
+
+    async def test_cold_ensure_sends_the_same_calls(self) -> None:
+        sync_calls, async_calls = await self._both(
+            lambda sandbox: sandbox_worker.ensure_worker_process(sandbox, SETTINGS, **WORKER_ARGS),
+            lambda sandbox: async_sandbox_worker.ensure_worker_process(
+                sandbox, SETTINGS, **WORKER_ARGS
+            ),
+        )
+
+        # The async version overlaps the upload with the liveness probe, so only order differs.
+        self.assertCountEqual(async_calls, sync_calls)
+        self.assertIn("files.write_files", [call[0] for call in sync_calls])
+        self.assertEqual(sync_calls[-1], async_calls[-1])
+
+    async def test_warm_ensure_stops_after_the_status_read(self) -> None:
+        sync_calls, async_calls = await self._both(
+            lambda sandbox: sandbox_worker.ensure_worker_process(sandbox, SETTINGS, **WORKER_ARGS),
+            lambda sandbox: async_sandbox_worker.ensure_worker_process(
+                sandbox, SETTINGS, **WORKER_ARGS
+            ),
+            status=_current_status(),
+        )
+
+        self.assertEqual(async_calls, sync_calls)
+        self.assertEqual(len(sync_calls), 1)
+
+    async def test_stale_status_with_live_process_skips_the_start(self) -> None:
+        sync_calls, async_calls = await self._both(
+            lambda sandbox: sandbox_worker.ensure_worker_process(sandbox, SETTINGS, **WORKER_ARGS),
+            lambda sandbox: async_sandbox_worker.ensure_worker_process(
+                sandbox, SETTINGS, **WORKER_ARGS
+            ),
+            status={**_current_status(), "age_seconds": 600.0},
+            running=True,
+        )
+
+        self.assertCountEqual(async_calls, sync_calls)
+
+    async def test_claimed_work_sends_the_same_calls(self) -> None:
+        claimed = {**WORKER_ARGS, "work_id": "work_1", "session_id": "sesn_1"}
+        sync_calls, async_calls = await self._both(
+            lambda sandbox: sandbox_worker.ensure_worker_process(sandbox, SETTINGS, **claimed),
+            lambda sandbox: async_sandbox_worker.ensure_worker_process(
+                sandbox, SETTINGS, **claimed
+            ),
+        )
+
+        self.assertEqual(async_calls, sync_calls)
+
+    async def test_webhook_bootstrap_sends_the_same_calls(self) -> None:
+        for batched in (True, False):
+            with self.subTest(batched=batched):
+                sync_calls, async_calls = await self._both(
+                    lambda sandbox, batched=batched: sandbox_worker.bootstrap_webhook_server(
+                        sandbox, SETTINGS, port=8000, batched=batched, **WORKER_ARGS
+                    ),
+                    lambda sandbox, batched=batched: async_sandbox_worker.bootstrap_webhook_server(
+                        sandbox, SETTINGS, port=8000, batched=batched, **WORKER_ARGS
+                    ),
+                )
+
+                self.assertEqual(async_calls, sync_calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
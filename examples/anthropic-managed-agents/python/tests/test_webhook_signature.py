@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import base64
+import time
+import unittest
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+
+from standardwebhooks import Webhook
+
+from anthropic_managed_agents_e2b.webhook_signature import (
+    WebhookBodyTooLarge,
+    WebhookSignatureError,
+    read_verified_body,
+)
+
+KEY = "whsec_" + base64.b64encode(b"test-signing-key-0123456789abcdef").decode()
+BODY = b'{"type":"event","id":"evt_1"}'
+MAX_BYTES = 1024
+
+
+async def _chunks(*parts: bytes) -> AsyncIterator[bytes]:
+    for part in parts:
+        yield part
+
+
+def _headers(**overrides: str) -> dict[str, str]:
+    timestamp = time.time()
+    headers = {
+        "webhook-id": "msg_1",
+        "webhook-timestamp": str(int(timestamp)),
+        "webhook-signature": Webhook(KEY).sign(
+            "msg_1", datetime.fromtimestamp(timestamp, tz=UTC), BODY.decode()
+        ),
+        "content-length": str(len(BODY)),
+    }
+    headers.update(overrides)
+    return headers
+
+
+class ReadVerifiedBodyTest(unittest.IsolatedAsyncioTestCase):
+    async def test_accepts_a_standard_webhooks_signature(self) -> None:
+        body = await read_verified_body(
+            _chunks(BODY[:10], BODY[10:]), _headers(), key=KEY, max_bytes=MAX_BYTES
+        )
+
+        self.assertEqual(bytes(body), BODY)
+
+    async def test_rejects_tampered_body(self) -> None:
+        with self.assertRaises(WebhookSignatureError):
+            await read_verified_body(
+                _chunks(BODY.replace(b"evt_1", b"evt_2")),
+                _headers(),
+                key=KEY,
+                max_bytes=MAX_BYTES,
+            )
+
+    async def test_rejects_non_finite_and_non_numeric_timestamps(self) -> None:
+        for timestamp in ("nan", "NaN", "inf", "-inf", "Infinity", "soon", "1e400"):
+            with self.subTest(timestamp=timestamp), self.assertRaises(WebhookSignatureError):
+                await read_verified_body(
+                    _chunks(BODY),
+                    _headers(**{"webhook-timestamp": timestamp}),
+                    key=KEY,
+                    max_bytes=MAX_BYTES,
+                )
+
+    async def test_rejects_stale_timestamp(self) -> None:
+        with self.assertRaises(WebhookSignatureError):
+            await read_verified_body(
+                _chunks(BODY),
+                _headers(**{"webhook-timestamp": str(int(time.time()) - 3600)}),
+                key=KEY,
+                max_bytes=MAX_BYTES,
+            )
+
+    async def test_rejects_malformed_content_length(self) -> None:
+        for content_length in ("abc", "-1", "1.5", str(MAX_BYTES + 1)):
+            with (
+                self.subTest(content_length=content_length),
+                self.assertRaises(WebhookBodyTooLarge),
+            ):
+                await read_verified_body(
+                    _chunks(BODY),
+                    _headers(**{"content-length": content_length}),
+                    key=KEY,
+                    max_bytes=MAX_BYTES,
+                )
+
+    async def test_rejects_empty_and_malformed_signing_keys(self) -> None:
+        for key in ("whsec_", "whsec_abcde"):
+            with self.subTest(key=key), self.assertRaises(WebhookSignatureError):
+                await read_verified_body(_chunks(BODY), _headers(), key=key, max_bytes=MAX_BYTES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""Compare time-to-first-result for the SARIMA worker on a stock and the pre-baked template."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any
+
+from e2b import AsyncSandbox
+
+if __package__ is None or __package__ == "":
+    from pathlib import Path
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[5]))
+
+from examples.sandbox.extensions.e2b.analytics_template.template import ANALYTICS_TEMPLATE
+from examples.sandbox.extensions.e2b.sarima_grid_search_parallel import (
+    WORKER_SCRIPT,
+    build_candidate_batches,
+    build_dataset_csv,
+)
+
+COLD_TEMPLATE = "base"
+DEFAULT_RUNS = 3
+SANDBOX_TIMEOUT_SECONDS = 900
+WORKDIR = "/home/user/sarima-benchmark"
+
+
+async def time_to_first_result(template: str, batch_spec: dict[str, Any]) -> dict[str, float]:
+    """Create a sandbox, run one SARIMA batch in it, and time each stage."""
+    started = time.perf_counter()
+    sandbox = await AsyncSandbox.create(template=template, timeout=SANDBOX_TIMEOUT_SECONDS)
+    try:
+        created = time.perf_counter()
+        files = {
+            "series.csv": build_dataset_csv(),
+            "batch.json": json.dumps(batch_spec, indent=2) + "\n",
+            "run_sarima_batch.py": WORKER_SCRIPT,
+        }
+        await asyncio.gather(
+            *(sandbox.files.write(f"{WORKDIR}/{name}", data) for name, data in files.items())
+        )
+        uploaded = time.perf_counter()
+        result = await sandbox.commands.run(
+            "python run_sarima_batch.py", cwd=WORKDIR, timeout=SANDBOX_TIMEOUT_SECONDS
+        )
+        finished = time.perf_counter()
+        json.loads(result.stdout.strip().splitlines()[-1])
+    finally:
+        await sandbox.kill()
+
+    return {
+        "create_seconds": created - started,
+        "upload_seconds": uploaded - created,
+        "worker_seconds": finished - uploaded,
+        "first_result_seconds": finished - started,
+    }
+
+
+def summarize(samples: list[dict[str, float]]) -> dict[str, float]:
+    return {
+        stage: round(statistics.median(sample[stage] for sample in samples), 2)
+        for stage in samples[0]
+    }
+
+
+async def run_benchmark(*, cold_template: str, warm_template: str, runs: int) -> dict[str, Any]:
+    batch_spec = build_candidate_batches(batch_limit=1)[0]
+    samples: dict[str, list[dict[str, float]]] = {cold_template: [], warm_template: []}
+    # Alternate templates so drift in E2B or network latency hits both sides equally.
+    for _ in range(runs):
+        for template in samples:
+            samples[template].append(await time_to_first_result(template, batch_spec))
+
+    cold = summarize(samples[cold_template])
+    warm = summarize(samples[warm_template])
+    return {
+        "runs": runs,
+        "batch": batch_spec["batch_name"],
+        "median": {cold_template: cold, warm_template: warm},
+        "first_result_speedup": round(
+            cold["first_result_seconds"] / warm["first_result_seconds"], 2
+        ),
+        "samples": samples,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Time one SARIMA worker batch from sandbox creation to first result on a stock "
+            "template and on the pre-baked analytics template."
+        )
+    )
+    parser.add_argument("--cold-template", default=COLD_TEMPLATE)
+    parser.add_argument("--warm-template", default=os.getenv("E2B_TEMPLATE") or ANALYTICS_TEMPLATE)
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    args = parser.parse_args()
+
+    if not os.getenv("E2B_API_KEY"):
+        raise RuntimeError("Missing required environment variable: E2B_API_KEY")
+    payload = asyncio.run(
+        run_benchmark(
+            cold_template=args.cold_template,
+            warm_template=args.warm_template,
+            runs=args.runs,
+        )
+    )
+    print(json.dumps(payload, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+from e2b import Template, default_build_logger
+
+from .template import ANALYTICS_TEMPLATE, template
+
+if __name__ == "__main__":
+    Template.build(
+        template,
+        alias=f"{ANALYTICS_TEMPLATE}-dev",
+        cpu_count=2,
+        memory_mb=2048,
+        on_build_logs=default_build_logger(),
+    )
@@ -0,0 +1,34 @@
+import shlex
+
+from e2b import Template
+
+ANALYTICS_TEMPLATE = "openai-agents-analytics"
+ANALYTICS_PACKAGES = ["numpy", "pandas", "matplotlib", "statsmodels"]
+MATPLOTLIB_CONFIG_DIR = "/opt/analytics/matplotlib"
+
+# Everything the forecasting, anomaly-triage and SARIMA workers import, so a cold import in the
+# sandbox only has to read already-compiled modules from disk.
+WARM_IMPORTS = (
+    "import matplotlib; matplotlib.use('Agg'); "
+    "import matplotlib.pyplot, numpy, pandas; "
+    "from statsmodels.tsa.api import ExponentialSmoothing; "
+    "from statsmodels.tsa.statespace.sarimax import SARIMAX; "
+    "from matplotlib import font_manager; "
+    "print(len(font_manager.fontManager.ttflist), 'fonts cached')"
+)
+
+template = (
+    Template()
+    .from_python_image("3.12")
+    .set_envs(
+        {
+            "MPLBACKEND": "Agg",
+            "MPLCONFIGDIR": MATPLOTLIB_CONFIG_DIR,
+        }
+    )
+    .run_cmd(f"python -m pip install --no-cache-dir {' '.join(ANALYTICS_PACKAGES)}", user="root")
+    # Importing matplotlib once builds its font cache under MPLCONFIGDIR, which is otherwise
+    # rebuilt on the first plot in every fresh sandbox.
+    .run_cmd(f"mkdir -p {MATPLOTLIB_CONFIG_DIR} && chmod 777 {MATPLOTLIB_CONFIG_DIR}", user="root")
+    .run_cmd(f"python -c {shlex.quote(WARM_IMPORTS)}")
+)
@@ -21,6 +21,11 @@ if __package__ is None or __package__ == "":
     sys.path.insert(0, str(Path(__file__).resolve().parents[4]))
 
 from agents.extensions.sandbox import E2BSandboxClient, E2BSandboxClientOptions, E2BSandboxType
+from examples.sandbox.extensions.e2b.analytics_template.template import ANALYTICS_TEMPLATE
+from examples.sandbox.extensions.e2b.sandbox_provisioning import (
+    LaneSandboxSpec,
+    provision_sessions,
+)
 from examples.sandbox.misc.example_support import text_manifest, tool_call_name
 from examples.sandbox.misc.workspace_shell import WorkspaceShellCapability
 
@@ -390,35 +395,37 @@ async def run_forecast_model_bakeoff(
 ) -> dict[str, Any]:
     selected_lanes = lanes or LANE_CONFIGS
     series_csv, metadata = await asyncio.to_thread(fetch_fred_series_csv, series_id=series_id)
-    sessions: list[Any] = []
     tools: list[Any] = []
     collected_payloads: dict[str, dict[str, Any]] = {}
-
-    try:
-        for lane in selected_lanes:
-            manifest = _worker_manifest(
+    specs = [
+        LaneSandboxSpec(
+            name=lane["name"],
+            manifest=_worker_manifest(
                 lane_name=lane["name"],
                 lane_brief=lane["brief"],
                 series_csv=series_csv,
                 metadata=metadata,
                 horizon=horizon,
-            )
-            session = await E2BSandboxClient().create(
-                manifest=manifest,
-                options=E2BSandboxClientOptions(
-                    sandbox_type=sandbox_type,
-                    template=template,
-                    timeout=timeout_seconds,
-                    allow_internet_access=True,
-                    pause_on_exit=True,
-                ),
-            )
-            await session.start()
-            sessions.append(session)
-
+            ),
+            options=E2BSandboxClientOptions(
+                sandbox_type=sandbox_type,
+                template=template,
+                timeout=timeout_seconds,
+                allow_internet_access=True,
+                pause_on_exit=True,
+            ),
+        )
+        for lane in selected_lanes
+    ]
+    provisioned = await provision_sessions(specs)
+    sessions = provisioned.sessions
+    group = provisioned.session_group(shutdown=shutdown_sessions)
+
+    async with group:
+        for lane, spec, session in zip(selected_lanes, specs, sessions, strict=True):
             lane_agent = _build_lane_agent(
                 model=model,
-                manifest=manifest,
+                manifest=spec.manifest,
                 lane_name=lane["name"],
                 lane_brief=lane["brief"],
                 horizon=horizon,
@@ -479,7 +486,7 @@ async def run_forecast_model_bakeoff(
             if getattr(item, "type", None) == "tool_call_item"
         ]
 
-        return {
+        payload = {
             "series": metadata,
             "horizon": horizon,
             "tool_names": tool_names,
@@ -490,14 +497,10 @@ async def run_forecast_model_bakeoff(
                 for lane, session in zip(selected_lanes, sessions, strict=False)
             ],
             "sandboxes_left_running": not shutdown_sessions,
+            "provisioning": provisioned.timing(),
         }
-    finally:
-        if shutdown_sessions:
-            for session in sessions:
-                try:
-                    await session.shutdown()
-                except Exception:
-                    pass
+    payload["teardown"] = group.report.summary() if group.report else None
+    return payload
 
 
 def require_credentials() -> None:
@@ -520,7 +523,14 @@ if __name__ == "__main__":
         default=os.getenv("E2B_SANDBOX_TYPE", E2BSandboxType.E2B.value),
         choices=[member.value for member in E2BSandboxType],
     )
-    parser.add_argument("--template", default=os.getenv("E2B_TEMPLATE") or None)
+    parser.add_argument(
+        "--template",
+        default=os.getenv("E2B_TEMPLATE") or ANALYTICS_TEMPLATE,
+        help=(
+            "E2B template for the worker sandboxes. Defaults to the pre-baked analytics template "
+            "from analytics_template/; pass `base` to use the stock image."
+        ),
+    )
     parser.add_argument(
         "--timeout",
         type=int,
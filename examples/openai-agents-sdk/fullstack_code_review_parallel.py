@@ -20,7 +20,11 @@ if __package__ is None or __package__ == "":
 
     sys.path.insert(0, str(Path(__file__).resolve().parents[4]))
 
-from agents.extensions.sandbox import E2BSandboxClient, E2BSandboxClientOptions, E2BSandboxType
+from agents.extensions.sandbox import E2BSandboxClientOptions, E2BSandboxType
+from examples.sandbox.extensions.e2b.sandbox_provisioning import (
+    LaneSandboxSpec,
+    provision_sessions,
+)
 from examples.sandbox.misc.example_support import text_manifest, tool_call_name
 from examples.sandbox.misc.workspace_shell import WorkspaceShellCapability
 
@@ -264,25 +268,20 @@ def _backend_tree_manifest() -> Any:
     )
 
 
-def _make_run_config(
+def _sandbox_options(
     *,
     sandbox_type: E2BSandboxType,
     template: str | None,
     timeout_seconds: int,
     exposed_ports: tuple[int, ...] = (),
-) -> RunConfig:
-    return RunConfig(
-        sandbox=SandboxRunConfig(
-            client=E2BSandboxClient(),
-            options=E2BSandboxClientOptions(
-                sandbox_type=sandbox_type,
-                template=template,
-                timeout=timeout_seconds,
-                exposed_ports=exposed_ports,
-                allow_internet_access=True,
-                pause_on_exit=True,
-            ),
-        )
+) -> E2BSandboxClientOptions:
+    return E2BSandboxClientOptions(
+        sandbox_type=sandbox_type,
+        template=template,
+        timeout=timeout_seconds,
+        exposed_ports=exposed_ports,
+        allow_internet_access=True,
+        pause_on_exit=True,
     )
 
 
@@ -423,21 +422,35 @@ async def main(
         target_diff="backend.diff",
     )
 
-    frontend_client = E2BSandboxClient()
-    frontend_session = await frontend_client.create(
-        manifest=frontend_manifest,
-        options=E2BSandboxClientOptions(
-            sandbox_type=sandbox_type,
-            template=template,
-            timeout=timeout_seconds,
-            exposed_ports=(DEFAULT_FRONTEND_PORT,),
-            allow_internet_access=True,
-            pause_on_exit=True,
-        ),
+    options = _sandbox_options(
+        sandbox_type=sandbox_type, template=template, timeout_seconds=timeout_seconds
+    )
+    provisioned = await provision_sessions(
+        [
+            LaneSandboxSpec(
+                name="frontend_runtime",
+                manifest=frontend_manifest,
+                options=_sandbox_options(
+                    sandbox_type=sandbox_type,
+                    template=template,
+                    timeout_seconds=timeout_seconds,
+                    exposed_ports=(DEFAULT_FRONTEND_PORT,),
+                ),
+            ),
+            LaneSandboxSpec(name="backend_runtime", manifest=backend_manifest, options=options),
+            LaneSandboxSpec(
+                name="frontend_gittree", manifest=frontend_tree_manifest, options=options
+            ),
+            LaneSandboxSpec(
+                name="backend_gittree", manifest=backend_tree_manifest, options=options
+            ),
+        ]
+    )
+    frontend_session, backend_session, frontend_tree_session, backend_tree_session = (
+        provisioned.sessions
     )
-    await frontend_session.start()
 
-    try:
+    async with provisioned.session_group() as group:
         orchestrator = Agent(
             name="Fullstack Code Review Coordinator",
             model=model,
@@ -464,31 +477,19 @@ async def main(
                     tool_name="review_backend_runtime",
                     tool_description="Inspect the backend service implementation in its own sandbox.",
                     custom_output_extractor=_json_output,
-                    run_config=_make_run_config(
-                        sandbox_type=sandbox_type,
-                        template=template,
-                        timeout_seconds=timeout_seconds,
-                    ),
+                    run_config=RunConfig(sandbox=SandboxRunConfig(session=backend_session)),
                 ),
                 frontend_tree_reviewer.as_tool(
                     tool_name="review_frontend_gittree",
                     tool_description="Review the frontend git diff in its own sandbox.",
                     custom_output_extractor=_json_output,
-                    run_config=_make_run_config(
-                        sandbox_type=sandbox_type,
-                        template=template,
-                        timeout_seconds=timeout_seconds,
-                    ),
+                    run_config=RunConfig(sandbox=SandboxRunConfig(session=frontend_tree_session)),
                 ),
                 backend_tree_reviewer.as_tool(
                     tool_name="review_backend_gittree",
                     tool_description="Review the backend git diff in its own sandbox.",
                     custom_output_extractor=_json_output,
-                    run_config=_make_run_config(
-                        sandbox_type=sandbox_type,
-                        template=template,
-                        timeout_seconds=timeout_seconds,
-                    ),
+                    run_config=RunConfig(sandbox=SandboxRunConfig(session=backend_tree_session)),
                 ),
             ],
             output_type=FullstackReviewSummary,
@@ -500,17 +501,17 @@ async def main(
             for item in result.new_items
             if getattr(item, "type", None) == "tool_call_item"
         ]
-        print(
-            json.dumps(
-                {
-                    "tool_names": tool_names,
-                    "final_output": result.final_output.model_dump(mode="json"),
-                },
-                indent=2,
-            )
+    print(
+        json.dumps(
+            {
+                "tool_names": tool_names,
+                "final_output": result.final_output.model_dump(mode="json"),
+                "provisioning": provisioned.timing(),
+                "teardown": group.report.summary() if group.report else None,
+            },
+            indent=2,
         )
-    finally:
-        await frontend_session.shutdown()
+    )
 
 
 def _require_credentials() -> None:
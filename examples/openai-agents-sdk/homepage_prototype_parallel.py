@@ -23,6 +23,10 @@ if __package__ is None or __package__ == "":
     sys.path.insert(0, str(Path(__file__).resolve().parents[4]))
 
 from agents.extensions.sandbox import E2BSandboxClient, E2BSandboxClientOptions, E2BSandboxType
+from examples.sandbox.extensions.e2b.sandbox_provisioning import (
+    LaneSandboxSpec,
+    provision_sessions,
+)
 from examples.sandbox.misc.example_support import text_manifest, tool_call_name
 from examples.sandbox.misc.workspace_apply_patch import WorkspaceApplyPatchCapability
 from examples.sandbox.misc.workspace_shell import WorkspaceShellCapability
@@ -270,30 +274,32 @@ async def run_homepage_advanced_demo(
     shutdown_sessions: bool = False,
 ) -> dict[str, Any]:
     selected_directions = directions or PROTOTYPE_DIRECTIONS
-    sessions: list[Any] = []
     tools: list[Any] = []
     collected_payloads: dict[str, dict[str, Any]] = {}
-
-    try:
-        for direction in selected_directions:
-            manifest = _prototype_manifest(direction["name"], direction["brief"])
-            session = await E2BSandboxClient().create(
-                manifest=manifest,
-                options=E2BSandboxClientOptions(
-                    sandbox_type=sandbox_type,
-                    template=template,
-                    timeout=timeout_seconds,
-                    exposed_ports=(DEFAULT_FRONTEND_PORT,),
-                    allow_internet_access=True,
-                    pause_on_exit=True,
-                ),
-            )
-            await session.start()
-            sessions.append(session)
-
+    specs = [
+        LaneSandboxSpec(
+            name=direction["name"],
+            manifest=_prototype_manifest(direction["name"], direction["brief"]),
+            options=E2BSandboxClientOptions(
+                sandbox_type=sandbox_type,
+                template=template,
+                timeout=timeout_seconds,
+                exposed_ports=(DEFAULT_FRONTEND_PORT,),
+                allow_internet_access=True,
+                pause_on_exit=True,
+            ),
+        )
+        for direction in selected_directions
+    ]
+    provisioned = await provision_sessions(specs)
+    sessions = provisioned.sessions
+    group = provisioned.session_group(shutdown=shutdown_sessions)
+
+    async with group:
+        for direction, spec, session in zip(selected_directions, specs, sessions, strict=True):
             agent = _build_prototype_agent(
                 model=model,
-                manifest=manifest,
+                manifest=spec.manifest,
                 direction_name=direction["name"],
                 direction_brief=direction["brief"],
                 homepage_brief=homepage_brief,
@@ -361,7 +367,7 @@ async def run_homepage_advanced_demo(
                 )
             )
 
-        return {
+        payload = {
             "tool_names": tool_names,
             "selection": result.final_output.model_dump(mode="json"),
             "prototypes": [card.model_dump(mode="json") for card in prototype_cards],
@@ -373,14 +379,10 @@ async def run_homepage_advanced_demo(
                 for direction, session in zip(selected_directions, sessions, strict=False)
             ],
             "sandboxes_left_running": not shutdown_sessions,
+            "provisioning": provisioned.timing(),
         }
-    finally:
-        if shutdown_sessions:
-            for session in sessions:
-                try:
-                    await session.shutdown()
-                except Exception:
-                    pass
+    payload["teardown"] = group.report.summary() if group.report else None
+    return payload
 
 
 async def run_homepage_parallel_demo(
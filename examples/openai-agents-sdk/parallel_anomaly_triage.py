@@ -23,6 +23,11 @@ if __package__ is None or __package__ == "":
     sys.path.insert(0, str(Path(__file__).resolve().parents[4]))
 
 from agents.extensions.sandbox import E2BSandboxClient, E2BSandboxClientOptions, E2BSandboxType
+from examples.sandbox.extensions.e2b.analytics_template.template import ANALYTICS_TEMPLATE
+from examples.sandbox.extensions.e2b.sandbox_provisioning import (
+    LaneSandboxSpec,
+    provision_sessions,
+)
 from examples.sandbox.misc.example_support import text_manifest, tool_call_name
 from examples.sandbox.misc.workspace_shell import WorkspaceShellCapability
 
@@ -429,33 +434,36 @@ async def run_parallel_anomaly_triage(
 ) -> dict[str, Any]:
     selected_lanes = lanes or LANE_CONFIGS
     bundle = incident_bundle or build_incident_bundle(incident_seed)
-    sessions: list[Any] = []
     tools: list[Any] = []
     collected_payloads: dict[str, dict[str, Any]] = {}
 
-    try:
-        for lane in selected_lanes:
-            manifest = _worker_manifest(
+    specs = [
+        LaneSandboxSpec(
+            name=lane["name"],
+            manifest=_worker_manifest(
                 lane_name=lane["name"],
                 lane_brief=lane["brief"],
                 incident_bundle=bundle,
-            )
-            session = await E2BSandboxClient().create(
-                manifest=manifest,
-                options=E2BSandboxClientOptions(
-                    sandbox_type=sandbox_type,
-                    template=template,
-                    timeout=timeout_seconds,
-                    allow_internet_access=True,
-                    pause_on_exit=True,
-                ),
-            )
-            await session.start()
-            sessions.append(session)
+            ),
+            options=E2BSandboxClientOptions(
+                sandbox_type=sandbox_type,
+                template=template,
+                timeout=timeout_seconds,
+                allow_internet_access=True,
+                pause_on_exit=True,
+            ),
+        )
+        for lane in selected_lanes
+    ]
+    provisioned = await provision_sessions(specs)
+    sessions = provisioned.sessions
+    group = provisioned.session_group(shutdown=shutdown_sessions)
 
+    async with group:
+        for lane, spec, session in zip(selected_lanes, specs, sessions, strict=True):
             lane_agent = _build_lane_agent(
                 model=model,
-                manifest=manifest,
+                manifest=spec.manifest,
                 lane_name=lane["name"],
                 lane_brief=lane["brief"],
             )
@@ -510,7 +518,7 @@ async def run_parallel_anomaly_triage(
             if getattr(item, "type", None) == "tool_call_item"
         ]
 
-        return {
+        payload = {
             "incident_seed": incident_seed,
             "tool_names": tool_names,
             "selection": result.final_output.model_dump(mode="json"),
@@ -520,14 +528,10 @@ async def run_parallel_anomaly_triage(
                 for lane, session in zip(selected_lanes, sessions, strict=False)
             ],
             "sandboxes_left_running": not shutdown_sessions,
+            "provisioning": provisioned.timing(),
         }
-    finally:
-        if shutdown_sessions:
-            for session in sessions:
-                try:
-                    await session.shutdown()
-                except Exception:
-                    pass
+    payload["teardown"] = group.report.summary() if group.report else None
+    return payload
 
 
 def require_credentials() -> None:
@@ -550,7 +554,14 @@ if __name__ == "__main__":
         default=os.getenv("E2B_SANDBOX_TYPE", E2BSandboxType.E2B.value),
         choices=[member.value for member in E2BSandboxType],
     )
-    parser.add_argument("--template", default=os.getenv("E2B_TEMPLATE") or None)
+    parser.add_argument(
+        "--template",
+        default=os.getenv("E2B_TEMPLATE") or ANALYTICS_TEMPLATE,
+        help=(
+            "E2B template for the worker sandboxes. Defaults to the pre-baked analytics template "
+            "from analytics_template/; pass `base` to use the stock image."
+        ),
+    )
     parser.add_argument(
         "--timeout",
         type=int,
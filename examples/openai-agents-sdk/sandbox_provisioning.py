@@ -0,0 +1,94 @@
+"""Create and start the E2B sandbox sessions for parallel agent lanes concurrently."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents.extensions.sandbox import E2BSandboxClient, E2BSandboxClientOptions
+from examples.sandbox.extensions.e2b.sandbox_session_group import SandboxSessionGroup
+
+DEFAULT_PROVISION_CONCURRENCY = 8
+
+
+@dataclass(frozen=True)
+class LaneSandboxSpec:
+    name: str
+    manifest: Any
+    options: E2BSandboxClientOptions
+
+
+@dataclass
+class ProvisionedSessions:
+    sessions: list[Any]
+    startup_seconds: dict[str, float] = field(default_factory=dict)
+    ready_seconds: float = 0.0
+
+    def timing(self) -> dict[str, Any]:
+        sequential_seconds = sum(self.startup_seconds.values())
+        return {
+            "lane_startup_seconds": {
+                name: round(seconds, 2) for name, seconds in self.startup_seconds.items()
+            },
+            "sum_of_startups_seconds": round(sequential_seconds, 2),
+            "time_to_all_ready_seconds": round(self.ready_seconds, 2),
+            "speedup": round(sequential_seconds / self.ready_seconds, 2)
+            if self.ready_seconds
+            else None,
+        }
+
+    def session_group(self, **kwargs: Any) -> SandboxSessionGroup:
+        """Wrap the sessions, keyed by lane name, in a group that shuts them down together."""
+        return SandboxSessionGroup(
+            dict(zip(self.startup_seconds, self.sessions, strict=True)), **kwargs
+        )
+
+
+async def provision_sessions(
+    specs: Sequence[LaneSandboxSpec],
+    *,
+    max_concurrency: int = DEFAULT_PROVISION_CONCURRENCY,
+) -> ProvisionedSessions:
+    """Create and start one session per spec, at most `max_concurrency` at a time.
+
+    Sessions come back in spec order. If any lane fails, the others are allowed to finish rather
+    than being cancelled mid-create, every session that did start is shut down, and the first
+    error is raised. Lane names key the sessions, so repeated names are rejected before any
+    sandbox is created.
+    """
+    repeated = [name for name, count in Counter(spec.name for spec in specs).items() if count > 1]
+    if repeated:
+        raise ValueError(f"Lane names must be unique; repeated: {', '.join(map(repr, repeated))}.")
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    started: dict[str, Any] = {}
+    startup_seconds: dict[str, float] = {}
+
+    async def _provision(spec: LaneSandboxSpec) -> None:
+        async with semaphore:
+            lane_started = time.perf_counter()
+            session = await E2BSandboxClient().create(manifest=spec.manifest, options=spec.options)
+            try:
+                await session.start()
+            except BaseException:
+                await SandboxSessionGroup({spec.name: session}).aclose()
+                raise
+            started[spec.name] = session
+            startup_seconds[spec.name] = time.perf_counter() - lane_started
+
+    provisioning_started = time.perf_counter()
+    results = await asyncio.gather(*(_provision(spec) for spec in specs), return_exceptions=True)
+    failures = [result for result in results if isinstance(result, BaseException)]
+    if failures:
+        await SandboxSessionGroup(started).aclose()
+        raise failures[0]
+
+    return ProvisionedSessions(
+        sessions=[started[spec.name] for spec in specs],
+        startup_seconds={spec.name: startup_seconds[spec.name] for spec in specs},
+        ready_seconds=time.perf_counter() - provisioning_started,
+    )
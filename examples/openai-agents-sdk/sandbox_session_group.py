@@ -0,0 +1,175 @@
+"""Shut down a group of sandbox sessions concurrently under one deadline."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+DEFAULT_SHUTDOWN_TIMEOUT_SECONDS = 30.0
+DEFAULT_REAP_ATTEMPTS = 3
+DEFAULT_REAP_TIMEOUT_SECONDS = 60.0
+DEFAULT_REAP_BACKOFF_SECONDS = 1.0
+
+logger = logging.getLogger(__name__)
+
+Reaper = Callable[[dict[str, Any]], None]
+
+
+@dataclass
+class ShutdownReport:
+    closed: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+    timed_out: list[str] = field(default_factory=list)
+    leaked_sandbox_ids: dict[str, str | None] = field(default_factory=dict)
+    handed_to_reaper: list[str] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def clean(self) -> bool:
+        return not self.failed and not self.timed_out
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "closed": self.closed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "leaked_sandbox_ids": self.leaked_sandbox_ids,
+            "handed_to_reaper": self.handed_to_reaper,
+            "elapsed_seconds": round(self.elapsed_seconds, 2),
+        }
+
+
+class SandboxSessionGroup:
+    """Owns named sandbox sessions and shuts them all down together on exit.
+
+    Every `shutdown()` starts at once and they share a single `timeout_seconds` deadline, so
+    teardown costs the slowest session rather than the sum of all of them. Shutdowns that raise or
+    miss the deadline are recorded in `report` instead of being swallowed, and if a `reaper` is
+    given those sessions are handed to it so something can keep trying after the group returns.
+    """
+
+    def __init__(
+        self,
+        sessions: Mapping[str, Any] | None = None,
+        *,
+        shutdown: bool = True,
+        timeout_seconds: float = DEFAULT_SHUTDOWN_TIMEOUT_SECONDS,
+        reaper: Reaper | None = None,
+    ) -> None:
+        self.sessions: dict[str, Any] = dict(sessions or {})
+        self.shutdown = shutdown
+        self.timeout_seconds = timeout_seconds
+        self.reaper = reaper
+        self.report: ShutdownReport | None = None
+
+    def add(self, name: str, session: Any) -> None:
+        if name in self.sessions:
+            raise ValueError(f"Session {name!r} is already in the group.")
+        self.sessions[name] = session
+
+    async def __aenter__(self) -> SandboxSessionGroup:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        if self.shutdown:
+            await self.aclose()
+
+    async def aclose(self) -> ShutdownReport:
+        if self.report is not None:
+            return self.report
+
+        report = ShutdownReport()
+        started = time.perf_counter()
+        tasks = {
+            name: asyncio.create_task(session.shutdown()) for name, session in self.sessions.items()
+        }
+        if tasks:
+            _, pending = await asyncio.wait(tasks.values(), timeout=self.timeout_seconds)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        for name, task in tasks.items():
+            if task.cancelled():
+                report.timed_out.append(name)
+            elif (error := task.exception()) is not None:
+                report.failed[name] = repr(error)
+            else:
+                report.closed.append(name)
+        report.elapsed_seconds = time.perf_counter() - started
+
+        survivors = {
+            name: self.sessions[name] for name in self.sessions if name not in report.closed
+        }
+        report.leaked_sandbox_ids = {
+            name: getattr(session, "sandbox_id", None) for name, session in survivors.items()
+        }
+        if survivors:
+            logger.warning(
+                "%d of %d sandbox sessions did not shut down cleanly: %s",
+                len(survivors),
+                len(self.sessions),
+                report.leaked_sandbox_ids,
+            )
+            if self.reaper is not None:
+                self.reaper(survivors)
+                report.handed_to_reaper = list(survivors)
+
+        self.report = report
+        return report
+
+
+class BackgroundReaper:
+    """Retries shutdown for sessions a group could not close, without blocking the caller.
+
+    Each survivor gets its own task that retries with exponential backoff. Await `wait()` before
+    the event loop exits, otherwise the loop cancels whatever is still retrying.
+    """
+
+    def __init__(
+        self,
+        *,
+        attempts: int = DEFAULT_REAP_ATTEMPTS,
+        timeout_seconds: float = DEFAULT_REAP_TIMEOUT_SECONDS,
+        backoff_seconds: float = DEFAULT_REAP_BACKOFF_SECONDS,
+    ) -> None:
+        self.attempts = attempts
+        self.timeout_seconds = timeout_seconds
+        self.backoff_seconds = backoff_seconds
+        self.reaped: list[str] = []
+        self.abandoned: dict[str, str] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def __call__(self, survivors: dict[str, Any]) -> None:
+        for name, session in survivors.items():
+            task = asyncio.create_task(self._reap(name, session))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _reap(self, name: str, session: Any) -> None:
+        error: BaseException | None = None
+        for attempt in range(self.attempts):
+            if attempt:
+                await asyncio.sleep(self.backoff_seconds * 2 ** (attempt - 1))
+            try:
+                await asyncio.wait_for(session.shutdown(), self.timeout_seconds)
+            except Exception as exc:
+                error = exc
+            else:
+                self.reaped.append(name)
+                return
+        self.abandoned[name] = repr(error)
+        logger.warning(
+            "gave up shutting down sandbox session %s (%s) after %d attempts: %r",
+            name,
+            getattr(session, "sandbox_id", None),
+            self.attempts,
+            error,
+        )
+
+    async def wait(self) -> None:
+        await asyncio.gather(*self._tasks)
@@ -6,8 +6,10 @@ import copy
 import json
 import math
 import os
+import shlex
 import sys
 import time
+from pathlib import Path
 from typing import Any, TypedDict, cast
 
 from pydantic import BaseModel, Field
@@ -22,6 +24,11 @@ if __package__ is None or __package__ == "":
     sys.path.insert(0, str(Path(__file__).resolve().parents[4]))
 
 from agents.extensions.sandbox import E2BSandboxClient, E2BSandboxClientOptions, E2BSandboxType
+from examples.sandbox.extensions.e2b.analytics_template.template import ANALYTICS_TEMPLATE
+from examples.sandbox.extensions.e2b.sandbox_provisioning import (
+    LaneSandboxSpec,
+    provision_sessions,
+)
 from examples.sandbox.misc.example_support import text_manifest
 from examples.sandbox.misc.workspace_shell import WorkspaceShellCapability
 
@@ -48,6 +55,7 @@ class BatchSearchResult(BaseModel):
     holdout: int
     sleep_seconds: float = 0.0
     batch_duration_seconds: float | None = None
+    worker_processes: int | None = None
     best_candidate_id: str | None = None
     best_order: list[int] | None = None
     best_seasonal_order: list[int] | None = None
@@ -78,6 +86,33 @@ class AgentParallelExecutionReport(BaseModel):
     batch_results: list[BatchSearchResult]
 
 
+class BatchRunStats(BaseModel):
+    batch_name: str
+    wall_seconds: float
+    model_requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+class DirectExecutionReport(BaseModel):
+    final_output: CoordinatorSummary
+    wall_time_seconds: float
+    fan_out_seconds: float
+    summary_seconds: float
+    summary_usage: BatchRunStats
+    batch_stats: list[BatchRunStats]
+    batch_results: list[BatchSearchResult]
+
+
+class ExecutionComparison(BaseModel):
+    agent_wall_time_seconds: float
+    direct_wall_time_seconds: float
+    agent_batch_stats: list[BatchRunStats]
+    direct_batch_stats: list[BatchRunStats]
+    direct_summary_usage: BatchRunStats
+    per_batch: list[dict[str, Any]]
+
+
 class LeaderboardRow(TypedDict):
     batch: str
     candidate: str
@@ -143,21 +178,40 @@ def build_candidate_batches(
     *,
     batch_limit: int | None = None,
     sleep_seconds: float = 0.0,
+    worker_processes: int | None = None,
+    render_plots: bool = True,
 ) -> list[dict[str, object]]:
     batches = copy.deepcopy(DEFAULT_CANDIDATE_BATCHES)
     if batch_limit is not None:
         batches = batches[:batch_limit]
     for batch in batches:
         batch["sleep_seconds"] = sleep_seconds
+        batch["max_workers"] = worker_processes
+        batch["render_plots"] = render_plots
     return batches
 
 
 WORKER_SCRIPT = """\
 import json
+import os
 import subprocess
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# Candidates are fitted one per process across every vCPU, so each process gets a single BLAS
+# thread. SARIMA state-space matrices are too small to gain from threaded BLAS, and N processes
+# each starting N threads would oversubscribe the sandbox. This has to happen before numpy loads.
+for variable in (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+):
+    os.environ[variable] = "1"
+
 
 def ensure_packages() -> None:
     modules = {
@@ -185,6 +239,9 @@ import numpy as np
 import pandas as pd
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 
+TRAIN: pd.Series | None = None
+TEST: pd.Series | None = None
+
 
 def load_series() -> pd.Series:
     frame = pd.read_csv("series.csv")
@@ -195,12 +252,19 @@ def load_series() -> pd.Series:
     return series
 
 
-def fit_candidate(train: pd.Series, test: pd.Series, candidate: dict[str, object], artifacts_dir: Path) -> dict[str, object]:
+def init_worker(train: pd.Series, test: pd.Series) -> None:
+    global TRAIN, TEST
+    TRAIN, TEST = train, test
+
+
+PlotData = dict[str, list[float]]
+
+
+def fit_candidate(candidate: dict[str, object]) -> tuple[dict[str, object], PlotData | None]:
+    train, test = TRAIN, TEST
     candidate_id = str(candidate["id"])
     order = tuple(int(x) for x in candidate["order"])
     seasonal_order = tuple(int(x) for x in candidate["seasonal_order"])
-    forecast_artifact = artifacts_dir / f"{candidate_id}_forecast.png"
-    residual_artifact = artifacts_dir / f"{candidate_id}_residuals.png"
 
     try:
         model = SARIMAX(
@@ -218,26 +282,7 @@ def fit_candidate(train: pd.Series, test: pd.Series, candidate: dict[str, object
         rmse = float(np.sqrt(np.mean(errors ** 2)))
         mae = float(np.mean(np.abs(errors)))
 
-        fig, ax = plt.subplots(figsize=(8, 4))
-        ax.plot(train.index, train.to_numpy(dtype=float), label="train")
-        ax.plot(test.index, actual, label="actual")
-        ax.plot(test.index, predicted, label="forecast")
-        ax.set_title(f"{candidate_id}: SARIMA{order}x{seasonal_order}")
-        ax.legend()
-        fig.tight_layout()
-        fig.savefig(forecast_artifact)
-        plt.close(fig)
-
-        residuals = np.asarray(fitted.resid, dtype=float)
-        fig, ax = plt.subplots(figsize=(8, 3))
-        ax.plot(residuals)
-        ax.axhline(0.0, color="black", linewidth=1)
-        ax.set_title(f"{candidate_id}: residuals")
-        fig.tight_layout()
-        fig.savefig(residual_artifact)
-        plt.close(fig)
-
-        return {
+        result = {
             "id": candidate_id,
             "order": list(order),
             "seasonal_order": list(seasonal_order),
@@ -247,10 +292,15 @@ def fit_candidate(train: pd.Series, test: pd.Series, candidate: dict[str, object
             "mae": mae,
             "status": "ok",
             "notes": None,
-            "artifacts": [forecast_artifact.as_posix(), residual_artifact.as_posix()],
+            "artifacts": [],
+        }
+        plot_data = {
+            "predicted": predicted.tolist(),
+            "residuals": np.asarray(fitted.resid, dtype=float).tolist(),
         }
+        return result, plot_data
     except Exception as exc:
-        return {
+        result = {
             "id": candidate_id,
             "order": list(order),
             "seasonal_order": list(seasonal_order),
@@ -262,6 +312,40 @@ def fit_candidate(train: pd.Series, test: pd.Series, candidate: dict[str, object
             "notes": str(exc),
             "artifacts": [],
         }
+        return result, None
+
+
+def render_candidate(job: tuple[dict[str, object], PlotData, str]) -> tuple[list[str], str | None]:
+    train, test = TRAIN, TEST
+    result, plot_data, artifacts_dir = job
+    candidate_id = str(result["id"])
+    order = tuple(result["order"])
+    seasonal_order = tuple(result["seasonal_order"])
+    forecast_artifact = Path(artifacts_dir) / f"{candidate_id}_forecast.png"
+    residual_artifact = Path(artifacts_dir) / f"{candidate_id}_residuals.png"
+
+    try:
+        fig, ax = plt.subplots(figsize=(8, 4))
+        ax.plot(train.index, train.to_numpy(dtype=float), label="train")
+        ax.plot(test.index, test.to_numpy(dtype=float), label="actual")
+        ax.plot(test.index, plot_data["predicted"], label="forecast")
+        ax.set_title(f"{candidate_id}: SARIMA{order}x{seasonal_order}")
+        ax.legend()
+        fig.tight_layout()
+        fig.savefig(forecast_artifact)
+        plt.close(fig)
+
+        fig, ax = plt.subplots(figsize=(8, 3))
+        ax.plot(plot_data["residuals"])
+        ax.axhline(0.0, color="black", linewidth=1)
+        ax.set_title(f"{candidate_id}: residuals")
+        fig.tight_layout()
+        fig.savefig(residual_artifact)
+        plt.close(fig)
+    except Exception as exc:
+        plt.close("all")
+        return [], f"plot rendering failed: {exc}"
+    return [forecast_artifact.as_posix(), residual_artifact.as_posix()], None
 
 
 def main() -> None:
@@ -269,17 +353,45 @@ def main() -> None:
     artifacts_dir = Path("artifacts")
     artifacts_dir.mkdir(exist_ok=True)
     sleep_seconds = float(spec.get("sleep_seconds", 0.0))
+    render_plots = bool(spec.get("render_plots", True))
+    candidates = spec["candidates"]
+    requested_workers = int(spec.get("max_workers") or os.cpu_count() or 1)
+    worker_processes = max(1, min(requested_workers, len(candidates)))
 
     series = load_series()
     horizon = int(spec.get("holdout", 6))
     train = series.iloc[:-horizon]
     test = series.iloc[-horizon:]
-    started = __import__("time").perf_counter()
+    started = time.perf_counter()
 
     if sleep_seconds > 0:
-        __import__("time").sleep(sleep_seconds)
+        time.sleep(sleep_seconds)
+
+    # Fit every candidate first and render plots in a second pass, so a slow plot never holds up
+    # the metrics. executor.map keeps results in candidate order.
+    init_worker(train, test)
+    executor = None
+    if worker_processes > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=worker_processes, initializer=init_worker, initargs=(train, test)
+        )
+    run = map if executor is None else executor.map
+    try:
+        fits = list(run(fit_candidate, candidates))
+        results = [result for result, _ in fits]
+        if render_plots:
+            jobs = [
+                (result, plot_data, artifacts_dir.as_posix())
+                for result, plot_data in fits
+                if plot_data is not None
+            ]
+            for (result, _, _), (artifacts, note) in zip(jobs, run(render_candidate, jobs)):
+                result["artifacts"] = artifacts
+                result["notes"] = note
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
-    results = [fit_candidate(train, test, candidate, artifacts_dir) for candidate in spec["candidates"]]
     ranked = sorted(
         [item for item in results if item["status"] == "ok" and item["rmse"] is not None],
         key=lambda item: (float(item["rmse"]), float(item["mae"])),
@@ -290,7 +402,8 @@ def main() -> None:
         "batch_name": spec["batch_name"],
         "holdout": horizon,
         "sleep_seconds": sleep_seconds,
-        "batch_duration_seconds": __import__("time").perf_counter() - started,
+        "batch_duration_seconds": time.perf_counter() - started,
+        "worker_processes": worker_processes,
         "best_candidate_id": None if best is None else best["id"],
         "best_order": None if best is None else best["order"],
         "best_seasonal_order": None if best is None else best["seasonal_order"],
@@ -329,6 +442,10 @@ if __name__ == "__main__":
 """
 
 
+def _decode(payload: bytes) -> str:
+    return payload.decode("utf-8", errors="replace").strip()
+
+
 def make_manifest(batch_spec: dict[str, Any]):
     return text_manifest(
         {
@@ -344,6 +461,21 @@ def make_manifest(batch_spec: dict[str, Any]):
     )
 
 
+def make_sandbox_options(
+    *,
+    sandbox_type: E2BSandboxType,
+    template: str | None,
+    timeout_seconds: int,
+) -> E2BSandboxClientOptions:
+    return E2BSandboxClientOptions(
+        sandbox_type=sandbox_type,
+        template=template,
+        timeout=timeout_seconds,
+        allow_internet_access=True,
+        pause_on_exit=True,
+    )
+
+
 def make_run_config(
     *,
     sandbox_type: E2BSandboxType,
@@ -353,12 +485,10 @@ def make_run_config(
     return RunConfig(
         sandbox=SandboxRunConfig(
             client=E2BSandboxClient(),
-            options=E2BSandboxClientOptions(
+            options=make_sandbox_options(
                 sandbox_type=sandbox_type,
                 template=template,
-                timeout=timeout_seconds,
-                allow_internet_access=True,
-                pause_on_exit=True,
+                timeout_seconds=timeout_seconds,
             ),
         )
     )
@@ -379,8 +509,8 @@ def make_worker_agent(
             "and return the structured batch summary."
         ),
         developer_instructions=(
-            "Use the shell tool before answering. Run `python -m pip install -q -r requirements.txt` "
-            "if the dependencies are not already available, then run `python run_sarima_batch.py`. "
+            "Use the shell tool before answering. Run `python run_sarima_batch.py` directly; it "
+            "installs anything from requirements.txt the sandbox template is missing. "
             "Read `results.json` and `leaderboard.md` before answering. Only cite files that exist "
             "in the sandbox and do not invent metrics."
         ),
@@ -391,14 +521,26 @@ def make_worker_agent(
     )
 
 
-async def run_candidate_batch(
+def _usage_stats(batch_name: str, wall_seconds: float, result: Any) -> BatchRunStats:
+    usage = result.context_wrapper.usage
+    return BatchRunStats(
+        batch_name=batch_name,
+        wall_seconds=wall_seconds,
+        model_requests=usage.requests,
+        input_tokens=usage.input_tokens,
+        output_tokens=usage.output_tokens,
+    )
+
+
+async def _run_worker_agent(
     batch_spec: dict[str, Any],
     *,
-    model: str = DEFAULT_MODEL,
-    sandbox_type: E2BSandboxType = E2BSandboxType.E2B,
-    template: str | None = None,
-    timeout_seconds: int = DEFAULT_TIMEOUT_SECONDS,
-) -> BatchSearchResult:
+    model: str,
+    sandbox_type: E2BSandboxType,
+    template: str | None,
+    timeout_seconds: int,
+) -> tuple[BatchSearchResult, BatchRunStats]:
+    started = time.perf_counter()
     manifest = make_manifest(batch_spec)
     worker = make_worker_agent(
         batch_name=str(batch_spec["batch_name"]),
@@ -417,33 +559,132 @@ async def run_candidate_batch(
             timeout_seconds=timeout_seconds,
         ),
     )
-    return cast(BatchSearchResult, result.final_output)
+    stats = _usage_stats(str(batch_spec["batch_name"]), time.perf_counter() - started, result)
+    return cast(BatchSearchResult, result.final_output), stats
 
 
-async def run_parallel_grid_search(
+async def run_candidate_batch(
+    batch_spec: dict[str, Any],
     *,
-    batch_specs: list[dict[str, Any]] | None = None,
     model: str = DEFAULT_MODEL,
     sandbox_type: E2BSandboxType = E2BSandboxType.E2B,
     template: str | None = None,
     timeout_seconds: int = DEFAULT_TIMEOUT_SECONDS,
-    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
-) -> list[BatchSearchResult]:
-    selected_batches = DEFAULT_CANDIDATE_BATCHES if batch_specs is None else batch_specs
+) -> BatchSearchResult:
+    batch_result, _ = await _run_worker_agent(
+        batch_spec,
+        model=model,
+        sandbox_type=sandbox_type,
+        template=template,
+        timeout_seconds=timeout_seconds,
+    )
+    return batch_result
+
+
+async def execute_candidate_batch(
+    batch_spec: dict[str, Any],
+    *,
+    sandbox_type: E2BSandboxType = E2BSandboxType.E2B,
+    template: str | None = None,
+    timeout_seconds: int = DEFAULT_TIMEOUT_SECONDS,
+) -> BatchSearchResult:
+    """Run one batch by executing the worker script directly, with no model in the loop."""
+    batch_name = str(batch_spec["batch_name"])
+    provisioned = await provision_sessions(
+        [
+            LaneSandboxSpec(
+                name=batch_name,
+                manifest=make_manifest(batch_spec),
+                options=make_sandbox_options(
+                    sandbox_type=sandbox_type,
+                    template=template,
+                    timeout_seconds=timeout_seconds,
+                ),
+            )
+        ]
+    )
+    async with provisioned.session_group():
+        session = provisioned.sessions[0]
+        workspace_root = shlex.quote(str(session.state.manifest.root))
+        result = await session.exec(
+            f"cd {workspace_root} && python run_sarima_batch.py",
+            timeout=timeout_seconds,
+            shell=["bash", "-lc"],
+        )
+        if not result.ok():
+            raise RuntimeError(
+                f"SARIMA worker for {batch_name} exited with {result.exit_code}.\n\n"
+                f"stderr:\n{_decode(result.stderr) or '<empty>'}"
+            )
+        payload = (await session.read(Path("results.json"))).read()
+    return BatchSearchResult.model_validate_json(payload)
+
+
+async def _fan_out(
+    batch_specs: list[dict[str, Any]],
+    *,
+    direct: bool,
+    model: str,
+    sandbox_type: E2BSandboxType,
+    template: str | None,
+    timeout_seconds: int,
+    max_concurrency: int,
+) -> tuple[list[BatchSearchResult], list[BatchRunStats]]:
     semaphore = asyncio.Semaphore(max_concurrency)
 
-    async def guarded(batch_spec: dict[str, Any]) -> BatchSearchResult:
+    async def guarded(batch_spec: dict[str, Any]) -> tuple[BatchSearchResult, BatchRunStats]:
         async with semaphore:
-            return await run_candidate_batch(
+            if not direct:
+                return await _run_worker_agent(
+                    batch_spec,
+                    model=model,
+                    sandbox_type=sandbox_type,
+                    template=template,
+                    timeout_seconds=timeout_seconds,
+                )
+            started = time.perf_counter()
+            batch_result = await execute_candidate_batch(
                 batch_spec,
-                model=model,
                 sandbox_type=sandbox_type,
                 template=template,
                 timeout_seconds=timeout_seconds,
             )
+            stats = BatchRunStats(
+                batch_name=batch_result.batch_name,
+                wall_seconds=time.perf_counter() - started,
+            )
+            return batch_result, stats
+
+    tasks = [asyncio.create_task(guarded(batch_spec)) for batch_spec in batch_specs]
+    outcomes = await asyncio.gather(*tasks)
+    return [batch_result for batch_result, _ in outcomes], [stats for _, stats in outcomes]
 
-    tasks = [asyncio.create_task(guarded(batch_spec)) for batch_spec in selected_batches]
-    return await asyncio.gather(*tasks)
+
+async def run_parallel_grid_search(
+    *,
+    batch_specs: list[dict[str, Any]] | None = None,
+    model: str = DEFAULT_MODEL,
+    sandbox_type: E2BSandboxType = E2BSandboxType.E2B,
+    template: str | None = None,
+    timeout_seconds: int = DEFAULT_TIMEOUT_SECONDS,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    direct: bool = False,
+) -> list[BatchSearchResult]:
+    """Fan batches out under a concurrency cap.
+
+    By default each batch is driven by its own worker agent. With `direct=True` the worker script
+    is executed straight through the sandbox session instead, which skips every model call.
+    """
+    batch_results, _ = await _fan_out(
+        DEFAULT_CANDIDATE_BATCHES if batch_specs is None else batch_specs,
+        direct=direct,
+        model=model,
+        sandbox_type=sandbox_type,
+        template=template,
+        timeout_seconds=timeout_seconds,
+        max_concurrency=max_concurrency,
+    )
+    return batch_results
 
 
 def leaderboard_rows(batch_results: list[BatchSearchResult]) -> list[LeaderboardRow]:
@@ -477,6 +718,120 @@ def ranked_rows(batch_results: list[BatchSearchResult]) -> list[LeaderboardRow]:
     )
 
 
+async def summarize_batches(
+    batch_results: list[BatchSearchResult], *, model: str = DEFAULT_MODEL
+) -> tuple[CoordinatorSummary, BatchRunStats]:
+    ranked = ranked_rows(batch_results)
+    if not ranked:
+        raise RuntimeError(
+            "No SARIMA candidate fit successfully, so there is nothing to summarize."
+        )
+    coordinator = Agent(
+        name="SARIMA Leaderboard Coordinator",
+        model=model,
+        instructions=(
+            "You summarize a finished SARIMA grid search. Choose the champion by lowest rmse, "
+            "breaking ties with mae, and explain the choice using only the leaderboard given."
+        ),
+        output_type=CoordinatorSummary,
+    )
+    started = time.perf_counter()
+    result = await Runner.run(
+        coordinator,
+        "Leaderboard of successful candidates, best first:\n" + json.dumps(ranked, indent=2),
+    )
+    stats = _usage_stats("coordinator_summary", time.perf_counter() - started, result)
+    return cast(CoordinatorSummary, result.final_output), stats
+
+
+async def run_direct_grid_search(
+    *,
+    batch_specs: list[dict[str, Any]] | None = None,
+    model: str = DEFAULT_MODEL,
+    sandbox_type: E2BSandboxType = E2BSandboxType.E2B,
+    template: str | None = None,
+    timeout_seconds: int = DEFAULT_TIMEOUT_SECONDS,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> DirectExecutionReport:
+    """Execute every batch directly, then use the model once for the coordinator summary."""
+    started = time.perf_counter()
+    batch_results, batch_stats = await _fan_out(
+        build_candidate_batches() if batch_specs is None else batch_specs,
+        direct=True,
+        model=model,
+        sandbox_type=sandbox_type,
+        template=template,
+        timeout_seconds=timeout_seconds,
+        max_concurrency=max_concurrency,
+    )
+    fan_out_seconds = time.perf_counter() - started
+    summary, summary_usage = await summarize_batches(batch_results, model=model)
+    return DirectExecutionReport(
+        final_output=summary,
+        wall_time_seconds=time.perf_counter() - started,
+        fan_out_seconds=fan_out_seconds,
+        summary_seconds=summary_usage.wall_seconds,
+        summary_usage=summary_usage,
+        batch_stats=batch_stats,
+        batch_results=batch_results,
+    )
+
+
+async def compare_execution_paths(
+    *,
+    batch_specs: list[dict[str, Any]] | None = None,
+    model: str = DEFAULT_MODEL,
+    sandbox_type: E2BSandboxType = E2BSandboxType.E2B,
+    template: str | None = None,
+    timeout_seconds: int = DEFAULT_TIMEOUT_SECONDS,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> ExecutionComparison:
+    """Run the same batches through worker agents and through direct execution.
+
+    Cost is reported as model requests and tokens, since per-token prices depend on the model and
+    account.
+    """
+    selected_batches = build_candidate_batches() if batch_specs is None else batch_specs
+    started = time.perf_counter()
+    _, agent_stats = await _fan_out(
+        selected_batches,
+        direct=False,
+        model=model,
+        sandbox_type=sandbox_type,
+        template=template,
+        timeout_seconds=timeout_seconds,
+        max_concurrency=max_concurrency,
+    )
+    agent_wall_time_seconds = time.perf_counter() - started
+    direct = await run_direct_grid_search(
+        batch_specs=selected_batches,
+        model=model,
+        sandbox_type=sandbox_type,
+        template=template,
+        timeout_seconds=timeout_seconds,
+        max_concurrency=max_concurrency,
+    )
+    per_batch = [
+        {
+            "batch": agent.batch_name,
+            "agent_wall_seconds": round(agent.wall_seconds, 2),
+            "direct_wall_seconds": round(direct_stats.wall_seconds, 2),
+            "agent_model_requests": agent.model_requests,
+            "agent_input_tokens": agent.input_tokens,
+            "agent_output_tokens": agent.output_tokens,
+        }
+        for agent, direct_stats in zip(agent_stats, direct.batch_stats, strict=True)
+    ]
+    return ExecutionComparison(
+        agent_wall_time_seconds=agent_wall_time_seconds,
+        direct_wall_time_seconds=direct.wall_time_seconds,
+        agent_batch_stats=agent_stats,
+        direct_batch_stats=direct.batch_stats,
+        direct_summary_usage=direct.summary_usage,
+        per_batch=per_batch,
+    )
+
+
 def require_credentials() -> None:
     missing = [name for name in ("OPENAI_API_KEY", "E2B_API_KEY") if not os.getenv(name)]
     if missing:
@@ -607,6 +962,8 @@ async def _async_main(args: argparse.Namespace) -> None:
     batch_specs = build_candidate_batches(
         batch_limit=args.batch_limit,
         sleep_seconds=args.sleep_seconds,
+        worker_processes=args.worker_processes,
+        render_plots=not args.skip_plots,
     )
     sandbox_type = E2BSandboxType(args.sandbox_type)
     if args.execution_mode == "python":
@@ -630,6 +987,21 @@ async def _async_main(args: argparse.Namespace) -> None:
             print(json.dumps(ranked[0], indent=2, default=str))
         return
 
+    if args.execution_mode in ("direct", "compare"):
+        run_mode = (
+            run_direct_grid_search if args.execution_mode == "direct" else compare_execution_paths
+        )
+        report = await run_mode(
+            batch_specs=batch_specs,
+            model=args.model,
+            sandbox_type=sandbox_type,
+            template=args.template,
+            timeout_seconds=args.timeout,
+            max_concurrency=args.max_concurrency,
+        )
+        print(json.dumps(report.model_dump(mode="json"), indent=2))
+        return
+
     report = await run_agent_parallel_grid_search(
         batch_specs=batch_specs,
         model=args.model,
@@ -647,8 +1019,12 @@ def main() -> None:
     parser.add_argument(
         "--execution-mode",
         default="python",
-        choices=["python", "agent"],
-        help="Use deterministic Python fan-out or let a coordinator agent invoke batch tools.",
+        choices=["python", "agent", "direct", "compare"],
+        help=(
+            "Use deterministic Python fan-out, let a coordinator agent invoke batch tools, execute "
+            "the worker scripts directly and only call the model for the summary, or compare the "
+            "python and direct paths."
+        ),
     )
     parser.add_argument("--model", default=os.getenv("OPENAI_MODEL", DEFAULT_MODEL))
     parser.add_argument(
@@ -656,7 +1032,14 @@ def main() -> None:
         default=os.getenv("E2B_SANDBOX_TYPE", E2BSandboxType.E2B.value),
         choices=[member.value for member in E2BSandboxType],
     )
-    parser.add_argument("--template", default=os.getenv("E2B_TEMPLATE") or None)
+    parser.add_argument(
+        "--template",
+        default=os.getenv("E2B_TEMPLATE") or ANALYTICS_TEMPLATE,
+        help=(
+            "E2B template for the worker sandboxes. Defaults to the pre-baked analytics template "
+            "from analytics_template/; pass `base` to use the stock image."
+        ),
+    )
     parser.add_argument(
         "--timeout",
         type=int,
@@ -679,6 +1062,20 @@ def main() -> None:
         default=0.0,
         help="Add an artificial delay inside each sandbox worker to make parallelism easier to observe.",
     )
+    parser.add_argument(
+        "--worker-processes",
+        type=int,
+        default=None,
+        help=(
+            "Processes each sandbox worker uses to fit its candidates. Defaults to the sandbox's "
+            "CPU count; pass 1 to fit serially and compare batch_duration_seconds."
+        ),
+    )
+    parser.add_argument(
+        "--skip-plots",
+        action="store_true",
+        help="Skip the forecast and residual plot pass inside each sandbox worker.",
+    )
     args = parser.parse_args()
     asyncio.run(_async_main(args))
 
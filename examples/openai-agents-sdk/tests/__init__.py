@@ -0,0 +1 @@
+"""Tests for the OpenAI Agents SDK E2B example helpers."""
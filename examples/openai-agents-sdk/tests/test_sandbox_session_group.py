@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import unittest
+
+from sandbox_session_group import BackgroundReaper, SandboxSessionGroup
+
+
+class FakeSession:
+    def __init__(
+        self,
+        sandbox_id: str,
+        *,
+        delay: float = 0.0,
+        error: Exception | None = None,
+        failures: int = 0,
+    ) -> None:
+        self.sandbox_id = sandbox_id
+        self.delay = delay
+        self.error = error
+        self.failures = failures
+        self.shutdown_calls = 0
+        self.closed = False
+
+    async def shutdown(self) -> None:
+        self.shutdown_calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        if self.shutdown_calls <= self.failures:
+            raise ConnectionError(f"shutdown attempt {self.shutdown_calls} failed")
+        self.closed = True
+
+
+class SandboxSessionGroupTest(unittest.IsolatedAsyncioTestCase):
+    async def test_shuts_sessions_down_concurrently(self) -> None:
+        sessions = {f"lane-{index}": FakeSession(f"sbx-{index}", delay=0.1) for index in range(8)}
+
+        started = time.perf_counter()
+        async with SandboxSessionGroup(sessions) as group:
+            pass
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.5)
+        self.assertIsNotNone(group.report)
+        self.assertTrue(group.report.clean)
+        self.assertEqual(group.report.closed, list(sessions))
+        self.assertTrue(all(session.closed for session in sessions.values()))
+
+    async def test_records_failures_and_timeouts(self) -> None:
+        group = SandboxSessionGroup(
+            {
+                "fast": FakeSession("sbx-fast", delay=0.01),
+                "broken": FakeSession("sbx-broken", delay=0.02, error=RuntimeError("boom")),
+                "stuck": FakeSession("sbx-stuck", delay=10.0),
+            },
+            timeout_seconds=0.2,
+        )
+
+        started = time.perf_counter()
+        with self.assertLogs("sandbox_session_group", "WARNING") as logs:
+            report = await group.aclose()
+        elapsed = time.perf_counter() - started
+
+        self.assertIn("2 of 3 sandbox sessions", logs.output[0])
+        self.assertLess(elapsed, 1.0)
+        self.assertFalse(report.clean)
+        self.assertEqual(report.closed, ["fast"])
+        self.assertEqual(report.failed, {"broken": "RuntimeError('boom')"})
+        self.assertEqual(report.timed_out, ["stuck"])
+        self.assertEqual(report.leaked_sandbox_ids, {"broken": "sbx-broken", "stuck": "sbx-stuck"})
+        self.assertEqual(report.handed_to_reaper, [])
+
+    async def test_shuts_down_when_the_body_raises(self) -> None:
+        session = FakeSession("sbx-1")
+
+        with self.assertRaises(ValueError):
+            async with SandboxSessionGroup({"lane": session}):
+                raise ValueError("lane failed")
+
+        self.assertTrue(session.closed)
+
+    async def test_leaves_sessions_running_when_shutdown_is_disabled(self) -> None:
+        session = FakeSession("sbx-1")
+
+        async with SandboxSessionGroup({"lane": session}, shutdown=False) as group:
+            pass
+
+        self.assertIsNone(group.report)
+        self.assertEqual(session.shutdown_calls, 0)
+
+    async def test_aclose_is_idempotent(self) -> None:
+        session = FakeSession("sbx-1")
+        group = SandboxSessionGroup({"lane": session})
+
+        first = await group.aclose()
+        second = await group.aclose()
+
+        self.assertIs(first, second)
+        self.assertEqual(session.shutdown_calls, 1)
+
+    async def test_add_rejects_duplicate_names(self) -> None:
+        group = SandboxSessionGroup({"lane": FakeSession("sbx-1")}, shutdown=False)
+
+        with self.assertRaises(ValueError):
+            group.add("lane", FakeSession("sbx-2"))
+
+    async def test_hands_survivors_to_background_reaper(self) -> None:
+        flaky = FakeSession("sbx-flaky", delay=0.01, failures=2)
+        doomed = FakeSession("sbx-doomed", error=RuntimeError("gone"))
+        reaper = BackgroundReaper(attempts=2, timeout_seconds=1.0, backoff_seconds=0.01)
+        group = SandboxSessionGroup(
+            {"ok": FakeSession("sbx-ok"), "flaky": flaky, "doomed": doomed},
+            reaper=reaper,
+        )
+
+        with self.assertLogs("sandbox_session_group", "WARNING") as logs:
+            report = await group.aclose()
+            await reaper.wait()
+
+        self.assertEqual(len(logs.output), 2)
+        self.assertEqual(sorted(report.handed_to_reaper), ["doomed", "flaky"])
+        self.assertEqual(reaper.reaped, ["flaky"])
+        self.assertEqual(reaper.abandoned, {"doomed": "RuntimeError('gone')"})
+        self.assertTrue(flaky.closed)
+        self.assertEqual(flaky.shutdown_calls, 3)
+        self.assertEqual(doomed.shutdown_calls, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()